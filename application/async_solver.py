@@ -0,0 +1,78 @@
+import asyncio
+import threading
+from concurrent.futures import Executor
+from contextlib import suppress
+from typing import Any, Callable, Optional, TypeVar
+
+from application.solver import SearchResult, Solver, SolverCancelledError, Suggestion
+
+T = TypeVar("T")
+
+DEFAULT_MAX_PENDING = 8
+
+
+# Raised instead of queueing another computation when `max_pending` computations are already queued or running.
+class SolverBusyError(Exception):
+    pass
+
+
+# An asyncio-friendly facade over a `Solver`. The blocking solver calls run on `executor` (the event loop's default
+# executor if None), one at a time, since a solver isn't safe to use from several threads at once.
+#
+# Cancelling the task awaiting a call also cancels the computation: the worker thread notices between batches of
+# branches (see `CANCEL_CHECK_INTERVAL`) and stops, leaving the solver as it was. The cancelled call only returns once
+# the worker has stopped, so the next call never overlaps with it. A computation that finishes before it notices is
+# kept, which for `expand` means that the solver has been expanded.
+#
+# To apply backpressure, calls fail fast with `SolverBusyError` rather than queueing up behind `max_pending` others.
+class AsyncSolver:
+    def __init__(self, solver: Solver, executor: Optional[Executor] = None, max_pending: int = DEFAULT_MAX_PENDING):
+        self.solver = solver
+        self.executor = executor
+        self.max_pending = max_pending
+        self.num_pending = 0
+        self._lock = asyncio.Lock()
+
+    async def pick_guess(self, deadline: Optional[float] = None) -> str:
+        return await self._run(self.solver.pick_guess, deadline)
+
+    async def search_guess(self, deadline: Optional[float] = None) -> SearchResult[str]:
+        return await self._run(self.solver.search_guess, deadline)
+
+    async def suggest(self, k: int, deadline: Optional[float] = None) -> list[Suggestion]:
+        return await self._run(self.solver.suggest, k, deadline)
+
+    async def pick_clue(self, correct_clue: int, guess: str, deadline: Optional[float] = None) -> Optional[int]:
+        return await self._run(self.solver.pick_clue, correct_clue, guess, deadline)
+
+    async def search_clue(
+            self, correct_clue: int, guess: str, deadline: Optional[float] = None
+    ) -> SearchResult[Optional[int]]:
+        return await self._run(self.solver.search_clue, correct_clue, guess, deadline)
+
+    async def expand(self, guess: str, clue: int, fact_or_fiction_check: Optional[tuple[int, bool]]) -> None:
+        await self._run(self.solver.expand_solution_spaces, guess, clue, fact_or_fiction_check)
+
+    # Runs `fn(*args, cancel=...)` on the executor once every earlier call is done.
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.num_pending >= self.max_pending:
+            raise SolverBusyError(f"{self.num_pending} solver computations are already pending")
+        self.num_pending += 1
+        try:
+            async with self._lock:
+                cancel = threading.Event()
+                future = asyncio.get_running_loop().run_in_executor(self.executor, _call, fn, args, cancel)
+                try:
+                    # Shielded, so that the worker can be told to stop and waited for, rather than abandoned
+                    return await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    cancel.set()
+                    with suppress(SolverCancelledError):
+                        await future
+                    raise
+        finally:
+            self.num_pending -= 1
+
+
+def _call(fn: Callable[..., T], args: tuple, cancel: threading.Event) -> T:
+    return fn(*args, cancel=cancel)
@@ -0,0 +1,148 @@
+from typing import Sequence
+
+
+# Clues encoded as base-3 ints: the clue character at position i contributes `CLUE_CHRS.index(c) * 3 ** i`, so
+# 'X' is 0, '~' is 1 and 'Y' is 2. Every one of the 243 possible clues maps to a distinct int in [0, 243).
+
+CLUE_CHRS = "X~Y"
+NUM_PATTERNS = 3 ** 5
+X, SQUIGGLE, Y = 0, 1, 2
+POWERS_OF_3 = (1, 3, 9, 27, 81)
+
+_A = ord('a')
+
+
+def encode_clue(clue: str) -> int:
+    pattern = 0
+    for i, c in enumerate(clue):
+        pattern += CLUE_CHRS.index(c) * POWERS_OF_3[i]
+    return pattern
+
+
+def decode_clue(pattern: int) -> str:
+    return "".join(CLUE_CHRS[pattern // POWERS_OF_3[i] % 3] for i in range(5))
+
+
+ALL_CLUES: tuple[str, ...] = tuple(decode_clue(pattern) for pattern in range(NUM_PATTERNS))
+# For each pattern, its clue digit (X, SQUIGGLE or Y) at positions 0-4
+CLUE_DIGITS: tuple[tuple[int, ...], ...] = tuple(
+    tuple(pattern // POWERS_OF_3[i] % 3 for i in range(5)) for pattern in range(NUM_PATTERNS)
+)
+# For each pattern and position 0-4, the two patterns that differ from it only at that position, i.e. the clues that
+# a librarian could give by lying about that position. Ordered 'Y', 'X', '~' (skipping the true clue character), which
+# is the order that the solver has always generated its branches in.
+SINGLE_LIE_VARIANTS_AT: tuple[tuple[tuple[int, ...], ...], ...] = tuple(
+    tuple(
+        tuple(pattern + (digit - CLUE_DIGITS[pattern][i]) * POWERS_OF_3[i] for digit in (Y, X, SQUIGGLE)
+              if digit != CLUE_DIGITS[pattern][i])
+        for i in range(5)
+    )
+    for pattern in range(NUM_PATTERNS)
+)
+# For each pattern, the 10 patterns that differ from it at exactly one position, ordered by position
+SINGLE_LIE_VARIANTS: tuple[tuple[int, ...], ...] = tuple(
+    tuple(variant for variants in SINGLE_LIE_VARIANTS_AT[pattern] for variant in variants)
+    for pattern in range(NUM_PATTERNS)
+)
+# The pattern for "YYYYY", which the librarian never gets to lie about, since the guessers have won
+ALL_CORRECT = NUM_PATTERNS - 1
+
+
+# Returns the encoded clue that a truthful librarian would give for `guess` if the secret word were `answer`. Follows
+# the same Wordle rules as `GameState.generate_correct_clue`: letters in the right position are marked 'Y' first,
+# then, from left to right, each remaining guess letter is marked '~' as long as the answer has an occurrence of it
+# that hasn't been accounted for yet, and 'X' otherwise.
+def correct_clue(guess: str, answer: str) -> int:
+    pattern = 0
+    unmatched: dict[str, int] = {}
+    for i in range(5):
+        if guess[i] == answer[i]:
+            pattern += 2 * POWERS_OF_3[i]
+        else:
+            unmatched[answer[i]] = unmatched.get(answer[i], 0) + 1
+    for i in range(5):
+        c = guess[i]
+        if c != answer[i] and unmatched.get(c, 0) > 0:
+            pattern += POWERS_OF_3[i]
+            unmatched[c] -= 1
+    return pattern
+
+
+# Returns a 26-bit mask of the letters in `word`
+def letter_mask(word: str) -> int:
+    mask = 0
+    for c in word:
+        mask |= 1 << (ord(c) - _A)
+    return mask
+
+
+# Returns the encoded correct clue for `guess` against each of `answers`.
+#
+# For a guess letter that only appears once in the guess, a letter that isn't in the right position is '~' if and
+# only if it appears anywhere in the answer, which is a single bit test against a precomputed mask of the answer's
+# letters. Most guesses have five distinct letters, and for those every pair is scored with five equality checks and
+# five bit tests, with no per-pair bookkeeping. Only the repeated letters of a guess need occurrences to be counted.
+def correct_clues_for_guess(guess: str, answers: Sequence[str], answer_masks: Sequence[int] = ()) -> list[int]:
+    if not answer_masks:
+        answer_masks = [letter_mask(answer) for answer in answers]
+
+    if len(set(guess)) == 5:
+        g0, g1, g2, g3, g4 = guess[0], guess[1], guess[2], guess[3], guess[4]
+        b0, b1, b2, b3, b4 = (1 << (ord(c) - _A) for c in guess)
+        return [
+            (2 if a[0] == g0 else 1 if mask & b0 else 0)
+            + (6 if a[1] == g1 else 3 if mask & b1 else 0)
+            + (18 if a[2] == g2 else 9 if mask & b2 else 0)
+            + (54 if a[3] == g3 else 27 if mask & b3 else 0)
+            + (162 if a[4] == g4 else 81 if mask & b4 else 0)
+            for a, mask in zip(answers, answer_masks)
+        ]
+
+    singles = [(i, c, 1 << (ord(c) - _A)) for i, c in enumerate(guess) if guess.count(c) == 1]
+    repeats = [(c, [i for i, g in enumerate(guess) if g == c]) for c in sorted(set(guess)) if guess.count(c) > 1]
+    patterns = []
+    for a, mask in zip(answers, answer_masks):
+        pattern = 0
+        for i, c, bit in singles:
+            if a[i] == c:
+                pattern += 2 * POWERS_OF_3[i]
+            elif mask & bit:
+                pattern += POWERS_OF_3[i]
+        for c, positions in repeats:
+            num_unmatched = a.count(c)
+            if not num_unmatched:
+                continue
+            for i in positions:
+                if a[i] == c:
+                    pattern += 2 * POWERS_OF_3[i]
+                    num_unmatched -= 1
+            for i in positions:
+                if num_unmatched <= 0:
+                    break
+                if a[i] != c:
+                    pattern += POWERS_OF_3[i]
+                    num_unmatched -= 1
+        patterns.append(pattern)
+    return patterns
+
+
+# Returns the encoded correct clue for each (guess, answer) pair. Pairs are grouped by guess so that each distinct
+# guess is only prepared once, and each distinct answer's letter mask is only computed once.
+def correct_clues(guesses: Sequence[str], answers: Sequence[str]) -> list[int]:
+    if len(guesses) != len(answers):
+        raise ValueError(f"Got {len(guesses)} guesses but {len(answers)} answers")
+
+    answer_masks: dict[str, int] = {}
+    indexes_by_guess: dict[str, list[int]] = {}
+    for k, (guess, answer) in enumerate(zip(guesses, answers)):
+        indexes_by_guess.setdefault(guess, []).append(k)
+        if answer not in answer_masks:
+            answer_masks[answer] = letter_mask(answer)
+
+    patterns = [0] * len(guesses)
+    for guess, indexes in indexes_by_guess.items():
+        group_answers = [answers[k] for k in indexes]
+        group_patterns = correct_clues_for_guess(guess, group_answers, [answer_masks[a] for a in group_answers])
+        for k, pattern in zip(indexes, group_patterns):
+            patterns[k] = pattern
+    return patterns
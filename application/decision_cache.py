@@ -0,0 +1,130 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from application.serialization import encode_solution_spaces
+from application.solver import SolverState
+
+# A persistent cache of solver decisions (`Solver.search_guess` and `Solver.search_clue`), shared by every game and
+# every process that points at the same file. Many games reach the same solver state, especially in the first few
+# turns after a shared known character, and each would otherwise recompute the same decision from scratch.
+#
+# Decisions are keyed by a hash of everything they depend on: the word list, the kind of decision and its arguments,
+# the candidate words and the solution spaces in order (in their `serialization` encoding). Branch order matters,
+# since it breaks ties between equally good guesses, so a cached decision is always the one the solver would have
+# made. Only complete searches are cached, never ones cut short by a deadline.
+#
+# The cache is an SQLite database in WAL mode, so any number of processes can read and write it at once. Each process
+# opens its own connection (re-opened after a fork), and entries beyond `max_entries` are evicted least recently used
+# first. A cache that can't be read or written (e.g. because another process holds a lock for too long) just misses.
+#
+# Bump FORMAT_VERSION whenever the solver's heuristics change, so that stale decisions are dropped.
+
+FORMAT_VERSION = 1
+DEFAULT_MAX_ENTRIES = 100_000
+KEY_SIZE = 16
+# How long to wait for another process's write lock, in seconds
+BUSY_TIMEOUT = 5.0
+# Evict every this many insertions, rather than counting entries on every one
+EVICTION_INTERVAL = 256
+
+
+class DecisionCache:
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._num_insertions = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+    # Returns the key of a decision of kind `decision` (e.g. "guess") made in `state`, with arguments `args`.
+    @staticmethod
+    def key(word_list_hash: bytes, state: SolverState, decision: str, *args: object) -> bytes:
+        digest = hashlib.blake2b(digest_size=KEY_SIZE)
+        digest.update(word_list_hash)
+        digest.update(repr((decision, args)).encode())
+        digest.update(state.candidates.to_bytes((state.candidates.bit_length() + 7) // 8, "little"))
+        digest.update(encode_solution_spaces(state.solution_spaces))
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[str]:
+        with self._lock:
+            try:
+                connection = self._connect()
+                row = connection.execute("SELECT value FROM decisions WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    connection.execute("UPDATE decisions SET last_used = ? WHERE key = ?", (time.time(), key))
+            except sqlite3.Error:
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: bytes, value: str) -> None:
+        with self._lock:
+            try:
+                connection = self._connect()
+                connection.execute(
+                    "INSERT OR REPLACE INTO decisions (key, value, last_used) VALUES (?, ?, ?)",
+                    (key, value, time.time()),
+                )
+                self._num_insertions += 1
+                if self._num_insertions % EVICTION_INTERVAL == 0:
+                    self._evict(connection)
+            except sqlite3.Error:
+                pass
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+
+    def evict(self) -> None:
+        with self._lock:
+            self._evict(self._connect())
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        connection.execute(
+            "DELETE FROM decisions WHERE key IN (SELECT key FROM decisions ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    # Returns this process's connection, opening it (and creating or upgrading the database) if needed.
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is not None and self._pid == os.getpid():
+            return self._connection
+        # Autocommit, so that each statement holds the database's write lock as briefly as possible
+        connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode = WAL")
+        # A decision lost in a crash is just recomputed, so commits needn't wait for the disk
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if connection.execute("PRAGMA user_version").fetchone()[0] != FORMAT_VERSION:
+                connection.execute("DROP TABLE IF EXISTS decisions")
+                connection.execute(f"PRAGMA user_version = {FORMAT_VERSION}")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS decisions"
+                " (key BLOB PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS decisions_by_last_used ON decisions (last_used)")
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            connection.close()
+            raise
+        self._connection, self._pid = connection, os.getpid()
+        return connection
@@ -0,0 +1,323 @@
+import argparse
+import json
+import struct
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+from application.clues import correct_clue, decode_clue, encode_clue
+from application.solver import initialize_solution_space, Solver
+from application.word_data import load_word_data, word_list_hash, WORD_LIST_HASH_SIZE
+from application.word_index import get_word_index
+
+
+# A structured record of games, written one event at a time as a game is played, so that a log is usable (and
+# replayable) even if the game never finishes. A log can hold any number of games, one after another. There are two
+# formats with the same events:
+#
+# JSONL, one event per line:
+#   {"event": "start", "word": "shine", "known_char": "s", "word_list_hash": "<hex>"}
+#   {"event": "guess", "guess": "erase"}
+#   {"event": "clue", "clue": "~XX~Y"}
+#   {"event": "check", "position": 0, "is_fact": false}      (0-indexed position)
+#   {"event": "end", "winner": "GUESSER"}
+#
+# Binary, for long headless runs: a header (magic (4 bytes) | format version (uint8)) followed by one record per event,
+# each a tag byte and a fixed-size payload:
+#   start: word (5 ASCII bytes) | known char (1 ASCII byte) | word list hash (16 bytes)
+#   guess: guess (5 ASCII bytes)
+#   clue:  encoded clue (uint8, see `clues.encode_clue`)
+#   check: position (uint8) | is_fact (uint8)
+#   end:   winner (1 ASCII byte, 'G' or 'L')
+#
+# Readers detect the format from the first bytes of the log.
+
+MAGIC = b"FLOG"
+FORMAT_VERSION = 1
+
+_BINARY_HEADER = struct.Struct("<4sB")
+_START = struct.Struct(f"<5sc{WORD_LIST_HASH_SIZE}s")
+_GUESS = struct.Struct("<5s")
+_CLUE = struct.Struct("<B")
+_CHECK = struct.Struct("<BB")
+_END = struct.Struct("<c")
+_TAGS = {"start": 1, "guess": 2, "clue": 3, "check": 4, "end": 5}
+_EVENTS_BY_TAG = {tag: event for event, tag in _TAGS.items()}
+_PAYLOADS = {"start": _START, "guess": _GUESS, "clue": _CLUE, "check": _CHECK, "end": _END}
+_WINNERS = {"GUESSER": b"G", "LIBRARIAN": b"L"}
+_WINNERS_BY_CODE = {code: winner for winner, code in _WINNERS.items()}
+
+
+class GameLogError(Exception):
+    pass
+
+
+@dataclass
+class Turn:
+    guess: str
+    clue: Optional[str] = None
+    # (0-indexed letter position, whether the clue for that letter was true)
+    check: Optional[tuple[int, bool]] = None
+
+
+@dataclass
+class RecordedGame:
+    word: str
+    known_char: str
+    # Hash of the word list the game was played with (see `word_data.word_list_hash`), if known
+    word_list_hash: Optional[bytes] = None
+    turns: list[Turn] = field(default_factory=list)
+    # "GUESSER" or "LIBRARIAN", or None if the log ends before the game does
+    winner: Optional[str] = None
+
+
+# Writes the events of games to a log as they happen. Every event is flushed as soon as it is written.
+class GameLogWriter:
+    def __init__(self, path: str, binary: bool = False):
+        self.binary = binary
+        # Both formats are written as bytes: JSONL lines are encoded as UTF-8
+        self._file: BinaryIO = open(path, "ab")
+        if binary and self._file.tell() == 0:
+            self._file.write(_BINARY_HEADER.pack(MAGIC, FORMAT_VERSION))
+
+    def __enter__(self) -> "GameLogWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def start(self, word: str, known_char: str, word_list: Optional[list[str]] = None) -> None:
+        self._start(word, known_char, word_list_hash(word_list) if word_list is not None else None)
+
+    def _start(self, word: str, known_char: str, list_hash: Optional[bytes]) -> None:
+        list_hash = list_hash or bytes(WORD_LIST_HASH_SIZE)
+        if self.binary:
+            self._write_record("start", word.encode("ascii"), known_char.encode("ascii"), list_hash)
+        else:
+            self._write_line(
+                {"event": "start", "word": word, "known_char": known_char, "word_list_hash": list_hash.hex()})
+
+    def guess(self, guess: str) -> None:
+        if self.binary:
+            self._write_record("guess", guess.encode("ascii"))
+        else:
+            self._write_line({"event": "guess", "guess": guess})
+
+    def clue(self, clue: str) -> None:
+        if self.binary:
+            self._write_record("clue", encode_clue(clue))
+        else:
+            self._write_line({"event": "clue", "clue": clue})
+
+    def check(self, position: int, is_fact: bool) -> None:
+        if self.binary:
+            self._write_record("check", position, is_fact)
+        else:
+            self._write_line({"event": "check", "position": position, "is_fact": is_fact})
+
+    def end(self, winner: str) -> None:
+        if self.binary:
+            self._write_record("end", _WINNERS[winner])
+        else:
+            self._write_line({"event": "end", "winner": winner})
+
+    # Writes a whole game at once, e.g. to convert a game from one format to the other.
+    def write_game(self, game: RecordedGame) -> None:
+        self._start(game.word, game.known_char, game.word_list_hash)
+        for turn in game.turns:
+            self.guess(turn.guess)
+            if turn.clue is not None:
+                self.clue(turn.clue)
+            if turn.check is not None:
+                self.check(*turn.check)
+        if game.winner is not None:
+            self.end(game.winner)
+
+    def _write_line(self, event: dict) -> None:
+        self._file.write((json.dumps(event) + "\n").encode())
+        self._file.flush()
+
+    def _write_record(self, event: str, *values) -> None:
+        self._file.write(bytes([_TAGS[event]]) + _PAYLOADS[event].pack(*values))
+        self._file.flush()
+
+
+# Streams the events in a log as dicts in the JSONL format, whichever format the log is in.
+def read_events(path: str) -> Iterator[dict]:
+    with open(path, "rb") as f:
+        header = f.read(_BINARY_HEADER.size)
+        if header[:len(MAGIC)] == MAGIC:
+            yield from _read_binary_events(f, header)
+            return
+        f.seek(0)
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise GameLogError(f"Line {line_number} is not valid JSON: {e}")
+
+
+def _read_binary_events(f: BinaryIO, header: bytes) -> Iterator[dict]:
+    if len(header) < _BINARY_HEADER.size or _BINARY_HEADER.unpack(header)[1] != FORMAT_VERSION:
+        raise GameLogError("Unsupported game log format version")
+    while tag := f.read(1):
+        event = _EVENTS_BY_TAG.get(tag[0])
+        if event is None:
+            raise GameLogError(f"Unknown event tag {tag[0]}")
+        payload = f.read(_PAYLOADS[event].size)
+        if len(payload) != _PAYLOADS[event].size:
+            raise GameLogError(f"Log ends in the middle of a {event} event")
+        values = _PAYLOADS[event].unpack(payload)
+        if event == "start":
+            word, known_char, list_hash = values
+            yield {"event": event, "word": word.decode("ascii"), "known_char": known_char.decode("ascii"),
+                   "word_list_hash": list_hash.hex()}
+        elif event == "guess":
+            yield {"event": event, "guess": values[0].decode("ascii")}
+        elif event == "clue":
+            yield {"event": event, "clue": decode_clue(values[0])}
+        elif event == "check":
+            yield {"event": event, "position": values[0], "is_fact": bool(values[1])}
+        else:
+            yield {"event": event, "winner": _WINNERS_BY_CODE[values[0]]}
+
+
+# Streams the games in a log. A game that the log ends in the middle of is returned as far as it got.
+def read_games(path: str) -> Iterator[RecordedGame]:
+    return _group_events(read_events(path))
+
+
+def _group_events(events: Iterable[dict]) -> Iterator[RecordedGame]:
+    game: Optional[RecordedGame] = None
+    for event in events:
+        kind = event.get("event")
+        if kind == "start":
+            if game is not None:
+                yield game
+            list_hash = bytes.fromhex(event["word_list_hash"]) if event.get("word_list_hash") else None
+            game = RecordedGame(word=event["word"], known_char=event["known_char"],
+                                word_list_hash=list_hash if list_hash != bytes(WORD_LIST_HASH_SIZE) else None)
+        elif game is None:
+            raise GameLogError(f"A {kind} event came before any game started")
+        elif kind == "guess":
+            game.turns.append(Turn(guess=event["guess"]))
+        elif kind == "clue":
+            _last_turn(game, kind).clue = event["clue"]
+        elif kind == "check":
+            _last_turn(game, kind).check = (event["position"], event["is_fact"])
+        elif kind == "end":
+            game.winner = event["winner"]
+            yield game
+            game = None
+        else:
+            raise GameLogError(f"Unknown event {kind!r}")
+    if game is not None:
+        yield game
+
+
+def _last_turn(game: RecordedGame, kind: str) -> Turn:
+    if not game.turns:
+        raise GameLogError(f"A {kind} event came before any guess")
+    return game.turns[-1]
+
+
+@dataclass(frozen=True)
+class ReplayStep:
+    # The turn's guess, and the guess the solver would have made in its place
+    guess: str
+    solver_guess: str
+    # Number of solution spaces and of candidate words after the turn's clue (and check)
+    num_branches: int
+    num_candidates: int
+    # Whether the secret word is still possible in at least one solution space after the turn. If not, the solver
+    # went wrong on this turn.
+    is_word_possible: bool
+
+
+@dataclass(frozen=True)
+class ReplayResult:
+    game: RecordedGame
+    steps: list[ReplayStep]
+
+    # Returns the (0-indexed) turn after which the solver could no longer find the secret word, or None.
+    def first_wrong_turn(self) -> Optional[int]:
+        return next((t for t, step in enumerate(self.steps) if not step.is_word_possible), None)
+
+
+# Feeds the guesses, clues and checks of `game` to a fresh solver, recording what the solver would have guessed at
+# each turn and whether it still considers the secret word possible afterwards. Nothing is printed and no input is
+# read, so recorded games replay at the solver's full speed. Once a turn leaves no words possible (e.g. because its
+# clue breaks the rules, see `validate_game`), the solver has nothing to guess from, so the replay stops there and
+# that turn is the first wrong one.
+def replay(game: RecordedGame, word_list: Optional[list[str]] = None) -> ReplayResult:
+    word_list = word_list if word_list is not None else load_word_data().words
+    if game.word_list_hash is not None and game.word_list_hash != word_list_hash(word_list):
+        raise GameLogError("The game was played with a different word list")
+    word_id = get_word_index(word_list).word_ids.get(game.word)
+    solver = Solver(word_list, initialize_solution_space(game.known_char))
+    steps = []
+    for turn in game.turns:
+        if turn.clue is None or not solver.solution_spaces:
+            break
+        solver_guess = solver.pick_guess()
+        solver.expand_solution_spaces(turn.guess, encode_clue(turn.clue), turn.check)
+        is_word_possible = word_id is not None and solver.candidates >> word_id & 1 == 1 and any(
+            solver.word_index.matching(solution_space) >> word_id & 1 for solution_space in solver.solution_spaces
+        )
+        steps.append(ReplayStep(
+            guess=turn.guess,
+            solver_guess=solver_guess,
+            num_branches=len(solver.solution_spaces),
+            num_candidates=bin(solver.candidates).count("1"),
+            is_word_possible=is_word_possible,
+        ))
+    return ReplayResult(game=game, steps=steps)
+
+
+# Returns a description of why `game` breaks the rules of Fiction, or None if it doesn't.
+def validate_game(game: RecordedGame) -> Optional[str]:
+    for t, turn in enumerate(game.turns):
+        if turn.clue is None:
+            continue
+        correct = decode_clue(correct_clue(turn.guess, game.word))
+        num_lies = sum(1 for given, truth in zip(turn.clue, correct) if given != truth)
+        if num_lies != 1:
+            return f"Turn {t + 1}: clue {turn.clue} for {turn.guess} has {num_lies} lies"
+        if turn.check is not None:
+            position, is_fact = turn.check
+            if (turn.clue[position] == correct[position]) != is_fact:
+                return f"Turn {t + 1}: the check on position {position + 1} has the wrong result"
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replays the games in a game log through the solver.")
+    parser.add_argument("path", help="game log to replay (JSONL or binary)")
+    parser.add_argument("--convert-to", help="instead of replaying, write the games to this log")
+    parser.add_argument("--binary", action="store_true", help="write the converted log in the binary format")
+    args = parser.parse_args()
+
+    if args.convert_to:
+        with GameLogWriter(args.convert_to, binary=args.binary) as writer:
+            for game in read_games(args.path):
+                writer.write_game(game)
+        return
+
+    for g, game in enumerate(read_games(args.path)):
+        result = replay(game)
+        print(f"Game {g + 1}: {game.word} (known character {game.known_char}), winner: {game.winner}")
+        error = validate_game(game)
+        if error:
+            print(f"  Not a legal game. {error}")
+        for t, step in enumerate(result.steps):
+            note = "" if step.is_word_possible else "  <--- goes wrong here"
+            print(f"  #{t + 1}: {step.guess} (solver: {step.solver_guess}), {step.num_branches} branches, "
+                  f"{step.num_candidates} candidates{note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import argparse
 import random
 import sys
 import time
@@ -6,8 +7,10 @@ from enum import Enum
 from math import floor
 from typing import Optional
 
-from application.solver import initialize_solution_space, Solver
-from application.word_list import word_list
+from application.clues import correct_clue, decode_clue, encode_clue, SINGLE_LIE_VARIANTS
+from application.game_log import GameLogWriter
+from application.solver import Hint, initialize_solution_space, Solver
+from application.word_data import load_word_data
 
 
 # An implementation of https://www.allplay.com/board-games/fiction/:
@@ -33,10 +36,19 @@ class GameState:
     checks: dict[int, tuple[int, bool]]
     known_char: str
 
+    # Returns a description of why `guess` is not a valid guess, or None if it is valid.
+    def validate_guess(self, guess: str) -> Optional[str]:
+        if len(guess) != 5:
+            return "Guess must be 5 letters long"
+        if not all("a" <= c <= "z" for c in guess):
+            return "Guess must only contain the letters a-z"
+        return None
+
     def guess(self, guess: str) -> bool:
         guess = guess.lower()
-        if len(guess) != 5:
-            print("Guess must be 5 letters long")
+        error = self.validate_guess(guess)
+        if error:
+            print(error)
             return False
         self.guesses.append(guess)
         return True
@@ -73,13 +85,12 @@ class GameState:
                         correct_clue += "X"
         return correct_clue
 
-    def clue(self, clue: str) -> bool:
+    # Returns a description of why `clue` is not a valid clue for the most recent guess, or None if it is valid.
+    def validate_clue(self, clue: str) -> Optional[str]:
         if any(c not in "XY~" for c in clue):
-            print("Clue must be a string of X, Y, or ~")
-            return False
+            return "Clue must be a string of X, Y, or ~"
         if len(clue) != 5:
-            print("Clue must be 5 letters long")
-            return False
+            return "Clue must be 5 letters long"
 
         guess = self.guesses[-1]
         # Build up the correct clue from the guess first
@@ -87,7 +98,13 @@ class GameState:
 
         num_lies: int = sum(1 if c != correct_clue[i] else 0 for i, c in enumerate(clue))
         if num_lies != 1:
-            print(f"Clue must contain exactly one lie. Your clue had {num_lies} lies.")
+            return f"Clue must contain exactly one lie. Your clue had {num_lies} lies."
+        return None
+
+    def clue(self, clue: str) -> bool:
+        error = self.validate_clue(clue)
+        if error:
+            print(error)
             return False
 
         self.clues.append(clue)
@@ -96,14 +113,27 @@ class GameState:
     def has_checks_remaining(self) -> bool:
         return len(self.checks) < 3
 
+    # Returns the (0-indexed) position that an automated player checks after the latest clue, or None to skip the
+    # check. We could be smarter here, but instead just check a random letter in every 3rd clue for now.
+    def pick_automated_check(self, rng: random.Random) -> Optional[int]:
+        if not self.has_checks_remaining() or len(self.clues) % 3 != 0:
+            return None
+        return rng.randint(0, 4)
+
+    # Returns a description of why checking the (0-indexed) `position` is not allowed, or None if it is allowed.
+    def validate_check(self, position: int) -> Optional[str]:
+        if len(self.checks) >= 3:
+            return "You're out of fact-or-fiction checks!"
+        if position >=5 or position < 0:
+            return "Position must be between 1 and 5 inclusive"
+        return None
+
     # check the (0-indexed) letter in the most recent clue. Returns the checked position and whether the
     # corresponding clue was true or false (i.e. a lie).
     def check(self, position: int) -> Optional[tuple[int, bool]]:
-        if len(self.checks) >= 3:
-            print("You're out of fact-or-fiction checks!")
-            return None
-        if position >=5 or position < 0:
-            print("Position must be between 1 and 5 inclusive")
+        error = self.validate_check(position)
+        if error:
+            print(error)
             return None
 
         clue = self.clues[-1]
@@ -117,11 +147,20 @@ class GameState:
             self.checks[len(self.guesses) - 1] = (position, True)
         return self.checks[len(self.guesses) - 1]
 
-    def is_game_over(self) -> bool:
+    # Returns the side that has won, or None if the game is still in progress.
+    def winner(self) -> Optional["Side"]:
         if self.guesses and self.guesses[-1] == self.word:
+            return Side.GUESSER
+        if len(self.guesses) >= 10:
+            return Side.LIBRARIAN
+        return None
+
+    def is_game_over(self) -> bool:
+        winner = self.winner()
+        if winner == Side.GUESSER:
             print("Guessers win!")
             return True
-        if len(self.guesses) >= 10:
+        if winner == Side.LIBRARIAN:
             print("Librarian wins!")
             return True
         return False
@@ -154,7 +193,22 @@ class Side(Enum):
     BOTH = 3
 
 
-def play() -> None:
+# The random choices made on behalf of a player. They take the game's random generator, so that a game (or a
+# simulation of many) plays out the same way every time from the same seed. The solver makes no random choices.
+def pick_random_word(word_list: list[str], rng: random.Random) -> str:
+    return word_list[floor(rng.random() * len(word_list))]
+
+
+def pick_known_char(word: str, rng: random.Random) -> str:
+    return word[rng.randint(0, 4)]
+
+
+# If `game_log` is given, the game's events are written to it as they happen (see `game_log`). Every random choice
+# is made with a generator seeded by `seed` (a random seed if None), which is printed so the game can be replayed.
+def play(game_log: Optional[GameLogWriter] = None, seed: Optional[int] = None) -> None:
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    rng = random.Random(seed)
     side: Optional[Side] = None
     while not side:
         try:
@@ -163,16 +217,18 @@ def play() -> None:
         except ValueError:
             print("Invalid input. Please try again.")
             continue
-    print(f"Playing as {side.name}")
+    print(f"Playing as {side.name} (seed {seed})")
     print("----------------------------")
 
+    word_data = load_word_data()
+    word_list = word_data.words
     word: Optional[str] = None
     while not word:
         if side != Side.GUESSER:
             word = input("Librarian, enter a 5 letter word. To use a random word instead, leave blank: ")
 
         if not word or len(word) == 0:
-            word = word_list[floor(random.Random().random() * len(word_list))]
+            word = pick_random_word(word_list, rng)
         elif len(word) != 5:
             word = ""
             print("Word must be 5 letters long. Please try again.\n")
@@ -190,7 +246,7 @@ def play() -> None:
                 known_char = ""
                 print("Known character must be a single character in the word. Please try again.")
     else:
-        known_char = word[random.randint(0, 4)]
+        known_char = pick_known_char(word, rng)
     print(f"Starting clue: `{known_char}` exists in the word.")
     print("----------------------------")
 
@@ -222,27 +278,48 @@ def play() -> None:
 
     initial_solution_space = initialize_solution_space(known_char.lower())
     solver = Solver(word_list, initial_solution_space)
+    if game_log:
+        game_log.start(game_state.word, game_state.known_char, word_list)
 
     while True:
         while True:
             if assistance_level == AssistanceLevel.FULLY_AUTOMATED or side == Side.LIBRARIAN:
                 guess = solver.pick_guess()
+                possible_words = ", ".join(solver.possible_words(page_size=20))
+                print(f"Possible words ({solver.num_possible_words()}): {possible_words}")
                 print(f"Attempt #{len(game_state.guesses) + 1}. The computer's guess: ", guess)
             else:
-                guess = input(f"Attempt #{len(game_state.guesses) + 1}. Guess a word: ")
+                guess = input(f"Attempt #{len(game_state.guesses) + 1}. Guess a word (or ?word for a hint): ")
+                if guess.startswith("?"):
+                    hint_guess = guess[1:].lower()
+                    error = game_state.validate_guess(hint_guess)
+                    if not error and hint_guess not in solver.word_index.word_ids:
+                        error = "Hints are only given for words in the word list"
+                    print(error if error else format_hint(solver.hint(hint_guess)))
+                    continue
             if game_state.guess(guess):
                 break
+        if game_log:
+            game_log.guess(game_state.guesses[-1])
         if game_state.is_game_over():
+            winner = game_state.winner()
+            if game_log and winner is not None:
+                game_log.end(winner.name)
             break
 
         while True:
             if assistance_level == AssistanceLevel.FULLY_AUTOMATED or side == Side.GUESSER:
-                clue = solver.pick_clue(game_state.generate_correct_clue(guess), guess)
+                correct = correct_clue(guess, game_state.word)
+                picked = solver.pick_clue(correct, guess)
+                # No lie leaves any word possible, so any lie will do
+                clue = decode_clue(picked if picked is not None else SINGLE_LIE_VARIANTS[correct][0])
                 print("The computer's clue: ", clue)
             else:
                 clue = input("Enter a clue: ")
             if game_state.clue(clue):
                 break
+        if game_log:
+            game_log.clue(game_state.clues[-1])
 
         fact_or_fiction_check = None
         if game_state.has_checks_remaining():
@@ -251,18 +328,46 @@ def play() -> None:
                               " (e.g. 1, 2, 3). Leave blank to skip: ")
             # Choose whether to fact-or-fiction check because AssistanceLevel.FULLY_AUTOMATED or side == Side.LIBRARIAN
             else:
-                # We could be smarter here, but instead just check a random letter in every 3rd clue for now.
-                if len(game_state.clues) % 3 == 0:
-                    check = random.randint(1,5)
+                position = game_state.pick_automated_check(rng)
+                check = str(position + 1) if position is not None else ""
+                if check:
                     print(f"Automatically checking position {check}")
-                else:
-                    check = None
             if check:
                 fact_or_fiction_check = game_state.check(int(check) - 1)
+                if game_log and fact_or_fiction_check:
+                    game_log.check(*fact_or_fiction_check)
 
-        solver.expand_solution_spaces(guess, clue, fact_or_fiction_check)
+        solver.expand_solution_spaces(guess, encode_clue(clue), fact_or_fiction_check)
         print(game_state)
 
 
+# Number of clues shown by `format_hint`
+NUM_HINT_CLUES = 5
+
+
+def format_hint(hint: Hint) -> str:
+    lines = [
+        f"If you guess `{hint.guess}`, the librarian could give {len(hint.remaining_by_clue)} different clues.",
+        f"Words remaining: {hint.expected_remaining:.1f} expected, {hint.worst_case_remaining} at worst.",
+        f"Chance that `{hint.guess}` is the secret word: {hint.win_probability:.1%}",
+    ]
+    if hint.remaining_by_clue:
+        lines.append("Most likely clues:")
+        most_likely = sorted(hint.probability_by_clue, key=lambda clue: -hint.probability_by_clue[clue])
+        for clue in most_likely[:NUM_HINT_CLUES]:
+            lines.append(f"  {decode_clue(clue)} ({hint.probability_by_clue[clue]:.1%}): "
+                         f"{hint.remaining_by_clue[clue]} words remaining")
+    return "\n".join(lines)
+
+
 if __name__ == "__main__":
-    play()
+    parser = argparse.ArgumentParser(description="Plays a game of Fiction.")
+    parser.add_argument("--log", help="append the game's events to this game log")
+    parser.add_argument("--binary-log", action="store_true", help="write the game log in the compact binary format")
+    parser.add_argument("--seed", type=int, default=None, help="seed for every random choice, to replay a game")
+    args = parser.parse_args()
+    if args.log:
+        with GameLogWriter(args.log, binary=args.binary_log) as log:
+            play(log, args.seed)
+    else:
+        play(seed=args.seed)
@@ -0,0 +1,47 @@
+import sys
+import types
+from typing import Any, Optional
+
+
+# Returns the number of bytes used by `obj` and everything reachable from it, counting shared objects only once.
+# Objects whose ids are in `exclude` (e.g. a word list that is shared between every solver) are not counted, and
+# neither are interned singletons (small ints, single-character strings, None, booleans) or module-level objects
+# like classes and functions, which are free to reference.
+def deep_getsizeof(obj: Any, exclude: Optional[set[int]] = None) -> int:
+    seen: set[int] = set(exclude) if exclude else set()
+    size = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or _is_shared(current):
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif isinstance(current, (str, bytes, bytearray, int, float)):
+            continue
+        else:
+            instance_dict = getattr(current, "__dict__", None)
+            if instance_dict is not None:
+                stack.append(instance_dict)
+            for cls in type(current).__mro__:
+                slots = getattr(cls, "__slots__", ())
+                for slot in (slots,) if isinstance(slots, str) else slots:
+                    if hasattr(current, slot):
+                        stack.append(getattr(current, slot))
+    return size
+
+
+def _is_shared(obj: Any) -> bool:
+    if obj is None or isinstance(obj, (bool, type, types.ModuleType, types.FunctionType)):
+        return True
+    if type(obj) is int:
+        return -5 <= obj <= 256
+    if type(obj) is str:
+        return len(obj) <= 1
+    return False
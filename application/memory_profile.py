@@ -0,0 +1,140 @@
+import argparse
+import json
+import tracemalloc
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from application.memory import deep_getsizeof
+from application.solver import Solver
+from application.tournament import CellResult, play_game, sample_words
+from application.word_data import load_word_data
+
+# Opt-in memory profiling of simulated games (see `tournament.play_game`), to put numbers on how much memory branch
+# explosion costs:
+#
+#   python application/memory_profile.py --num-words 20 --seed 1
+#
+# Peaks are measured with `tracemalloc`, which slows allocation-heavy code down several-fold, so it only traces while
+# a game is being profiled. Each game is first played untraced, so that the caches every game in the process shares
+# (the word index, guess partitions and opening guesses) are warm and only the game's own memory is counted, whatever
+# ran before it. Retained memory is the deep size of the solver's state (see `memory.deep_getsizeof`),
+# which includes the states it can be undone to.
+#
+# tests/memory_budget.json holds a fixed set of adversarial games and the most memory they may use, which
+# tests/test_memory_budget.py checks. After a change that is meant to use more memory, rewrite it with `--write-budget`.
+
+# How far over the measured usage a written budget is
+BUDGET_HEADROOM = 1.25
+
+
+@dataclass(frozen=True)
+class TurnMemory:
+    num_branches: int
+    # Most memory allocated at once during the turn, over what was allocated when it started, in bytes
+    peak_bytes: int
+    # Size of the solver state after the turn, in bytes
+    retained_bytes: int
+    # Size of the turn's solution spaces, per branch
+    bytes_per_branch: float
+
+
+@dataclass(frozen=True)
+class GameMemoryProfile:
+    word: str
+    turns: list[TurnMemory]
+
+    @property
+    def peak_bytes(self) -> int:
+        return max((turn.peak_bytes for turn in self.turns), default=0)
+
+    @property
+    def retained_bytes(self) -> int:
+        return max((turn.retained_bytes for turn in self.turns), default=0)
+
+
+# Plays a game like `tournament.play_game` does, recording the memory used by every turn.
+def profile_game(
+        word_list: list[str], word: str, seed: int = 0, guesser: str = "branches", librarian: str = "branches"
+) -> GameMemoryProfile:
+    # Games are deterministic, so this warms exactly the caches that the profiled game uses
+    play_game(word_list, word, seed, CellResult(guesser, librarian))
+    turns = []
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    turn_start = tracemalloc.get_traced_memory()[0]
+
+    def on_turn(solver: Solver) -> None:
+        nonlocal turn_start
+        peak = tracemalloc.get_traced_memory()[1]
+        num_branches = len(solver.solution_spaces)
+        turns.append(TurnMemory(
+            num_branches=num_branches,
+            peak_bytes=peak - turn_start,
+            retained_bytes=deep_getsizeof(solver.state),
+            bytes_per_branch=deep_getsizeof(solver.solution_spaces) / num_branches if num_branches else 0.0,
+        ))
+        # Measuring allocates too, so the next turn starts afterwards
+        tracemalloc.reset_peak()
+        turn_start = tracemalloc.get_traced_memory()[0]
+
+    try:
+        tracemalloc.reset_peak()
+        play_game(word_list, word, seed, CellResult(guesser, librarian), on_turn)
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return GameMemoryProfile(word=word, turns=turns)
+
+
+def profile_games(
+        words: Sequence[str], seed: int = 0, guesser: str = "branches", librarian: str = "branches",
+        word_list: Optional[list[str]] = None,
+) -> list[GameMemoryProfile]:
+    word_list = word_list if word_list is not None else load_word_data().words
+    return [profile_game(word_list, word, seed, guesser, librarian) for word in words]
+
+
+def format_profiles(profiles: Sequence[GameMemoryProfile]) -> str:
+    lines = [f"{'word':<8}{'turn':>6}{'branches':>10}{'peak KB':>10}{'retained KB':>13}{'bytes/branch':>14}"]
+    for profile in profiles:
+        for t, turn in enumerate(profile.turns):
+            lines.append(f"{profile.word:<8}{t + 1:>6}{turn.num_branches:>10}{turn.peak_bytes / 1024:>10.1f}"
+                         f"{turn.retained_bytes / 1024:>13.1f}{turn.bytes_per_branch:>14.0f}")
+    return "\n".join(lines)
+
+
+# Returns a budget for `profiles`, in the format of tests/memory_budget.json.
+def make_budget(profiles: Sequence[GameMemoryProfile], seed: int, guesser: str, librarian: str) -> dict:
+    return {
+        "seed": seed,
+        "guesser": guesser,
+        "librarian": librarian,
+        "words": [profile.word for profile in profiles],
+        "max_peak_bytes": int(max(profile.peak_bytes for profile in profiles) * BUDGET_HEADROOM),
+        "max_retained_bytes": int(max(profile.retained_bytes for profile in profiles) * BUDGET_HEADROOM),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Profiles the memory used by every turn of simulated games.")
+    parser.add_argument("words", nargs="*", help="secret words to play (a seeded sample by default)")
+    parser.add_argument("--num-words", type=int, default=10, help="number of words to sample")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--guesser", default="branches")
+    parser.add_argument("--librarian", default="branches")
+    parser.add_argument("--write-budget", help="write a memory budget for these games to this file")
+    args = parser.parse_args()
+
+    word_list = load_word_data().words
+    words = args.words or sample_words(word_list, args.num_words, args.seed)
+    profiles = profile_games(words, args.seed, args.guesser, args.librarian, word_list)
+    print(format_profiles(profiles))
+    if args.write_budget:
+        with open(args.write_budget, "w") as f:
+            json.dump(make_budget(profiles, args.seed, args.guesser, args.librarian), f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
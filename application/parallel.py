@@ -0,0 +1,148 @@
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from multiprocessing import shared_memory
+from typing import Iterator, Optional, Sequence
+
+from application.serialization import decode_solution_spaces, encode_solution_spaces
+from application.solver import SolutionSpace, Solver, SolverCancelledError
+from application.word_data import decode_word_data, encode_word_data, WordData, WORD_LIST_HASH_SIZE
+from application.word_index import WordIndex
+
+
+# Opt-in process parallelism for solvers with many branches (see `Solver.use_parallel`). Branches are split into
+# contiguous chunks that are handed to a process pool in the compact encoding from `serialization`, and the results are
+# merged back in chunk order, so that the solver ends up exactly as it would have serially.
+#
+# The word tables each worker needs are published once, in the packed word list format (see `word_data`), in a
+# `multiprocessing.shared_memory` block that workers index from when they start, rather than being pickled for every
+# task. The clue tables are module-level constants that every process builds on import, so they aren't shared.
+#
+# Shipping a branch to a worker and back costs ~50us, which is far less than expanding it (~350us), but more than
+# counting its words for `Solver.pick_guess` (~30us). So only expansion is parallelized, and only once there are
+# enough branches to pay for the round trip to the pool, which also costs ~1.5ms per expansion. By those numbers, 2
+# workers break even at ~13 branches and 4 at ~8.
+#
+# Games on the default word list rarely get that wide: over 120 simulated games, the median expansion was of 2
+# branches, the 99th percentile of 9 and the widest of 20. So the pool is only worth starting for wider games, e.g.
+# with a larger word list or less informative clues.
+
+DEFAULT_EXPAND_THRESHOLD = 16
+# Branches are split into this many chunks per worker, so that a slow chunk doesn't hold up the others for long
+CHUNKS_PER_WORKER = 4
+# How often to check whether a computation has been cancelled while waiting for workers, in seconds
+CANCEL_POLL_INTERVAL = 0.01
+
+# Set in each worker process by `_init_worker`
+_worker_word_index: Optional[WordIndex] = None
+
+
+class ParallelSolverPool:
+    def __init__(
+            self,
+            word_index: WordIndex,
+            num_workers: Optional[int] = None,
+            expand_threshold: int = DEFAULT_EXPAND_THRESHOLD,
+    ):
+        self.word_index = word_index
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.expand_threshold = expand_threshold
+        word_data = WordData(
+            words=list(word_index.words),
+            letter_to_freq=dict(word_index.letter_to_freq),
+            position_index=[list(row) for row in word_index.position_bitsets],
+            hash=word_index.hash,
+        )
+        data = encode_word_data(word_data, bytes(WORD_LIST_HASH_SIZE))
+        self._shared_word_data = shared_memory.SharedMemory(create=True, size=len(data))
+        self._shared_word_data.buf[:len(data)] = data
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            initializer=_init_worker,
+            initargs=(self._shared_word_data.name, len(data)),
+        )
+
+    def __enter__(self) -> "ParallelSolverPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(cancel_futures=True)
+        self._shared_word_data.close()
+        self._shared_word_data.unlink()
+
+    def should_expand(self, num_branches: int) -> bool:
+        return num_branches >= self.expand_threshold
+
+    # Equivalent to expanding every branch with `Solver.expand_solution_space` and dropping the branches that don't
+    # contain any of `candidates`.
+    def expand(
+            self,
+            solution_spaces: Sequence[SolutionSpace],
+            guess: str, clue: int,
+            fact_or_fiction_check: Optional[tuple[int, bool]],
+            candidates: int,
+            cancel: Optional[threading.Event] = None,
+    ) -> list[SolutionSpace]:
+        futures = [
+            self._executor.submit(_expand_chunk, chunk, guess, clue, fact_or_fiction_check, candidates)
+            for chunk in self._chunks(solution_spaces)
+        ]
+        new_solution_spaces = []
+        for data in self._results(futures, cancel):
+            new_solution_spaces += decode_solution_spaces(data)
+        return new_solution_spaces
+
+    def _chunks(self, solution_spaces: Sequence[SolutionSpace]) -> list[bytes]:
+        num_chunks = self.num_workers * CHUNKS_PER_WORKER
+        chunk_size = max(1, -(-len(solution_spaces) // num_chunks))
+        return [
+            encode_solution_spaces(solution_spaces[start:start + chunk_size])
+            for start in range(0, len(solution_spaces), chunk_size)
+        ]
+
+    # Yields the results of `futures` in order. If `cancel` is set while waiting, the remaining futures are cancelled
+    # and `SolverCancelledError` is raised.
+    @staticmethod
+    def _results(futures: list[Future], cancel: Optional[threading.Event]) -> Iterator[bytes]:
+        try:
+            for future in futures:
+                result = None
+                while result is None:
+                    if cancel is not None and cancel.is_set():
+                        raise SolverCancelledError()
+                    try:
+                        result = future.result(timeout=None if cancel is None else CANCEL_POLL_INTERVAL)
+                    # Not the builtin TimeoutError before Python 3.11
+                    except FutureTimeoutError:
+                        continue
+                yield result
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def _init_worker(shared_word_data_name: str, size: int) -> None:
+    global _worker_word_index
+    # Workers share the parent's resource tracker, so attaching here doesn't make the block outlive the parent
+    shared_word_data = shared_memory.SharedMemory(name=shared_word_data_name)
+    try:
+        _worker_word_index = WordIndex.from_word_data(decode_word_data(bytes(shared_word_data.buf[:size])))
+    finally:
+        shared_word_data.close()
+
+
+def _expand_chunk(
+        data: bytes, guess: str, clue: int, fact_or_fiction_check: Optional[tuple[int, bool]], candidates: int
+) -> bytes:
+    new_solution_spaces = []
+    for solution_space in decode_solution_spaces(data):
+        new_solution_spaces += Solver.expand_solution_space(solution_space, guess, clue, fact_or_fiction_check)
+    word_index = _worker_word_index
+    assert word_index is not None, "Worker was not initialized by _init_worker"
+    return encode_solution_spaces([
+        solution_space for solution_space in new_solution_spaces if word_index.matching(solution_space) & candidates
+    ])
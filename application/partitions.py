@@ -0,0 +1,153 @@
+import os
+import struct
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from application.clues import correct_clues_for_guess, NUM_PATTERNS
+from application.word_data import WORD_LIST_HASH_SIZE
+from application.word_index import WordIndex
+
+
+# How a guess partitions the word list by the clue a truthful librarian would give for it. The partition for a guess
+# is a tuple of 243 word bitsets (see `WordIndex`), one per encoded clue, and is the same in every game, so partitions
+# are cached per word index and shared by every solver in the process. With a partition in hand, the words that are
+# consistent with a clue containing one lie are just the OR of the bitsets for the clues it could have been lied from.
+#
+# The cache keeps the `max_guesses` most recently used partitions. It can be saved to and warm-started from disk,
+# where each guess is stored as one clue byte per word rather than as bitsets, which would be ~30x larger:
+#
+#   header:  magic (4 bytes) | format version (uint8) | word list hash (16 bytes) | number of words N (uint32)
+#            | number of guesses G (uint32)
+#   guesses: G * (guess (5 ASCII bytes) | N clue bytes)
+
+MAGIC = b"FPRT"
+FORMAT_VERSION = 1
+DEFAULT_MAX_GUESSES = 4096
+
+_HEADER = struct.Struct(f"<4sB{WORD_LIST_HASH_SIZE}sII")
+
+
+class PartitionCacheError(Exception):
+    pass
+
+
+def _build_partition(patterns: Iterable[int]) -> tuple[int, ...]:
+    ids_by_pattern: list[list[int]] = [[] for _ in range(NUM_PATTERNS)]
+    for k, pattern in enumerate(patterns):
+        ids_by_pattern[pattern].append(k)
+    partition = []
+    for ids in ids_by_pattern:
+        bitset = 0
+        for k in ids:
+            bitset |= 1 << k
+        partition.append(bitset)
+    return tuple(partition)
+
+
+class PartitionCache:
+    def __init__(self, word_index: WordIndex, max_guesses: int = DEFAULT_MAX_GUESSES):
+        self.word_index = word_index
+        self.max_guesses = max_guesses
+        # Ordered from least to most recently used. Values are (partition, clue for each word id).
+        self._partitions: OrderedDict[str, tuple[tuple[int, ...], bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._partitions)
+
+    def __contains__(self, guess: str) -> bool:
+        return guess in self._partitions
+
+    # Returns a 243-element tuple, mapping each encoded clue to the bitset of words for which `guess` gets that clue.
+    def get(self, guess: str) -> tuple[int, ...]:
+        with self._lock:
+            cached = self._partitions.get(guess)
+            if cached is not None:
+                self._partitions.move_to_end(guess)
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+        # Computed outside of the lock, so that threads partitioning different guesses don't wait on each other
+        patterns = bytes(correct_clues_for_guess(guess, self.word_index.words, self.word_index.letter_masks))
+        partition = _build_partition(patterns)
+        self._insert(guess, partition, patterns)
+        return partition
+
+    # Returns the bitset of words that are consistent with `guess` having been given any of `clues`.
+    def consistent_words(self, guess: str, clues: Iterable[int]) -> int:
+        partition = self.get(guess)
+        words = 0
+        for clue in clues:
+            words |= partition[clue]
+        return words
+
+    def _insert(self, guess: str, partition: tuple[int, ...], patterns: bytes) -> None:
+        with self._lock:
+            self._partitions[guess] = (partition, patterns)
+            self._partitions.move_to_end(guess)
+            while len(self._partitions) > self.max_guesses:
+                self._partitions.popitem(last=False)
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            entries = [(guess, patterns) for guess, (_, patterns) in self._partitions.items()]
+        header = _HEADER.pack(MAGIC, FORMAT_VERSION, self.word_index.hash, len(self.word_index), len(entries))
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            for guess, patterns in entries:
+                f.write(guess.encode("ascii"))
+                f.write(patterns)
+        os.replace(tmp_path, path)
+
+    # Loads the partitions saved at `path`. Returns the number of partitions loaded.
+    def load(self, path: str) -> int:
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            raise PartitionCacheError("Data is too short to contain a partition cache")
+        magic, version, list_hash, num_words, num_guesses = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise PartitionCacheError("Data is not a partition cache")
+        if version != FORMAT_VERSION:
+            raise PartitionCacheError(f"Unsupported partition cache format version {version}")
+        if list_hash != self.word_index.hash or num_words != len(self.word_index):
+            raise PartitionCacheError("Partition cache was computed with a different word list")
+        record_size = 5 + num_words
+        if len(data) != _HEADER.size + num_guesses * record_size:
+            raise PartitionCacheError("Partition cache has an unexpected length")
+
+        # Only load as many as fit, keeping the most recently used ones (which are saved last)
+        first = max(0, num_guesses - self.max_guesses)
+        for g in range(first, num_guesses):
+            offset = _HEADER.size + g * record_size
+            guess = data[offset:offset + 5].decode("ascii")
+            patterns = data[offset + 5:offset + record_size]
+            self._insert(guess, _build_partition(patterns), patterns)
+        return num_guesses - first
+
+
+_registry: dict[bytes, PartitionCache] = {}
+_registry_lock = threading.Lock()
+
+
+# Returns the partition cache shared by every solver using `word_index`. If `warm_start_path` is given and the cache
+# hasn't been created yet, it is pre-populated from that file (if the file exists and is valid).
+def get_partition_cache(word_index: WordIndex, warm_start_path: Optional[str] = None) -> PartitionCache:
+    cache = _registry.get(word_index.hash)
+    if cache is not None:
+        return cache
+    with _registry_lock:
+        cache = _registry.get(word_index.hash)
+        if cache is None:
+            cache = PartitionCache(word_index)
+            if warm_start_path is not None:
+                try:
+                    cache.load(warm_start_path)
+                except (OSError, PartitionCacheError):
+                    pass
+            _registry[word_index.hash] = cache
+        return cache
@@ -0,0 +1,259 @@
+import argparse
+import math
+import os
+import sqlite3
+import subprocess
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence, TYPE_CHECKING
+
+from application.clues import decode_clue
+
+if TYPE_CHECKING:
+    from application.tournament import PlayedGame
+
+# A local SQLite database of simulated games (see `tournament`), so that the solver's performance can be tracked from
+# one version to the next without parsing logs:
+#
+#   python application/tournament.py --words 100 --results results.db
+#   python application/results_store.py results.db
+#
+# Every simulation is a run, tagged with the version of the solver it ran (the git commit, by default). A run has
+# games, a game has turns, and a turn has the timings of the operations it took ("guess", "clue" and "expand"). Games
+# are written in batches of `BATCH_SIZE`, each in one transaction.
+
+SCHEMA_VERSION = 1
+BATCH_SIZE = 500
+DEFAULT_PERCENTILES = (50, 90, 99)
+OPERATIONS = ("guess", "clue", "expand")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    solver_version TEXT NOT NULL,
+    seed INTEGER,
+    description TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_solver_version ON runs (solver_version);
+
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    word TEXT NOT NULL,
+    known_char TEXT NOT NULL,
+    guesser TEXT NOT NULL,
+    librarian TEXT NOT NULL,
+    won INTEGER NOT NULL,
+    num_attempts INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_run ON games (run_id, guesser, librarian);
+
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY,
+    game_id INTEGER NOT NULL REFERENCES games (id),
+    turn INTEGER NOT NULL,
+    guess TEXT NOT NULL,
+    clue TEXT,
+    check_position INTEGER,
+    check_is_fact INTEGER,
+    num_branches INTEGER,
+    representation TEXT
+);
+CREATE INDEX IF NOT EXISTS turns_by_game ON turns (game_id);
+
+CREATE TABLE IF NOT EXISTS timings (
+    turn_id INTEGER NOT NULL REFERENCES turns (id),
+    operation TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS timings_by_turn ON timings (turn_id, operation);
+"""
+
+# Selects the games of every run of a solver version, optionally narrowed to one guesser and librarian strategy
+_FROM_GAMES = "FROM runs JOIN games ON games.run_id = runs.id"
+_WHERE_GAMES = (
+    "WHERE runs.solver_version = ? AND (? IS NULL OR games.guesser = ?) AND (? IS NULL OR games.librarian = ?)"
+)
+
+
+class ResultsStoreError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class WinRate:
+    num_games: int
+    num_wins: int
+
+    @property
+    def win_rate(self) -> float:
+        return self.num_wins / self.num_games if self.num_games else 0.0
+
+
+# Returns the git commit of the working tree (with "-dirty" if it has uncommitted changes), or "unknown" outside of
+# a git checkout.
+def current_solver_version() -> str:
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=repo, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=repo, capture_output=True, text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if status.strip() else commit
+
+
+class ResultsStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            raise ResultsStoreError(f"Unsupported results store schema version {version}")
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+            self._connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def __enter__(self) -> "ResultsStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    # Starts a run and returns its id.
+    def start_run(
+            self, solver_version: Optional[str] = None, seed: Optional[int] = None, description: Optional[str] = None
+    ) -> int:
+        with self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO runs (started_at, solver_version, seed, description) VALUES (?, ?, ?, ?)",
+                (time.time(), solver_version or current_solver_version(), seed, description),
+            )
+        if cursor.lastrowid is None:
+            raise ResultsStoreError("The run was not recorded")
+        return cursor.lastrowid
+
+    def record_games(self, run_id: int, games: Iterable["PlayedGame"]) -> None:
+        games = list(games)
+        for start in range(0, len(games), BATCH_SIZE):
+            with self._connection:
+                for game in games[start:start + BATCH_SIZE]:
+                    self._insert_game(run_id, game)
+
+    def _insert_game(self, run_id: int, game: "PlayedGame") -> None:
+        game_id = self._connection.execute(
+            "INSERT INTO games (run_id, word, known_char, guesser, librarian, won, num_attempts)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (run_id, game.word, game.known_char, game.guesser, game.librarian, game.won, len(game.turns)),
+        ).lastrowid
+        timings = []
+        for t, turn in enumerate(game.turns):
+            check_position, check_is_fact = turn.check if turn.check is not None else (None, None)
+            turn_id = self._connection.execute(
+                "INSERT INTO turns"
+                " (game_id, turn, guess, clue, check_position, check_is_fact, num_branches, representation)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (game_id, t + 1, turn.guess, decode_clue(turn.clue) if turn.clue is not None else None,
+                 check_position, check_is_fact, turn.num_branches, turn.representation),
+            ).lastrowid
+            for operation, seconds in zip(OPERATIONS, (turn.guess_seconds, turn.clue_seconds, turn.expand_seconds)):
+                if seconds is not None:
+                    timings.append((turn_id, operation, seconds))
+        self._connection.executemany("INSERT INTO timings (turn_id, operation, seconds) VALUES (?, ?, ?)", timings)
+
+    def solver_versions(self) -> list[str]:
+        rows = self._connection.execute(
+            "SELECT solver_version FROM runs GROUP BY solver_version ORDER BY MIN(started_at)").fetchall()
+        return [row[0] for row in rows]
+
+    def win_rate(self, solver_version: str, guesser: Optional[str] = None, librarian: Optional[str] = None) -> WinRate:
+        num_games, num_wins = self._connection.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(games.won), 0) {_FROM_GAMES} {_WHERE_GAMES}",
+            (solver_version, guesser, guesser, librarian, librarian),
+        ).fetchone()
+        return WinRate(num_games=num_games, num_wins=num_wins)
+
+    # Returns a map from number of attempts to the number of games that took that many, in order of attempts.
+    def attempts_distribution(
+            self, solver_version: str, guesser: Optional[str] = None, librarian: Optional[str] = None
+    ) -> dict[int, int]:
+        rows = self._connection.execute(
+            f"SELECT games.num_attempts, COUNT(*) {_FROM_GAMES} {_WHERE_GAMES}"
+            " GROUP BY games.num_attempts ORDER BY games.num_attempts",
+            (solver_version, guesser, guesser, librarian, librarian),
+        ).fetchall()
+        return dict(rows)
+
+    # Returns a map from each representation that guesses were counted in (see `Solver.search_suggestions`) to the
+    # number of guesses picked while the solver was in it.
+    def representations(
+            self, solver_version: str, guesser: Optional[str] = None, librarian: Optional[str] = None
+    ) -> dict[str, int]:
+        rows = self._connection.execute(
+            f"SELECT turns.representation, COUNT(*) {_FROM_GAMES} JOIN turns ON turns.game_id = games.id"
+            f" {_WHERE_GAMES} AND turns.representation IS NOT NULL"
+            " GROUP BY turns.representation ORDER BY turns.representation",
+            (solver_version, guesser, guesser, librarian, librarian),
+        ).fetchall()
+        return dict(rows)
+
+    # Returns a map from each percentile in `percentiles` to the latency of `operation` (one of `OPERATIONS`) at that
+    # percentile, in seconds, using the nearest-rank method. Empty if there are no timings.
+    def latency_percentiles(
+            self,
+            solver_version: str,
+            operation: str,
+            percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+            guesser: Optional[str] = None,
+            librarian: Optional[str] = None,
+    ) -> dict[float, float]:
+        rows = self._connection.execute(
+            f"SELECT timings.seconds {_FROM_GAMES}"
+            " JOIN turns ON turns.game_id = games.id JOIN timings ON timings.turn_id = turns.id"
+            f" {_WHERE_GAMES} AND timings.operation = ? ORDER BY timings.seconds",
+            (solver_version, guesser, guesser, librarian, librarian, operation),
+        ).fetchall()
+        if not rows:
+            return {}
+        return {p: rows[min(len(rows) - 1, max(0, math.ceil(len(rows) * p / 100) - 1))][0] for p in percentiles}
+
+
+def format_report(store: ResultsStore, solver_versions: Sequence[str]) -> str:
+    lines = []
+    for solver_version in solver_versions:
+        win_rate = store.win_rate(solver_version)
+        lines.append(f"Solver version {solver_version}: {win_rate.num_games} games, {win_rate.win_rate:.1%} won")
+        distribution = store.attempts_distribution(solver_version)
+        lines.append("  attempts: " + ", ".join(f"{attempts}: {count}" for attempts, count in distribution.items()))
+        representations = store.representations(solver_version)
+        if representations:
+            lines.append("  guesses counted in: " + ", ".join(
+                f"{representation}: {count}" for representation, count in representations.items()))
+        for operation in OPERATIONS:
+            latencies = store.latency_percentiles(solver_version, operation)
+            if latencies:
+                lines.append(f"  {operation} latency: " + ", ".join(
+                    f"p{p:g} {seconds * 1000:.2f}ms" for p, seconds in latencies.items()))
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reports on the simulations in a results store.")
+    parser.add_argument("path", help="results store to report on")
+    parser.add_argument("--solver-version", nargs="*", help="solver versions to report on (all by default)")
+    args = parser.parse_args()
+    with ResultsStore(args.path) as store:
+        print(format_report(store, args.solver_version or store.solver_versions()))
+
+
+if __name__ == "__main__":
+    main()
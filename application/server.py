@@ -0,0 +1,494 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import time
+import uuid
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from http import HTTPStatus
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+from urllib.parse import parse_qsl
+
+from application.clues import correct_clue, decode_clue, SINGLE_LIE_VARIANTS
+from application.decision_cache import DecisionCache
+from application.main import GameState, pick_known_char, pick_random_word
+from application.partitions import get_partition_cache
+from application.session_store import Session, SessionStore
+from application.solver import (
+    Hint, initialize_solution_space, SearchResult, set_default_decision_cache, Solver, Suggestion,
+)
+from application.word_data import load_word_data, WordData
+from application.word_index import get_word_index
+
+
+# A JSON-over-HTTP service that lets clients play Fiction against the solver. It only depends on the standard
+# library: a minimal HTTP/1.1 parser (with keep-alive) sits on top of `asyncio` streams, and the blocking `Solver`
+# calls are offloaded to an executor so the event loop stays responsive while a game's branches are expanded.
+#
+# Endpoints:
+#   POST   /games                     {"word"?: str, "known_char"?: str} -> {"game_id", "known_char"}
+#   GET    /games/<id>                                                    -> the public state of the game
+#   DELETE /games/<id>
+#   POST   /games/<id>/guesses        {"guess": str}                      -> {"attempt", "correct", "winner"}
+#   POST   /games/<id>/clues          {"clue": str}                       -> {"clue"}
+#   POST   /games/<id>/checks         {"position": int (0-indexed)}       -> {"position", "is_fact"}
+#   GET    /games/<id>/next-guess?time_limit_ms=<int>                     -> {"guess", "complete"}
+#   GET    /games/<id>/next-clue?time_limit_ms=<int>                      -> {"clue", "complete"}
+#   GET    /games/<id>/suggestions?k=<int>                                -> {"suggestions": [...]}, best first
+#   GET    /games/<id>/possible-words?page=<int>&page_size=<int>          -> {"words", "total"}
+#   GET    /games/<id>/hint?guess=<str>                                   -> the outcomes of that guess (see `Hint`)
+#
+# `time_limit_ms` bounds how long the solver searches for, counted from when the request is received. If the search
+# is cut short, the best answer found so far is returned with "complete": false.
+
+DEFAULT_HOST = "0.0.0.0"
+DEFAULT_PORT = 5808
+MAX_HEADER_SIZE = 8 * 1024
+MAX_BODY_SIZE = 64 * 1024
+MAX_SUGGESTIONS = 100
+MAX_PAGE_SIZE = 500
+MAX_TIME_LIMIT_MS = 60 * 1000
+# How often idle sessions are evicted from memory, in seconds
+EVICTION_INTERVAL = 10
+
+
+class HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+Handler = Callable[..., Awaitable[tuple[HTTPStatus, Any]]]
+
+
+class SolverServer:
+    def __init__(
+            self,
+            executor: Optional[Executor] = None,
+            sessions: Optional[SessionStore] = None,
+            word_data: Optional[WordData] = None,
+            rng: Optional[random.Random] = None,
+    ):
+        # Picks the words and known characters of games that don't specify them
+        self.rng = rng or random.Random()
+        self.executor = executor or ThreadPoolExecutor(max_workers=os.cpu_count())
+        self.word_data = word_data or load_word_data()
+        self.sessions = sessions or SessionStore(self.word_data.words)
+        self.routes: list[tuple[str, re.Pattern, Handler]] = [
+            ("POST", re.compile(r"^/games$"), self.create_game),
+            ("GET", re.compile(r"^/games/(?P<game_id>[\w-]+)$"), self.get_game),
+            ("DELETE", re.compile(r"^/games/(?P<game_id>[\w-]+)$"), self.delete_game),
+            ("POST", re.compile(r"^/games/(?P<game_id>[\w-]+)/guesses$"), self.submit_guess),
+            ("POST", re.compile(r"^/games/(?P<game_id>[\w-]+)/clues$"), self.submit_clue),
+            ("POST", re.compile(r"^/games/(?P<game_id>[\w-]+)/checks$"), self.submit_check),
+            ("GET", re.compile(r"^/games/(?P<game_id>[\w-]+)/next-guess$"), self.next_guess),
+            ("GET", re.compile(r"^/games/(?P<game_id>[\w-]+)/next-clue$"), self.next_clue),
+            ("GET", re.compile(r"^/games/(?P<game_id>[\w-]+)/suggestions$"), self.suggestions),
+            ("GET", re.compile(r"^/games/(?P<game_id>[\w-]+)/possible-words$"), self.possible_words),
+            ("GET", re.compile(r"^/games/(?P<game_id>[\w-]+)/hint$"), self.hint),
+        ]
+
+    async def run_in_executor(self, fn: Callable, *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def _get_session(self, game_id: str) -> Session:
+        session = self.sessions.get(game_id)
+        if session is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"Game {game_id} does not exist")
+        return session
+
+    # Holds the session's lock for the duration of a request, and keeps the session from being evicted while it is in
+    # use. Once the request is done, the session store re-measures the session, since its solver may have grown.
+    @asynccontextmanager
+    async def _use_session(self, game_id: str) -> AsyncIterator[Session]:
+        session = self._get_session(game_id)
+        session.num_users += 1
+        try:
+            async with session.lock:
+                yield session
+        finally:
+            session.num_users -= 1
+            if game_id in self.sessions:
+                self.sessions.update_size(game_id)
+
+    # ----- Handlers -----
+
+    async def create_game(self, body: dict, query: dict[str, str]) -> tuple[HTTPStatus, Any]:
+        word_list = self.word_data.words
+        word = _get_field(body, "word", str, required=False)
+        if word is None:
+            word = pick_random_word(word_list, self.rng)
+        word = word.lower()
+        if word not in word_list:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Word must be in the accepted Wordle word list")
+
+        known_char = _get_field(body, "known_char", str, required=False)
+        if known_char is None:
+            known_char = pick_known_char(word, self.rng)
+        known_char = known_char.lower()
+        if len(known_char) != 1 or known_char not in word:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Known character must be a single character in the word")
+
+        game_state = GameState(word=word, guesses=[], clues=[], checks={}, known_char=known_char)
+        solver = Solver(word_list, initialize_solution_space(known_char))
+        game_id = uuid.uuid4().hex
+        self.sessions.put(game_id, Session(game_state=game_state, solver=solver))
+        return HTTPStatus.CREATED, {"game_id": game_id, "known_char": known_char}
+
+    async def get_game(self, body: dict, query: dict[str, str], game_id: str) -> tuple[HTTPStatus, Any]:
+        game_state = self._get_session(game_id).game_state
+        winner = game_state.winner()
+        return HTTPStatus.OK, {
+            "game_id": game_id,
+            "known_char": game_state.known_char,
+            "guesses": game_state.guesses,
+            "clues": game_state.clues,
+            "checks": {str(i): {"position": position, "is_fact": is_fact}
+                       for i, (position, is_fact) in game_state.checks.items()},
+            "winner": winner.name if winner else None,
+            # Only reveal the word once the game is over
+            "word": game_state.word if winner else None,
+        }
+
+    async def delete_game(self, body: dict, query: dict[str, str], game_id: str) -> tuple[HTTPStatus, Any]:
+        if not self.sessions.delete(game_id):
+            raise HttpError(HTTPStatus.NOT_FOUND, f"Game {game_id} does not exist")
+        return HTTPStatus.OK, {"game_id": game_id}
+
+    async def submit_guess(self, body: dict, query: dict[str, str], game_id: str) -> tuple[HTTPStatus, Any]:
+        guess = _get_field(body, "guess", str).lower()
+        async with self._use_session(game_id) as session:
+            game_state = session.game_state
+            if game_state.winner():
+                raise HttpError(HTTPStatus.CONFLICT, "The game is over")
+            if len(game_state.clues) != len(game_state.guesses):
+                raise HttpError(HTTPStatus.CONFLICT, "The previous guess has not been given a clue yet")
+            error = game_state.validate_guess(guess)
+            if error:
+                raise HttpError(HTTPStatus.BAD_REQUEST, error)
+            game_state.guesses.append(guess)
+            winner = game_state.winner()
+            return HTTPStatus.OK, {
+                "attempt": len(game_state.guesses),
+                "correct": guess == game_state.word,
+                "winner": winner.name if winner else None,
+            }
+
+    async def submit_clue(self, body: dict, query: dict[str, str], game_id: str) -> tuple[HTTPStatus, Any]:
+        clue = _get_field(body, "clue", str).upper()
+        async with self._use_session(game_id) as session:
+            game_state = session.game_state
+            if len(game_state.guesses) != len(game_state.clues) + 1 or game_state.winner():
+                raise HttpError(HTTPStatus.CONFLICT, "There is no guess waiting for a clue")
+            error = game_state.validate_clue(clue)
+            if error:
+                raise HttpError(HTTPStatus.BAD_REQUEST, error)
+            game_state.clues.append(clue)
+            return HTTPStatus.OK, {"clue": clue}
+
+    async def submit_check(self, body: dict, query: dict[str, str], game_id: str) -> tuple[HTTPStatus, Any]:
+        position = _get_field(body, "position", int)
+        async with self._use_session(game_id) as session:
+            game_state = session.game_state
+            if not game_state.clues or len(game_state.clues) != len(game_state.guesses):
+                raise HttpError(HTTPStatus.CONFLICT, "There is no clue to check")
+            if len(game_state.guesses) - 1 in game_state.checks:
+                raise HttpError(HTTPStatus.CONFLICT, "The latest clue has already been checked")
+            if session.num_clues_applied == len(game_state.clues):
+                raise HttpError(HTTPStatus.CONFLICT, "Checks must be made before the next guess is requested")
+            error = game_state.validate_check(position)
+            if error:
+                raise HttpError(HTTPStatus.BAD_REQUEST, error)
+            correct_clue = game_state.generate_correct_clue(game_state.guesses[-1])
+            is_fact = correct_clue[position] == game_state.clues[-1][position]
+            game_state.checks[len(game_state.guesses) - 1] = (position, is_fact)
+            return HTTPStatus.OK, {"position": position, "is_fact": is_fact}
+
+    async def next_guess(self, body: dict, query: dict[str, str], game_id: str) -> tuple[HTTPStatus, Any]:
+        deadline = _get_deadline(query)
+        async with self._use_session(game_id) as session:
+            if session.game_state.winner():
+                raise HttpError(HTTPStatus.CONFLICT, "The game is over")
+            if len(session.game_state.clues) != len(session.game_state.guesses):
+                raise HttpError(HTTPStatus.CONFLICT, "The previous guess has not been given a clue yet")
+            result = await self.run_in_executor(_apply_clues_and_pick_guess, session, deadline)
+            return HTTPStatus.OK, {"guess": result.value, "complete": result.complete}
+
+    async def next_clue(self, body: dict, query: dict[str, str], game_id: str) -> tuple[HTTPStatus, Any]:
+        deadline = _get_deadline(query)
+        async with self._use_session(game_id) as session:
+            game_state = session.game_state
+            if len(game_state.guesses) != len(game_state.clues) + 1 or game_state.winner():
+                raise HttpError(HTTPStatus.CONFLICT, "There is no guess waiting for a clue")
+            guess = game_state.guesses[-1]
+            result = await self.run_in_executor(
+                _apply_clues_and_pick_clue, session, correct_clue(guess, game_state.word), guess, deadline)
+            return HTTPStatus.OK, {"clue": decode_clue(result.value), "complete": result.complete}
+
+    async def suggestions(self, body: dict, query: dict[str, str], game_id: str) -> tuple[HTTPStatus, Any]:
+        k = _get_query_int(query, "k", default=5, minimum=1, maximum=MAX_SUGGESTIONS)
+        async with self._use_session(game_id) as session:
+            suggestions = await self.run_in_executor(_apply_clues_and_suggest, session, k)
+            return HTTPStatus.OK, {"suggestions": [
+                {
+                    "word": suggestion.word,
+                    "num_branches": suggestion.num_branches,
+                    "letter_freq_score": suggestion.letter_freq_score,
+                }
+                for suggestion in suggestions
+            ]}
+
+    async def possible_words(self, body: dict, query: dict[str, str], game_id: str) -> tuple[HTTPStatus, Any]:
+        page = _get_query_int(query, "page", default=0, minimum=0)
+        page_size = _get_query_int(query, "page_size", default=50, minimum=1, maximum=MAX_PAGE_SIZE)
+        async with self._use_session(game_id) as session:
+            words, total = await self.run_in_executor(_apply_clues_and_list_possible_words, session, page, page_size)
+            return HTTPStatus.OK, {"words": words, "total": total, "page": page, "page_size": page_size}
+
+    async def hint(self, body: dict, query: dict[str, str], game_id: str) -> tuple[HTTPStatus, Any]:
+        guess = query.get("guess", "").lower()
+        if guess not in get_word_index(self.word_data.words).word_ids:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Query parameter 'guess' must be a word in the word list")
+        async with self._use_session(game_id) as session:
+            hint = await self.run_in_executor(_apply_clues_and_hint, session, guess)
+            return HTTPStatus.OK, {
+                "guess": hint.guess,
+                "clues": [
+                    {"clue": decode_clue(clue), "probability": hint.probability_by_clue[clue], "remaining": remaining}
+                    for clue, remaining in hint.remaining_by_clue.items()
+                ],
+                "expected_remaining": hint.expected_remaining,
+                "worst_case_remaining": hint.worst_case_remaining,
+                "win_probability": hint.win_probability,
+            }
+
+    # ----- HTTP plumbing -----
+
+    async def dispatch(self, method: str, path: str, raw_body: bytes) -> tuple[HTTPStatus, Any]:
+        path, _, query_string = path.partition("?")
+        path = path.rstrip("/") or "/"
+        query = dict(parse_qsl(query_string))
+        path_matched = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if not match:
+                continue
+            path_matched = True
+            if route_method != method:
+                continue
+            try:
+                body = json.loads(raw_body) if raw_body else {}
+            except ValueError:
+                raise HttpError(HTTPStatus.BAD_REQUEST, "Request body must be valid JSON")
+            if not isinstance(body, dict):
+                raise HttpError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+            return await handler(body, query, **match.groupdict())
+        if path_matched:
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f"Method {method} not allowed for {path}")
+        raise HttpError(HTTPStatus.NOT_FOUND, f"No route for {path}")
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, raw_body = request
+                try:
+                    status, payload = await self.dispatch(method, path, raw_body)
+                except HttpError as e:
+                    status, payload = e.status, {"error": e.message}
+                except Exception as e:  # Never let a single bad request take down the connection handler
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": repr(e)}
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(_format_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except HttpError as e:
+            writer.write(_format_response(e.status, {"error": e.message}, keep_alive=False))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        # The default backlog of 100 is too small for hundreds of clients connecting at once.
+        return await asyncio.start_server(self.handle_connection, host, port, backlog=1024)
+
+    # Periodically evicts idle sessions, since the session store otherwise only evicts when sessions are accessed.
+    async def evict_periodically(self, interval: float = EVICTION_INTERVAL) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            self.sessions.evict()
+
+
+def _apply_clues_and_pick_guess(session: Session, deadline: Optional[float]) -> SearchResult[str]:
+    session.apply_pending_clues()
+    return session.solver.search_guess(deadline)
+
+
+# Falls back to the first lie of the correct clue if no lie leaves any word possible (see `Solver.search_clue`), so
+# that a clue is always given.
+def _apply_clues_and_pick_clue(
+        session: Session, correct_pattern: int, guess: str, deadline: Optional[float]
+) -> SearchResult[int]:
+    session.apply_pending_clues()
+    result = session.solver.search_clue(correct_pattern, guess, deadline)
+    if result.value is None:
+        return SearchResult(SINGLE_LIE_VARIANTS[correct_pattern][0], result.complete)
+    return SearchResult(result.value, result.complete)
+
+
+def _apply_clues_and_suggest(session: Session, k: int) -> list[Suggestion]:
+    session.apply_pending_clues()
+    return session.solver.suggest(k)
+
+
+def _apply_clues_and_hint(session: Session, guess: str) -> Hint:
+    session.apply_pending_clues()
+    return session.solver.hint(guess)
+
+
+def _apply_clues_and_list_possible_words(session: Session, page: int, page_size: int) -> tuple[list[str], int]:
+    session.apply_pending_clues()
+    return session.solver.possible_words(page, page_size), session.solver.num_possible_words()
+
+
+def _get_query_int(
+        query: dict[str, str], name: str, default: int, minimum: int, maximum: Optional[int] = None
+) -> int:
+    value = query.get(name)
+    if value is None:
+        return default
+    try:
+        parsed = int(value)
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"Query parameter '{name}' must be an integer")
+    if parsed < minimum or (maximum is not None and parsed > maximum):
+        bounds = f"between {minimum} and {maximum}" if maximum is not None else f"at least {minimum}"
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"Query parameter '{name}' must be {bounds}")
+    return parsed
+
+
+def _get_deadline(query: dict[str, str]) -> Optional[float]:
+    if "time_limit_ms" not in query:
+        return None
+    time_limit_ms = _get_query_int(query, "time_limit_ms", default=0, minimum=0, maximum=MAX_TIME_LIMIT_MS)
+    return time.monotonic() + time_limit_ms / 1000
+
+
+def _get_field(body: dict, name: str, field_type: type, required: bool = True) -> Any:
+    value = body.get(name)
+    if value is None:
+        if required:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"Missing field '{name}'")
+        return None
+    # bool is a subclass of int, but `true` is never a valid position
+    if not isinstance(value, field_type) or (field_type is int and isinstance(value, bool)):
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"Field '{name}' must be of type {field_type.__name__}")
+    return value
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[tuple[str, str, dict[str, str], bytes]]:
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise
+        return None  # The client closed the connection between requests
+    except asyncio.LimitOverrunError:
+        raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request headers are too large")
+    if len(head) > MAX_HEADER_SIZE:
+        raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request headers are too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, path, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        content_length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    if content_length > MAX_BODY_SIZE:
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body is too large")
+    raw_body = await reader.readexactly(content_length) if content_length > 0 else b""
+    return method.upper(), path, headers, raw_body
+
+
+def _format_response(status: HTTPStatus, payload: Any, keep_alive: bool) -> bytes:
+    body = json.dumps(payload).encode()
+    head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            f"\r\n")
+    return head.encode("latin-1") + body
+
+
+async def main(
+        host: str,
+        port: int,
+        num_workers: Optional[int],
+        sessions: SessionStore,
+        partition_cache_path: Optional[str],
+        seed: Optional[int] = None,
+) -> None:
+    # Warm-start the partitions shared by every game, and save them for the next run on the way out
+    partition_cache = get_partition_cache(get_word_index(sessions.word_list), partition_cache_path)
+    server = SolverServer(
+        ThreadPoolExecutor(max_workers=num_workers or os.cpu_count()), sessions, rng=random.Random(seed))
+    eviction_task = asyncio.create_task(server.evict_periodically())
+    async with await server.serve(host, port) as asyncio_server:
+        print(f"Serving on {host}:{port}. Evicted sessions are stored in {sessions.spill_dir}")
+        try:
+            await asyncio_server.serve_forever()
+        finally:
+            eviction_task.cancel()
+            if partition_cache_path:
+                partition_cache.save(partition_cache_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the Fiction solver over JSON/HTTP")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="Number of solver worker threads")
+    parser.add_argument("--spill-dir", default=None, help="Directory that evicted sessions are written to")
+    parser.add_argument("--max-sessions", type=int, default=None, help="Maximum number of sessions kept in memory")
+    parser.add_argument("--memory-budget-mb", type=float, default=256,
+                        help="Maximum combined size of the sessions kept in memory, in MB")
+    parser.add_argument("--idle-ttl", type=float, default=300,
+                        help="Number of seconds after which an idle session is evicted from memory")
+    parser.add_argument("--partition-cache", default=None,
+                        help="File to warm-start the guess partition cache from, and save it to on shutdown")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Seed for the random words and known characters of new games")
+    parser.add_argument("--decision-cache", default=None,
+                        help="File of solver decisions to share between games, server processes and restarts")
+    args = parser.parse_args()
+    if args.decision_cache:
+        set_default_decision_cache(DecisionCache(args.decision_cache))
+    session_store = SessionStore(
+        load_word_data().words,
+        spill_dir=args.spill_dir,
+        max_sessions=args.max_sessions,
+        memory_budget=int(args.memory_budget_mb * 1024 * 1024),
+        idle_ttl=args.idle_ttl,
+    )
+    try:
+        asyncio.run(main(args.host, args.port, args.workers, session_store, args.partition_cache, args.seed))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,202 @@
+import asyncio
+import os
+import pickle
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Optional
+
+from application.clues import encode_clue
+from application.main import GameState
+from application.memory import deep_getsizeof
+from application.serialization import decode_solver, encode_solver
+from application.solver import Solver
+
+
+@dataclass
+class Session:
+    game_state: GameState
+    solver: Solver
+    # Serializes requests for the same game, so that the solver is never used by two worker threads at once.
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # Number of clues that the solver has expanded its solution spaces with. Clues are applied lazily (right before
+    # the solver is next needed) so that a fact-or-fiction check made after the clue can still be taken into account.
+    num_clues_applied: int = 0
+    # Number of in-flight requests using this session. Sessions that are in use are never evicted, otherwise a request
+    # could keep mutating a copy that has already been written to disk.
+    num_users: int = 0
+
+    # Sessions never undo, since the game state is the record of what happened, so the solver's history is dropped.
+    def apply_pending_clues(self) -> None:
+        game_state = self.game_state
+        if self.num_clues_applied == len(game_state.clues):
+            return
+        while self.num_clues_applied < len(game_state.clues):
+            i = self.num_clues_applied
+            self.solver.expand_solution_spaces(
+                game_state.guesses[i], encode_clue(game_state.clues[i]), game_state.checks.get(i))
+            self.num_clues_applied += 1
+        self.solver.forget_history()
+
+    # Returns the number of bytes used by the game and solver state. The word list and its index are shared by every
+    # session, so they are not counted.
+    def size(self) -> int:
+        return deep_getsizeof((self.game_state, self.solver.state))
+
+    def to_bytes(self) -> bytes:
+        return pickle.dumps(
+            (self.game_state, encode_solver(self.solver), self.num_clues_applied),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes, word_list: list[str]) -> "Session":
+        game_state, solver_state, num_clues_applied = pickle.loads(data)
+        solver = decode_solver(solver_state, word_list)
+        return cls(game_state=game_state, solver=solver, num_clues_applied=num_clues_applied)
+
+
+@dataclass
+class _Entry:
+    session: Session
+    size: int
+    last_access: float
+
+
+# An in-memory store of sessions that evicts the least recently used sessions once there are more than
+# `max_sessions` of them, or once their combined size exceeds `memory_budget` bytes, and evicts sessions that have
+# been idle for longer than `idle_ttl` seconds. Evicted sessions are written to `spill_dir` and transparently loaded
+# back into memory the next time they're requested.
+class SessionStore:
+    def __init__(
+            self,
+            word_list: list[str],
+            spill_dir: Optional[str] = None,
+            max_sessions: Optional[int] = None,
+            memory_budget: Optional[int] = None,
+            idle_ttl: Optional[float] = None,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        self.word_list = word_list
+        self.spill_dir = spill_dir or tempfile.mkdtemp(prefix="fiction-sessions-")
+        os.makedirs(self.spill_dir, exist_ok=True)
+        self.max_sessions = max_sessions
+        self.memory_budget = memory_budget
+        self.idle_ttl = idle_ttl
+        self.clock = clock
+        # Ordered from least to most recently used
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._spilled: set[str] = set()
+        self.memory_used = 0
+        self.num_evictions = 0
+        self.num_rehydrations = 0
+
+    def __contains__(self, game_id: str) -> bool:
+        return game_id in self._entries or game_id in self._spilled
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._spilled)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from list(self._entries)
+        yield from list(self._spilled)
+
+    @property
+    def num_in_memory(self) -> int:
+        return len(self._entries)
+
+    def put(self, game_id: str, session: Session) -> None:
+        self._discard(game_id)
+        entry = _Entry(session=session, size=session.size(), last_access=self.clock())
+        self._entries[game_id] = entry
+        self.memory_used += entry.size
+        self.evict()
+
+    # Returns the session for `game_id`, loading it from disk if it has been evicted, or None if there is no such game.
+    def get(self, game_id: str) -> Optional[Session]:
+        entry = self._entries.get(game_id)
+        if entry is None:
+            if game_id not in self._spilled:
+                return None
+            entry = self._rehydrate(game_id)
+        entry.last_access = self.clock()
+        self._entries.move_to_end(game_id)
+        return entry.session
+
+    # Re-measures the size of a session after its solver state has changed, evicting other sessions if the store is
+    # now over its memory budget.
+    def update_size(self, game_id: str) -> None:
+        entry = self._entries.get(game_id)
+        if entry is None:
+            return
+        new_size = entry.session.size()
+        self.memory_used += new_size - entry.size
+        entry.size = new_size
+        self.evict()
+
+    def delete(self, game_id: str) -> bool:
+        return self._discard(game_id)
+
+    # Evicts idle sessions and, from least to most recently used, as many sessions as it takes to get back under the
+    # session and memory limits. Returns the number of evicted sessions.
+    def evict(self) -> int:
+        now = self.clock()
+        num_evicted = 0
+        for game_id, entry in list(self._entries.items()):
+            if entry.session.num_users > 0:
+                continue
+            is_idle = self.idle_ttl is not None and now - entry.last_access > self.idle_ttl
+            if not is_idle and not self._is_over_limit():
+                # Entries are ordered by last access, so every remaining entry is more recent than this one
+                break
+            self._spill(game_id, entry)
+            num_evicted += 1
+        return num_evicted
+
+    def _is_over_limit(self) -> bool:
+        return ((self.max_sessions is not None and len(self._entries) > self.max_sessions)
+                or (self.memory_budget is not None and self.memory_used > self.memory_budget))
+
+    def _path(self, game_id: str) -> str:
+        return os.path.join(self.spill_dir, f"{game_id}.session")
+
+    def _spill(self, game_id: str, entry: _Entry) -> None:
+        # Write to a temporary file first, so that a crash mid-write never leaves a truncated session behind
+        path = self._path(game_id)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(entry.session.to_bytes())
+        os.replace(f"{path}.tmp", path)
+        del self._entries[game_id]
+        self.memory_used -= entry.size
+        self._spilled.add(game_id)
+        self.num_evictions += 1
+
+    def _rehydrate(self, game_id: str) -> _Entry:
+        path = self._path(game_id)
+        with open(path, "rb") as f:
+            session = Session.from_bytes(f.read(), self.word_list)
+        os.remove(path)
+        self._spilled.discard(game_id)
+        entry = _Entry(session=session, size=session.size(), last_access=self.clock())
+        self._entries[game_id] = entry
+        self.memory_used += entry.size
+        self.num_rehydrations += 1
+        # Make room for the rehydrated session, without evicting it straight away
+        session.num_users += 1
+        try:
+            self.evict()
+        finally:
+            session.num_users -= 1
+        return entry
+
+    def _discard(self, game_id: str) -> bool:
+        entry = self._entries.pop(game_id, None)
+        if entry is not None:
+            self.memory_used -= entry.size
+            return True
+        if game_id in self._spilled:
+            self._spilled.discard(game_id)
+            os.remove(self._path(game_id))
+            return True
+        return False
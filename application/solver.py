@@ -1,29 +1,75 @@
 import copy
-import random
+import heapq
+import threading
+import time
 from collections import defaultdict
-from dataclasses import dataclass
-from itertools import takewhile
-from typing import Optional
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Generic, Iterator, Optional, TYPE_CHECKING, TypeVar
 
+from application.clues import (
+    ALL_CORRECT, CLUE_DIGITS, letter_mask, SINGLE_LIE_VARIANTS, SINGLE_LIE_VARIANTS_AT, SQUIGGLE, X, Y,
+)
+from application.partitions import get_partition_cache
+from application.word_index import add_to_counters, get_word_index, iter_bits, letter_indexes, max_counted
 
-@dataclass
+if TYPE_CHECKING:
+    from application.decision_cache import DecisionCache
+    from application.parallel import ParallelSolverPool
+
+_A = ord('a')
+
+# The decision cache that new solvers consult (see `set_default_decision_cache`)
+_default_decision_cache: Optional["DecisionCache"] = None
+
+
+# Every letter, as a `SolutionSpace.possible` row
+_ALL_LETTERS = (1 << 26) - 1
+# Each letter on its own, shared by every row in which only that letter is possible
+_LETTER_BITS = tuple(1 << j for j in range(26))
+
+
+# What the clues so far say about the secret word, under one assumption about which of their positions were lies.
+# Solution spaces are immutable and hashable (so they can be deduplicated, or used as keys in a cache), and hash
+# themselves once, when they are created. Letter sets are 26-bit masks, with bit j set for the j-th letter of the
+# alphabet, so that a branch is a handful of small ints and tuples. `Solver._update` creates them, through a mutable
+# `_SolutionSpaceUpdate`.
+@dataclass(frozen=True, slots=True)
 class SolutionSpace:
-    # for position 0-4, a 26-element list of 0s or 1s indicating whether the letter corresponding to that index
-    # could be in that position.
-    possible: list[list[int]]
+    # for position 0-4, the mask of letters that could be in that position.
+    possible: tuple[int, ...]
     # for positions 0-4, the letter (if any) that is confirmed to be in that position. If no letter is confirmed,
     # the value is None.
-    confirmed: list[Optional[str]]
-    # letters that are confirmed to be in the word, although their exact position might be unknown. This is a
-    # superset of `confirmed`. Does not currently support knowing about there being multiple of the same letter
-    # in the word.
-    confirmed_position_agnostic: set[str]
+    confirmed: tuple[Optional[str], ...]
+    # mask of letters that are confirmed to be in the word, although their exact position might be unknown. This is a
+    # superset of `confirmed`. See `min_counts` for letters that are known to be in the word more than once.
+    confirmed_position_agnostic: int
+    # (letter, minimum number of times it is in the word) pairs in alphabetical order, for letters known to be in it at
+    # least twice.
+    min_counts: tuple[tuple[str, int], ...] = ()
+    # (letter, maximum number of times it is in the word) pairs in alphabetical order, for letters known to be in it at
+    # most 1-4 times. Letters that can't be in the word at all are ruled out in `possible` instead.
+    max_counts: tuple[tuple[str, int], ...] = ()
+    _hash: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_hash", hash((
+            self.possible, self.confirmed, self.confirmed_position_agnostic, self.min_counts, self.max_counts)))
+
+    def __hash__(self):
+        return self._hash
+
+    # String hashes differ from one process to the next, so the hash is recomputed rather than pickled
+    def __reduce__(self):
+        return SolutionSpace, (
+            self.possible, self.confirmed, self.confirmed_position_agnostic, self.min_counts, self.max_counts)
 
     def __str__(self):
-        possible_chrs = [[chr(ord('a') + j) for j in range(26) if (self.possible[i][j] == 1)] for i in range(5)]
+        possible_chrs = [[chr(_A + j) for j in range(26) if self.possible[i] >> j & 1] for i in range(5)]
+        confirmed_position_agnostic = {chr(_A + j) for j in range(26) if self.confirmed_position_agnostic >> j & 1}
         return (f"Possible characters: {possible_chrs}\n"
-                f"Confirmed characters: {self.confirmed}"
-                f"Confirmed position-agnostic characters: {self.confirmed_position_agnostic}")
+                f"Confirmed characters: {list(self.confirmed)}"
+                f"Confirmed position-agnostic characters: {confirmed_position_agnostic}")
 
     def is_word_possible(self, word: str) -> bool:
         assert len(word) == 5, f"Word {word} must be 5 characters long"
@@ -34,40 +80,266 @@ class SolutionSpace:
                 break
 
             idx = ord(c) - ord('a')
-            if self.possible[i][idx] == 0:
+            if not self.possible[i] >> idx & 1:
                 possible = False
                 break
-        for c in self.confirmed_position_agnostic:
-            if c not in word:
+        if letter_mask(word) & self.confirmed_position_agnostic != self.confirmed_position_agnostic:
+            possible = False
+        for c, min_count in self.min_counts:
+            if word.count(c) < min_count:
+                possible = False
+        for c, max_count in self.max_counts:
+            if word.count(c) > max_count:
                 possible = False
-                break
         return possible
 
 
+# A solution space that is being updated with a clue (see `Solver._update`), with the same fields as a
+# `SolutionSpace` but in mutable containers. The update code changes it in place, and freezes it once it is done.
+@dataclass(slots=True)
+class _SolutionSpaceUpdate:
+    possible: list[int]
+    confirmed: list[Optional[str]]
+    confirmed_position_agnostic: int
+    min_counts: dict[str, int]
+    max_counts: dict[str, int]
+
+    @classmethod
+    def of(cls, solution_space: SolutionSpace) -> "_SolutionSpaceUpdate":
+        return cls(
+            possible=list(solution_space.possible),
+            confirmed=list(solution_space.confirmed),
+            confirmed_position_agnostic=solution_space.confirmed_position_agnostic,
+            min_counts=dict(solution_space.min_counts),
+            max_counts=dict(solution_space.max_counts),
+        )
+
+    def freeze(self) -> SolutionSpace:
+        return SolutionSpace(
+            possible=tuple(self.possible),
+            confirmed=tuple(self.confirmed),
+            confirmed_position_agnostic=self.confirmed_position_agnostic,
+            min_counts=tuple(sorted(self.min_counts.items())),
+            max_counts=tuple(sorted(self.max_counts.items())),
+        )
+
+
 class IncompatibleClueError(Exception):
     pass
 
 
+# Raised when a computation is cancelled through its `cancel` event. The solver is left as it was before the call.
+class SolverCancelledError(Exception):
+    pass
+
+
+class SolverHistoryError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    word: str
+    # Number of solution spaces that the word is possible in
+    num_branches: int
+    # Sum of the word list frequencies of the word's letters, used to break ties between words in the same number of
+    # solution spaces
+    letter_freq_score: int
+
+
+# A guess, the clue it was given and the fact-or-fiction check on that clue, if any
+Move = tuple[str, int, Optional[tuple[int, bool]]]
+
+
+# An immutable snapshot of what a solver knows. Expanding a state creates a new one that points back to it, rather
+# than modifying it, and branches are never modified once created, so states share every branch they have in common
+# and keeping old states around for undo costs nothing but the branches that were replaced.
+@dataclass(frozen=True)
+class SolverState:
+    solution_spaces: tuple[SolutionSpace, ...]
+    # See `Solver.candidates`
+    candidates: int
+    # The state this one was expanded from, and the move it was expanded with. None for a starting state.
+    parent: Optional["SolverState"] = field(default=None, compare=False, repr=False)
+    move: Optional[Move] = field(default=None, compare=False)
+
+
+# What could happen if a guess were made, for players who want help choosing a guess without being told what to guess.
+# Assumes that the secret word is equally likely to be any candidate word, and that the librarian is equally likely to
+# lie about any position in the correct clue.
+@dataclass(frozen=True)
+class Hint:
+    guess: str
+    # Map from each clue (encoded) that the librarian could give for the guess, to the number of candidate words that
+    # would remain after it
+    remaining_by_clue: dict[int, int]
+    # Map from each clue that the librarian could give for the guess, to the probability of it being given
+    probability_by_clue: dict[int, float]
+    expected_remaining: float
+    worst_case_remaining: int
+    # Probability that the guess is the secret word
+    win_probability: float
+
+
+# Representations that the solver can count guesses in (see `Solver.search_suggestions`)
+BRANCH_LISTS = "branch lists"
+WORD_BITSETS = "word bitsets"
+
+
+# A change in the representation that the solver counted guesses in, and the counts that it was chosen by
+@dataclass(frozen=True)
+class RepresentationSwitch:
+    from_representation: str
+    to_representation: str
+    num_branches: int
+    num_words: int
+
+
+T = TypeVar("T")
+
+
+# The result of a search that may have been cut short by a deadline. Searches are anytime: they always have an answer,
+# and keep improving it until they either run out of options to evaluate or out of time.
+@dataclass(frozen=True)
+class SearchResult(Generic[T]):
+    value: T
+    # Whether every option was evaluated. If not, `value` is the best option found before the deadline.
+    complete: bool
+
+
+# Deadlines are `time.monotonic()` timestamps. A deadline of None never passes.
+def _is_past(deadline: Optional[float]) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
+
+
+# Long computations check whether they have been cancelled (from another thread, see `AsyncSolver`) every this many
+# branches.
+CANCEL_CHECK_INTERVAL = 16
+# Looking a decision up in the decision cache costs about as much as counting a few hundred (branch, candidate word)
+# pairs, so guesses that need less counting than this are just picked. Picking a clue always costs far more.
+DECISION_CACHE_MIN_GUESS_WORK = 256
+# Counting the best guess in word bitsets costs about as much per branch as counting this many words in branch lists
+# (see `Solver.search_suggestions`), so it is used whenever there are at least this many candidate words per branch.
+WORD_BITSETS_MIN_WORDS_PER_BRANCH = 2
+
+
+def _check_cancelled(cancel: Optional[threading.Event]) -> None:
+    if cancel is not None and cancel.is_set():
+        raise SolverCancelledError()
+
+
+# Returns whether every occurrence can be given a different position out of the ones it could be in, using augmenting
+# paths to find a matching between occurrences and positions.
+def _can_place(occurrences: list[list[int]]) -> bool:
+    occurrence_at: dict[int, int] = {}
+
+    def place(occurrence: int, visited: set[int]) -> bool:
+        for position in occurrences[occurrence]:
+            if position in visited:
+                continue
+            visited.add(position)
+            if position not in occurrence_at or place(occurrence_at[position], visited):
+                occurrence_at[position] = occurrence
+                return True
+        return False
+
+    return all(place(occurrence, set()) for occurrence in range(len(occurrences)))
+
+
+# Makes every solver created from now on in this process consult `cache` (None for no cache) before searching for a
+# guess or clue, and store what it finds there.
+def set_default_decision_cache(cache: Optional["DecisionCache"]) -> None:
+    global _default_decision_cache
+    _default_decision_cache = cache
+
+
 def initialize_solution_space(known_chr: str) -> SolutionSpace:
     return SolutionSpace(
-        possible=[[1 for _ in range(26)] for _ in range(5)],
-        confirmed=[None for _ in range(5)],
-        confirmed_position_agnostic={known_chr},
+        possible=(_ALL_LETTERS,) * 5,
+        confirmed=(None,) * 5,
+        confirmed_position_agnostic=letter_mask(known_chr),
     )
 
 
 class Solver:
     def __init__(self, word_list: list[str], initial_solution_space: SolutionSpace):
         self.word_list = word_list
-        self.solution_spaces = [initial_solution_space]
+        # Shared by every solver using the same word list, so only the first solver in a process pays for indexing
+        self.word_index = get_word_index(word_list)
         # Map from letter to number of times it occurs in the word list
-        self.letter_to_freq: dict[str, int] = defaultdict(int)
-        for word in word_list:
-            for letter in word:
-                self.letter_to_freq[letter] += 1
+        self.letter_to_freq = self.word_index.letter_to_freq
+        # Also shared between solvers, see `PartitionCache`
+        self.partition_cache = get_partition_cache(self.word_index)
+        self.state = SolverState(
+            solution_spaces=(initial_solution_space,),
+            candidates=self.word_index.matching(initial_solution_space),
+        )
+        # States that have been undone, most recently undone last
+        self._redo_states: list[SolverState] = []
+        # See `use_parallel`
+        self.parallel: Optional["ParallelSolverPool"] = None
+        # See `set_default_decision_cache`
+        self.decision_cache = _default_decision_cache
+        # The representation that guesses were last counted in, and every time it changed (see `search_suggestions`)
+        self.representation = BRANCH_LISTS
+        self.representation_switches: list[RepresentationSwitch] = []
+
+    @property
+    def solution_spaces(self) -> tuple[SolutionSpace, ...]:
+        return self.state.solution_spaces
+
+    # Bitset of the words that are consistent with every clue so far, regardless of which branch they fall in.
+    # Branches only approximate the clues (e.g. they don't track how many times a letter occurs), so a word can fit a
+    # branch without being consistent with the clues, but never the other way around.
+    @property
+    def candidates(self) -> int:
+        return self.state.candidates
+
+    # Replaces the solver's state, e.g. with one that was saved earlier. Clears the redo history.
+    def reset(self, state: SolverState) -> None:
+        self.state = state
+        self._redo_states = []
+
+    # Drops the states before (and undone after) the current one, so that their branches can be freed.
+    def forget_history(self) -> None:
+        self.reset(SolverState(solution_spaces=self.state.solution_spaces, candidates=self.state.candidates))
+
+    def can_undo(self) -> bool:
+        return self.state.parent is not None
+
+    def can_redo(self) -> bool:
+        return bool(self._redo_states)
+
+    # Goes back to the state before the last expansion.
+    def undo(self) -> None:
+        if self.state.parent is None:
+            raise SolverHistoryError("There is nothing to undo")
+        self._redo_states.append(self.state)
+        self.state = self.state.parent
+
+    # Re-applies the last expansion that was undone.
+    def redo(self) -> None:
+        if not self._redo_states:
+            raise SolverHistoryError("There is nothing to redo")
+        self.state = self._redo_states.pop()
+
+    # Returns a solver in the state this solver would be in after `guess` is given `clue`, without changing this
+    # solver. The two share their word index, caches and every branch that the clue doesn't affect.
+    def what_if(self, guess: str, clue: int, fact_or_fiction_check: Optional[tuple[int, bool]]) -> "Solver":
+        hypothetical = copy.copy(self)
+        hypothetical.representation_switches = list(self.representation_switches)
+        hypothetical.reset(self._expand(self.state, guess, clue, fact_or_fiction_check))
+        return hypothetical
+
+    # Expands solution spaces on `pool` whenever there are enough of them for it to be faster. Pass None to go back
+    # to expanding them in this process.
+    def use_parallel(self, pool: Optional["ParallelSolverPool"]) -> None:
+        if pool is not None and pool.word_index.hash != self.word_index.hash:
+            raise ValueError("The pool was created for a different word list")
+        self.parallel = pool
 
     def _get_potential_words_for_branch(self, solution_space: SolutionSpace) -> list[str]:
-        return [word for word in self.word_list if solution_space.is_word_possible(word)]
+        return self.word_index.words_in(self.word_index.matching(solution_space) & self.candidates)
 
     def _get_potential_words_for_all_branches(self, solution_spaces: list[SolutionSpace]) -> set[str]:
         return {
@@ -76,66 +348,308 @@ class Solver:
             for word in self._get_potential_words_for_branch(solution_space)
         }
 
-    def pick_clue(self, correct_clue: str, guess: str) -> str:
+    # Clues are passed to and returned from the solver encoded as ints (see `clues.encode_clue`).
+    def pick_clue(
+            self, correct_clue: int, guess: str, deadline: Optional[float] = None,
+            cancel: Optional[threading.Event] = None,
+    ) -> Optional[int]:
+        return self.search_clue(correct_clue, guess, deadline, cancel).value
+
+    # Picks the lie that leaves the most solution spaces open (used as rough proxy for number of possible words,
+    # although these may diverge), preferring lies in earlier positions when tied.
+    #
+    # Counting the branches a lie leaves open means updating every branch with it, so the lies are first ranked by a
+    # cheap estimate: how many candidate words would remain consistent with it. They are then counted exactly in that
+    # order until `deadline`, so that a search cut short has most likely already counted the best lies. If no lie has
+    # been counted by then, or none leaves any solution space open, the estimate's best is returned. Complete searches
+    # are stored in the solver's decision cache, if it has one.
+    def search_clue(
+            self, correct_clue: int, guess: str, deadline: Optional[float] = None,
+            cancel: Optional[threading.Event] = None,
+    ) -> SearchResult[Optional[int]]:
+        key = None
+        if self.decision_cache is not None:
+            key = self.decision_cache.key(self.word_index.hash, self.state, "clue", guess, correct_clue)
+            cached = self.decision_cache.get(key)
+            if cached is not None:
+                return SearchResult(int(cached), True)
+        result = self._search_clue(correct_clue, guess, deadline, cancel)
+        if self.decision_cache is not None and key is not None and result.complete and result.value is not None:
+            self.decision_cache.put(key, str(result.value))
+        return result
+
+    def _search_clue(
+            self, correct_clue: int, guess: str, deadline: Optional[float], cancel: Optional[threading.Event]
+    ) -> SearchResult[Optional[int]]:
         # Generate all potential clues with 1 lie in them
-        new_clues = []
-        for i in range(0,4):
-            for new_chr in {'Y', 'X', '~'}:
-                if new_chr != correct_clue[i]:
-                    new_clue = correct_clue[:i] + new_chr + correct_clue[i + 1:]
-                    new_clues.append(new_clue)
-
-        # Pick the lie that leaves the most solution spaces open
-        # (used as rough proxy for number of possible words, although these may diverge)
-        best_clue = None
+        new_clues = list(SINGLE_LIE_VARIANTS[correct_clue])
+        estimates = [
+            bin(self.candidates & self.partition_cache.consistent_words(guess, SINGLE_LIE_VARIANTS[clue])).count("1")
+            for clue in new_clues
+        ]
+        order = sorted(range(len(new_clues)), key=lambda c: (-estimates[c], c))
+        estimated_best = new_clues[order[0]] if order and estimates[order[0]] else None
+
+        best_index: Optional[int] = None
         best_clue_score = 0
-        for clue in new_clues:
-            new_solution_spaces = []
-            for solution_space in self.solution_spaces:
+        for num_counted, c in enumerate(order):
+            if num_counted > 0 and _is_past(deadline):
+                return SearchResult(new_clues[best_index] if best_index is not None else estimated_best, False)
+            clue_score = 0
+            for b, solution_space in enumerate(self.solution_spaces):
+                if b % CANCEL_CHECK_INTERVAL == 0:
+                    _check_cancelled(cancel)
                 try:
-                    new_solution_space = Solver._update(solution_space, guess, clue)
-                    new_solution_spaces.append(new_solution_space)
+                    Solver._update(solution_space, guess, new_clues[c])
                 except IncompatibleClueError:
                     continue
-            if len(new_solution_spaces) > best_clue_score:
-                best_clue = clue
-                best_clue_score = len(new_solution_spaces)
+                clue_score += 1
+            if clue_score > best_clue_score or (
+                    clue_score == best_clue_score and best_index is not None and clue_score and c < best_index):
+                best_index = c
+                best_clue_score = clue_score
 
-        return best_clue
+        # Every lie can be incompatible with every branch (as a correct clue), e.g. when a single branch is left
+        return SearchResult(new_clues[best_index] if best_index is not None else estimated_best, True)
 
-    def pick_guess(self) -> str:
-        # A map from word to the number of solution spaces that are compatible with that word.
-        word_solution_space_freq: dict[str, int] = defaultdict(int)
-        for solution_space in self.solution_spaces:
-            for word in self._get_potential_words_for_branch(solution_space):
-                word_solution_space_freq[word] += 1
-        sorted_word_freqs = sorted(word_solution_space_freq.items(), key=lambda word_freq: word_freq[1], reverse=True)
-        print("Possible words: ", sorted([word for word, _ in sorted_word_freqs]), " | Size: ", len(sorted_word_freqs))
-        if not sorted_word_freqs:
+    # Returns a map from word id to the number of solution spaces that the word is possible in. Words are in the order
+    # that they are first found in, going through the solution spaces in order. If `deadline` passes before every
+    # solution space has been counted, the counts so far are returned, along with False.
+    def _word_branch_freqs(
+            self, deadline: Optional[float] = None, cancel: Optional[threading.Event] = None
+    ) -> tuple[dict[int, int], bool]:
+        word_branch_freqs: dict[int, int] = defaultdict(int)
+        for b, solution_space in enumerate(self.solution_spaces):
+            if b % CANCEL_CHECK_INTERVAL == 0:
+                _check_cancelled(cancel)
+            # Always count at least one branch, so that there is something to suggest
+            if b > 0 and _is_past(deadline):
+                return word_branch_freqs, False
+            for word_id in iter_bits(self.word_index.matching(solution_space) & self.candidates):
+                word_branch_freqs[word_id] += 1
+        return word_branch_freqs, True
+
+    # Returns the `k` best guesses, best first. Words that appear in the most solution spaces are preferred, since
+    # guessing one of them will leave the fewest branches open. Among those, words whose letters are the most common
+    # are preferred, and remaining ties go to the word found last. Uses a heap rather than sorting every candidate.
+    def suggest(
+            self, k: int, deadline: Optional[float] = None, cancel: Optional[threading.Event] = None
+    ) -> list[Suggestion]:
+        return self.search_suggestions(k, deadline, cancel).value
+
+    # Like `suggest`, but reports whether every solution space was counted before `deadline`. If not, the suggestions
+    # are ranked by the branches counted so far (always at least one).
+    #
+    # Counting goes through a map from word to branch count, which costs a dict update per (branch, word) pair. When
+    # there are many candidate words per branch and only the best guess is wanted, every word is instead counted at
+    # once in bit-sliced counters (see `word_index.add_to_counters`), which costs a few bitset operations per branch
+    # however many words the branch has. Both pick the same suggestion. Each change of representation is recorded in
+    # `representation_switches`.
+    def search_suggestions(
+            self, k: int, deadline: Optional[float] = None, cancel: Optional[threading.Event] = None
+    ) -> SearchResult[list[Suggestion]]:
+        num_branches = len(self.solution_spaces)
+        num_words = bin(self.candidates).count("1")
+        representation = (
+            WORD_BITSETS if k == 1 and num_words >= num_branches * WORD_BITSETS_MIN_WORDS_PER_BRANCH else BRANCH_LISTS
+        )
+        if representation != self.representation:
+            self.representation_switches.append(RepresentationSwitch(
+                from_representation=self.representation,
+                to_representation=representation,
+                num_branches=num_branches,
+                num_words=num_words,
+            ))
+            self.representation = representation
+        if representation == WORD_BITSETS:
+            return self._search_best_suggestion(deadline, cancel)
+        return self._search_suggestions(k, deadline, cancel)
+
+    def _search_suggestions(
+            self, k: int, deadline: Optional[float], cancel: Optional[threading.Event]
+    ) -> SearchResult[list[Suggestion]]:
+        words = self.word_index.words
+        letter_freq_scores = self.word_index.letter_freq_scores
+        word_branch_freqs, complete = self._word_branch_freqs(deadline, cancel)
+        ranked = heapq.nlargest(
+            k,
+            (
+                (num_branches, letter_freq_scores[word_id], order, word_id)
+                for order, (word_id, num_branches) in enumerate(word_branch_freqs.items())
+            ),
+        )
+        suggestions = [
+            Suggestion(word=words[word_id], num_branches=num_branches, letter_freq_score=letter_freq_score)
+            for num_branches, letter_freq_score, _, word_id in ranked
+        ]
+        return SearchResult(suggestions, complete)
+
+    # `_search_suggestions` for k = 1, counting in word bitsets. The words with the most branches are narrowed down to
+    # the ones with the highest letter frequency score, and then to the one found last: the last word id in the last
+    # branch that any of them is first found in.
+    def _search_best_suggestion(
+            self, deadline: Optional[float], cancel: Optional[threading.Event]
+    ) -> SearchResult[list[Suggestion]]:
+        word_index = self.word_index
+        candidates = self.candidates
+        branch_words: list[int] = []
+        counters: list[int] = []
+        complete = True
+        for b, solution_space in enumerate(self.solution_spaces):
+            if b % CANCEL_CHECK_INTERVAL == 0:
+                _check_cancelled(cancel)
+            # Always count at least one branch, so that there is something to suggest
+            if b > 0 and _is_past(deadline):
+                complete = False
+                break
+            words = word_index.matching(solution_space) & candidates
+            branch_words.append(words)
+            add_to_counters(counters, words)
+        if not counters:
+            return SearchResult([], complete)
+
+        counted = 0
+        for words in counters:
+            counted |= words
+        best, num_branches = max_counted(counters, counted)
+        best, letter_freq_score = max_counted(word_index.letter_freq_score_counters, best)
+        remaining = best
+        for words in branch_words:
+            found = words & remaining
+            if found:
+                last_found = found
+                remaining ^= found
+                if not remaining:
+                    break
+        word_id = last_found.bit_length() - 1
+        return SearchResult([Suggestion(word_index.words[word_id], num_branches, letter_freq_score)], complete)
+
+    def pick_guess(self, deadline: Optional[float] = None, cancel: Optional[threading.Event] = None) -> str:
+        return self.search_guess(deadline, cancel).value
+
+    # Complete searches that are expensive enough are stored in the solver's decision cache, if it has one.
+    def search_guess(
+            self, deadline: Optional[float] = None, cancel: Optional[threading.Event] = None
+    ) -> SearchResult[str]:
+        key = None
+        if (self.decision_cache is not None
+                and len(self.solution_spaces) * bin(self.candidates).count("1") >= DECISION_CACHE_MIN_GUESS_WORK):
+            key = self.decision_cache.key(self.word_index.hash, self.state, "guess")
+            cached = self.decision_cache.get(key)
+            if cached is not None:
+                return SearchResult(cached, True)
+        result = self.search_suggestions(1, deadline, cancel)
+        if not result.value:
             raise Exception("No possible words found")
+        if self.decision_cache is not None and key is not None and result.complete:
+            self.decision_cache.put(key, result.value[0].word)
+        return SearchResult(result.value[0].word, result.complete)
+
+    # Evaluates `guess` against every candidate word at once: the cached partition for the guess groups the words by
+    # their correct clue, so the number of candidates behind each of the 243 correct clues is one AND and popcount
+    # each. A clue the librarian gives is consistent with exactly the candidates whose correct clue is one lie away
+    # from it, so the candidates remaining after it are a sum of 10 of those counts.
+    def hint(self, guess: str) -> Hint:
+        candidates = self.candidates
+        counts = [bin(candidates & words).count("1") for words in self.partition_cache.get(guess)]
+        num_candidates = sum(counts)
+
+        probability_by_clue: dict[int, float] = defaultdict(float)
+        for correct_clue, count in enumerate(counts):
+            if count and correct_clue != ALL_CORRECT:
+                lies = SINGLE_LIE_VARIANTS[correct_clue]
+                for clue in lies:
+                    probability_by_clue[clue] += count / (num_candidates * len(lies))
+        # If the guess were the secret word, the game would already be over, so it never remains
+        remaining_by_clue = {
+            clue: sum(counts[correct_clue] for correct_clue in SINGLE_LIE_VARIANTS[clue] if correct_clue != ALL_CORRECT)
+            for clue in sorted(probability_by_clue)
+        }
+        return Hint(
+            guess=guess,
+            remaining_by_clue=remaining_by_clue,
+            probability_by_clue={clue: probability_by_clue[clue] for clue in remaining_by_clue},
+            expected_remaining=sum(
+                probability_by_clue[clue] * remaining for clue, remaining in remaining_by_clue.items()),
+            worst_case_remaining=max(remaining_by_clue.values(), default=0),
+            win_probability=counts[ALL_CORRECT] / num_candidates if num_candidates else 0.0,
+        )
 
-        # Among the words that appear the most number of times in the solution spaces, pick the word
-        # whose letters are the most common.
-        max_freq = sorted_word_freqs[0][1]
-        max_freq_words = takewhile(lambda word_freq: word_freq[1] == max_freq, sorted_word_freqs)
-        max_letter_freq_score = 0
-        max_letter_freq_word = None
-        for word, _ in max_freq_words:
-            letter_freq_score = sum(self.letter_to_freq[letter] for letter in word)
-            if letter_freq_score >= max_letter_freq_score:
-                max_letter_freq_score = letter_freq_score
-                max_letter_freq_word = word
-        return max_letter_freq_word
+    # Returns the number of words that are possible in at least one solution space.
+    def num_possible_words(self) -> int:
+        return bin(self._possible_words_bitset()).count("1")
 
+    # Lazily yields the words that are possible in at least one solution space, in word list order.
+    def iter_possible_words(self) -> Iterator[str]:
+        words = self.word_index.words
+        return (words[word_id] for word_id in iter_bits(self._possible_words_bitset()))
+
+    # Returns one page of `iter_possible_words`, without materializing the pages before or after it.
+    def possible_words(self, page: int = 0, page_size: int = 50) -> list[str]:
+        return list(islice(self.iter_possible_words(), page * page_size, (page + 1) * page_size))
+
+    def _possible_words_bitset(self) -> int:
+        possible = 0
+        for solution_space in self.solution_spaces:
+            possible |= self.word_index.matching(solution_space)
+        return possible & self.candidates
+
+    # Moves the solver to a new state, in which `guess` has been given `clue`. The previous state can be returned to
+    # with `undo`.
     def expand_solution_spaces(
             self,
-            guess: str, clue: str,
-            fact_or_fiction_check: Optional[tuple[int, bool]]
+            guess: str, clue: int,
+            fact_or_fiction_check: Optional[tuple[int, bool]],
+            cancel: Optional[threading.Event] = None,
     ) -> None:
-        new_solution_spaces = []
-        for solution_space in self.solution_spaces:
-            new_solution_spaces += self.expand_solution_space(solution_space, guess, clue, fact_or_fiction_check)
-        self.solution_spaces = new_solution_spaces
+        self.state = self._expand(self.state, guess, clue, fact_or_fiction_check, cancel)
+        self._redo_states = []
+
+    def _expand(
+            self,
+            state: SolverState,
+            guess: str, clue: int,
+            fact_or_fiction_check: Optional[tuple[int, bool]],
+            cancel: Optional[threading.Event] = None,
+    ) -> SolverState:
+        candidates = state.candidates & self.partition_cache.consistent_words(
+            guess, Solver._possible_true_clues(clue, fact_or_fiction_check))
+
+        if self.parallel is not None and self.parallel.should_expand(len(state.solution_spaces)):
+            new_solution_spaces = self.parallel.expand(
+                state.solution_spaces, guess, clue, fact_or_fiction_check, candidates, cancel)
+        else:
+            new_solution_spaces = []
+            for b, solution_space in enumerate(state.solution_spaces):
+                if b % CANCEL_CHECK_INTERVAL == 0:
+                    _check_cancelled(cancel)
+                new_solution_spaces += self.expand_solution_space(solution_space, guess, clue, fact_or_fiction_check)
+            # Branches that no longer contain any candidate words can never contain the secret word
+            new_solution_spaces = [
+                solution_space for solution_space in new_solution_spaces
+                if self.word_index.matching(solution_space) & candidates
+            ]
+        # A cancelled expansion never produces a state
+        _check_cancelled(cancel)
+        return SolverState(
+            solution_spaces=tuple(new_solution_spaces),
+            candidates=candidates,
+            parent=state,
+            move=(guess, clue, fact_or_fiction_check),
+        )
+
+    # Given a clue that contains exactly 1 lie, and optionally the result of a fact-or-fiction check on it, returns
+    # every clue that could be the correct clue.
+    @staticmethod
+    def _possible_true_clues(clue: int, fact_or_fiction_check: Optional[tuple[int, bool]]) -> tuple[int, ...]:
+        if fact_or_fiction_check:
+            position, is_fact = fact_or_fiction_check
+            if not is_fact: # Every other position must be the truth. The lie is at `position`.
+                return SINGLE_LIE_VARIANTS_AT[clue][position]
+            else: # There is no lie at `position`
+                return tuple(new_clue for i, variants in enumerate(SINGLE_LIE_VARIANTS_AT[clue]) if i != position
+                             for new_clue in variants)
+        return SINGLE_LIE_VARIANTS[clue]
 
     # Given the current solution space, a guess and a clue that contains exactly 1 lie, returns a
     # list of solution space branches, where each branch supposes that the lie is in a different
@@ -145,34 +659,11 @@ class Solver:
             cls,
             solution_space: SolutionSpace,
             guess: str,
-            clue: str,
+            clue: int,
             fact_or_fiction_check: Optional[tuple[int, bool]]
     ) -> list[SolutionSpace]:
         # Generate all possible correct clues, given a clue with a single lie.
-        clue_chr_possibilities = ['Y', 'X', '~']
-        new_clues = []
-
-        if fact_or_fiction_check:
-            position, is_fact = fact_or_fiction_check
-            if not is_fact: # Every other position must be the truth. The lie is at `position`.
-                for new_chr in clue_chr_possibilities:
-                    if new_chr != clue[position]:
-                        new_clue = clue[:position] + new_chr + clue[position + 1:]
-                        new_clues.append(new_clue)
-            else: # There is no lie at `position`
-                for i, clue_chr in enumerate(clue):
-                    if i == position:
-                        continue
-                    for new_chr in clue_chr_possibilities:
-                        if new_chr != clue_chr:
-                            new_clue = clue[:i] + new_chr + clue[i + 1:]
-                            new_clues.append(new_clue)
-        else:
-            for i, clue_chr in enumerate(clue):
-                for new_chr in clue_chr_possibilities:
-                    if new_chr != clue_chr:
-                        new_clue = clue[:i] + new_chr + clue[i + 1:]
-                        new_clues.append(new_clue)
+        new_clues = cls._possible_true_clues(clue, fact_or_fiction_check)
 
         new_solution_spaces = []
         for new_clue in new_clues:
@@ -185,57 +676,141 @@ class Solver:
         return new_solution_spaces
 
     @classmethod
-    def _update(cls, solution_space: SolutionSpace, guess: str, clue: str) -> SolutionSpace:
-        new_solution_space = copy.deepcopy(solution_space)
-        a = ord('a')
-        for i, (guess_chr, clue_chr) in enumerate(zip(guess, clue)):
-            guess_chr_idx: int = ord(guess_chr) - a
-
-            if clue_chr == 'Y':
-                if new_solution_space.possible[i][guess_chr_idx] == 0:
+    def _update(cls, solution_space: SolutionSpace, guess: str, clue: int) -> SolutionSpace:
+        update = _SolutionSpaceUpdate.of(solution_space)
+        possible = update.possible
+        confirmed = update.confirmed
+        guess_idxs = letter_indexes(guess)
+        clue_digits = CLUE_DIGITS[clue]
+        for i, (guess_chr, clue_digit) in enumerate(zip(guess, clue_digits)):
+            guess_chr_idx: int = guess_idxs[i]
+            guess_chr_bit = _LETTER_BITS[guess_chr_idx]
+
+            if clue_digit == Y:
+                if not possible[i] & guess_chr_bit:
                     raise IncompatibleClueError()
-                if new_solution_space.confirmed[i] and new_solution_space.confirmed[i] != guess_chr:
+                if confirmed[i] and confirmed[i] != guess_chr:
                     raise IncompatibleClueError()
-                if (len(new_solution_space.confirmed_position_agnostic) >= 5
-                        and guess_chr not in new_solution_space.confirmed_position_agnostic):
+                if (bin(update.confirmed_position_agnostic).count("1") >= 5
+                        and not update.confirmed_position_agnostic & guess_chr_bit):
                     raise IncompatibleClueError()
 
-                for j in range(26):
-                    if j != guess_chr_idx:
-                        new_solution_space.possible[i][j] = 0
-
-                new_solution_space.confirmed[i] = guess_chr
-                new_solution_space.confirmed_position_agnostic.add(guess_chr)
+                possible[i] = guess_chr_bit
+                confirmed[i] = guess_chr
+                update.confirmed_position_agnostic |= guess_chr_bit
 
-            elif clue_chr == 'X':
+            elif clue_digit == X:
                 # We cannot rule out the letter entirely if it appears elsewhere in the guess with a clue of '~' or 'Y'
                 squiggly_appears = False
-                for j, c in enumerate(guess):
-                    if c == guess_chr and clue[j] == '~':
+                for j in range(5):
+                    if guess_idxs[j] == guess_chr_idx and clue_digits[j] == SQUIGGLE:
                         squiggly_appears = True
                 for j in range(5):
-                    if (not squiggly_appears and not (guess[j] == guess_chr and clue[j] == 'Y')) or j == i:
-                        new_solution_space.possible[j][guess_chr_idx] = 0
+                    is_same_chr_confirmed = guess_idxs[j] == guess_chr_idx and clue_digits[j] == Y
+                    if (not squiggly_appears and not is_same_chr_confirmed) or j == i:
+                        possible[j] &= ~guess_chr_bit
 
             else:  # If the clue was "~"
-                if all(new_solution_space.possible[j][guess_chr_idx] == 0 for j in range(5)):
+                if not any(row & guess_chr_bit for row in possible):
                     raise IncompatibleClueError()
-                if new_solution_space.confirmed[i] == guess_chr:
+                if confirmed[i] == guess_chr:
                     raise IncompatibleClueError()
-                if (len(new_solution_space.confirmed_position_agnostic) >= 5
-                        and guess_chr not in new_solution_space.confirmed_position_agnostic):
+                if (bin(update.confirmed_position_agnostic).count("1") >= 5
+                        and not update.confirmed_position_agnostic & guess_chr_bit):
                     raise IncompatibleClueError()
 
                 # Check if there is space for the character to go anywhere else in the word
                 has_space_for_chr = False
                 for j in range(5):
-                    if (j != i and
-                            (new_solution_space.confirmed[j] is None or new_solution_space.confirmed[j] == guess_chr)
-                            and new_solution_space.possible[j][guess_chr_idx] == 1):
+                    if (j != i and (confirmed[j] is None or confirmed[j] == guess_chr)
+                            and possible[j] & guess_chr_bit):
                         has_space_for_chr = True
                 if not has_space_for_chr:
                     raise IncompatibleClueError()
 
-                new_solution_space.possible[i][guess_chr_idx] = 0
-                new_solution_space.confirmed_position_agnostic.add(guess_chr)
-        return new_solution_space
+                possible[i] &= ~guess_chr_bit
+                update.confirmed_position_agnostic |= guess_chr_bit
+        cls._update_letter_counts(update, guess, clue_digits)
+        cls._propagate(update)
+        return update.freeze()
+
+    # Clues also say how many times each guessed letter is in the word: a letter marked 'Y' or '~' n times is in it at
+    # least n times, and exactly n times if the letter is also marked 'X'. Since '~'s go to the leftmost unmatched
+    # letters first, a letter is never marked '~' after it has been marked 'X'.
+    @staticmethod
+    def _update_letter_counts(update: _SolutionSpaceUpdate, guess: str, clue_digits: tuple[int, ...]) -> None:
+        for c in set(guess):
+            num_present = 0
+            is_bounded = False
+            for guess_chr, clue_digit in zip(guess, clue_digits):
+                if guess_chr != c:
+                    continue
+                if clue_digit == X:
+                    is_bounded = True
+                elif clue_digit == SQUIGGLE and is_bounded:
+                    raise IncompatibleClueError()
+                else:
+                    num_present += 1
+
+            min_count = max(update.min_counts.get(c, 0), num_present)
+            max_count = update.max_counts.get(c, 5)
+            if is_bounded:
+                max_count = min(max_count, num_present)
+            if max(min_count, update.confirmed_position_agnostic >> (ord(c) - _A) & 1) > max_count:
+                raise IncompatibleClueError()
+            if sum(1 for confirmed_chr in update.confirmed if confirmed_chr == c) > max_count:
+                raise IncompatibleClueError()
+            if min_count >= 2:
+                update.min_counts[c] = min_count
+            if 1 <= max_count < 5:
+                update.max_counts[c] = max_count
+
+    # Propagates the constraints on a solution space across positions, until nothing changes:
+    # - a letter that has been confirmed as many times as it can be in the word can't be anywhere else
+    # - a letter that must be in the word as many times as it has possible positions left is confirmed in all of them
+    # Raises an `IncompatibleClueError` if no word could fit, because a position has no possible letters left, or the
+    # letters that must be in the word can't all be given different positions. None of this changes which words the
+    # solution space allows, but branches that can't contain any word are dropped as soon as they are created.
+    @staticmethod
+    def _propagate(update: _SolutionSpaceUpdate) -> None:
+        possible = update.possible
+        confirmed = update.confirmed
+        changed = True
+        while changed:
+            changed = False
+            for i, confirmed_c in enumerate(confirmed):
+                if confirmed_c is None:
+                    if not possible[i]:
+                        raise IncompatibleClueError()
+                elif not possible[i] >> (ord(confirmed_c) - _A) & 1:
+                    raise IncompatibleClueError()
+
+            for c, max_count in update.max_counts.items():
+                c_bit = _LETTER_BITS[ord(c) - _A]
+                if confirmed.count(c) == max_count:
+                    for i in range(5):
+                        if confirmed[i] != c and possible[i] & c_bit:
+                            possible[i] &= ~c_bit
+                            changed = True
+
+            # Each required occurrence of a letter, with the positions it could be in
+            occurrences: list[list[int]] = []
+            required = update.confirmed_position_agnostic
+            for c in update.min_counts:
+                required |= _LETTER_BITS[ord(c) - _A]
+            for c_idx in iter_bits(required):
+                c = chr(_A + c_idx)
+                c_bit = _LETTER_BITS[c_idx]
+                num_required = max(update.min_counts.get(c, 0), 1)
+                positions = [i for i in range(5) if possible[i] & c_bit and confirmed[i] in (None, c)]
+                if len(positions) < num_required:
+                    raise IncompatibleClueError()
+                if len(positions) == num_required:
+                    for i in positions:
+                        if confirmed[i] is None:
+                            possible[i] = c_bit
+                            confirmed[i] = c
+                            changed = True
+                occurrences += [positions] * num_required
+            if len(occurrences) > 5 or not _can_place(occurrences):
+                raise IncompatibleClueError()
@@ -0,0 +1,338 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional, Sequence
+
+from application.clues import CLUE_DIGITS, correct_clue, SINGLE_LIE_VARIANTS
+from application.decision_cache import DecisionCache
+from application.main import pick_known_char
+from application.results_store import ResultsStore
+from application.solver import initialize_solution_space, set_default_decision_cache, Solver
+from application.word_data import load_word_data
+
+# Plays every guesser strategy against every librarian strategy on the same seeded sample of secret words, to compare
+# solver heuristics head to head:
+#
+#   python application/tournament.py --words 100 --seed 1 --workers 4
+#
+# Games are played headlessly, the way `main.play` plays them in fully automated mode: one solver per game that both
+# sides consult, up to `MAX_GUESSES` guesses, and a fact-or-fiction check of a random position after every third clue.
+# The secret word's known character, the checks and any random choices a strategy makes come from random generators
+# seeded by the tournament seed and the game, so a cell's results don't depend on how games are spread over workers.
+#
+# The secret words are split into shards that each play every cell, so a worker reuses what it has computed for one
+# cell in the others: the partition cache (see `partitions`) that all solvers in a process share, and the opening
+# guess for each known character, which only depends on the guesser strategy. With a decision cache (see
+# `decision_cache`), solver decisions are also shared between workers and with later tournaments.
+
+MAX_GUESSES = 10
+MAX_CHECKS = 3
+# Number of top suggestions that the lookahead guesser evaluates in full
+LOOKAHEAD_WIDTH = 8
+SHARDS_PER_WORKER = 4
+
+GuesserStrategy = Callable[[Solver, random.Random], str]
+# Given the solver, the guess and its correct clue, returns the clue to give
+LibrarianStrategy = Callable[[Solver, str, int, random.Random], int]
+
+
+class TournamentError(Exception):
+    pass
+
+
+# The branch-count heuristic, with ties broken by letter frequency (see `Solver.suggest`).
+def _guess_most_branches(solver: Solver, rng: random.Random) -> str:
+    return solver.pick_guess()
+
+
+# Ignores branches entirely: the possible word whose letters are the most common in the word list.
+def _guess_most_frequent_letters(solver: Solver, rng: random.Random) -> str:
+    letter_to_freq = solver.letter_to_freq
+    return max(solver.iter_possible_words(), key=lambda word: sum(letter_to_freq[letter] for letter in word))
+
+
+# Looks one clue ahead: of the best suggestions by branch count, the one expected to leave the fewest words.
+def _guess_lookahead(solver: Solver, rng: random.Random) -> str:
+    suggestions = solver.suggest(LOOKAHEAD_WIDTH)
+    if not suggestions:
+        raise TournamentError("No possible words found")
+    return min(suggestions, key=lambda suggestion: solver.hint(suggestion.word).expected_remaining).word
+
+
+# The lie that leaves the most branches open (see `Solver.pick_clue`), or a random lie if none leaves any open.
+def _clue_most_branches(solver: Solver, guess: str, correct: int, rng: random.Random) -> int:
+    clue = solver.pick_clue(correct, guess)
+    return clue if clue is not None else _clue_random(solver, guess, correct, rng)
+
+
+def _clue_random(solver: Solver, guess: str, correct: int, rng: random.Random) -> int:
+    return rng.choice(SINGLE_LIE_VARIANTS[correct])
+
+
+GUESSER_STRATEGIES: dict[str, GuesserStrategy] = {
+    "branches": _guess_most_branches,
+    "letter-frequency": _guess_most_frequent_letters,
+    "lookahead": _guess_lookahead,
+}
+LIBRARIAN_STRATEGIES: dict[str, LibrarianStrategy] = {
+    "branches": _clue_most_branches,
+    "random": _clue_random,
+}
+
+# Opening guesses by (word list hash, guesser strategy, known character), per process. Strategies don't use the random
+# generator for their opening guess, so it is the same in every game on the same word list with the same known
+# character.
+_opening_guesses: dict[tuple[bytes, str, str], str] = {}
+
+
+@dataclass
+class CellResult:
+    guesser: str
+    librarian: str
+    num_games: int = 0
+    num_wins: int = 0
+    # Guesses made over every game, counting the guesses in lost games
+    num_attempts: int = 0
+    # Guesses that the strategy picked, i.e. not counting cached opening guesses
+    num_guesses_picked: int = 0
+    num_clues: int = 0
+    # Total time spent picking guesses and clues, in seconds
+    guess_seconds: float = 0.0
+    clue_seconds: float = 0.0
+
+    @property
+    def win_rate(self) -> float:
+        return self.num_wins / self.num_games if self.num_games else 0.0
+
+    @property
+    def mean_attempts(self) -> float:
+        return self.num_attempts / self.num_games if self.num_games else 0.0
+
+    @property
+    def mean_guess_latency(self) -> float:
+        return self.guess_seconds / self.num_guesses_picked if self.num_guesses_picked else 0.0
+
+    @property
+    def mean_clue_latency(self) -> float:
+        return self.clue_seconds / self.num_clues if self.num_clues else 0.0
+
+    def add(self, other: "CellResult") -> None:
+        self.num_games += other.num_games
+        self.num_wins += other.num_wins
+        self.num_attempts += other.num_attempts
+        self.num_guesses_picked += other.num_guesses_picked
+        self.num_clues += other.num_clues
+        self.guess_seconds += other.guess_seconds
+        self.clue_seconds += other.clue_seconds
+
+
+@dataclass
+class PlayedTurn:
+    guess: str
+    # Time taken to pick the guess, in seconds, or None if it was a cached opening guess
+    guess_seconds: Optional[float]
+    # The representation that the solver last counted guesses in when the guess was picked (see
+    # `Solver.search_suggestions`), or None if it was a cached opening guess
+    representation: Optional[str] = None
+    # The rest is None for a winning guess
+    clue: Optional[int] = None
+    clue_seconds: Optional[float] = None
+    # (0-indexed position, whether the clue for it was true)
+    check: Optional[tuple[int, bool]] = None
+    # Time taken to apply the clue to the solver, and the number of branches after it
+    expand_seconds: Optional[float] = None
+    num_branches: Optional[int] = None
+
+
+@dataclass
+class PlayedGame:
+    word: str
+    known_char: str
+    guesser: str
+    librarian: str
+    won: bool = False
+    turns: list[PlayedTurn] = field(default_factory=list)
+
+
+# Returns the secret words for a tournament: a sample of `num_words` words that only depends on `seed`.
+def sample_words(word_list: Sequence[str], num_words: int, seed: int) -> list[str]:
+    return random.Random(seed).sample(list(word_list), min(num_words, len(word_list)))
+
+
+# Plays one game, adds it to `result` and returns a record of it. If given, `on_turn` is called with the solver after
+# every turn's clue has been applied to it.
+def play_game(
+        word_list: list[str], word: str, seed: int, result: CellResult,
+        on_turn: Optional[Callable[[Solver], None]] = None,
+) -> PlayedGame:
+    guesser = GUESSER_STRATEGIES[result.guesser]
+    librarian = LIBRARIAN_STRATEGIES[result.librarian]
+    # The known character is the same in every cell, the other random choices are per cell
+    known_char = pick_known_char(word, random.Random(f"{seed}/{word}"))
+    rng = random.Random(f"{seed}/{word}/{result.guesser}/{result.librarian}")
+    solver = Solver(word_list, initialize_solution_space(known_char))
+    game = PlayedGame(word=word, known_char=known_char, guesser=result.guesser, librarian=result.librarian)
+
+    num_checks = 0
+    result.num_games += 1
+    for attempt in range(1, MAX_GUESSES + 1):
+        opening_key = (solver.word_index.hash, result.guesser, known_char)
+        if attempt == 1 and opening_key in _opening_guesses:
+            turn = PlayedTurn(guess=_opening_guesses[opening_key], guess_seconds=None)
+        else:
+            start = time.perf_counter()
+            guess = guesser(solver, rng)
+            elapsed = time.perf_counter() - start
+            turn = PlayedTurn(guess=guess, guess_seconds=elapsed, representation=solver.representation)
+            result.guess_seconds += elapsed
+            result.num_guesses_picked += 1
+            if attempt == 1:
+                _opening_guesses[opening_key] = guess
+        game.turns.append(turn)
+        result.num_attempts += 1
+        if turn.guess == word:
+            result.num_wins += 1
+            game.won = True
+            return game
+
+        correct = correct_clue(turn.guess, word)
+        start = time.perf_counter()
+        turn.clue = librarian(solver, turn.guess, correct, rng)
+        turn.clue_seconds = time.perf_counter() - start
+        result.clue_seconds += turn.clue_seconds
+        result.num_clues += 1
+
+        if num_checks < MAX_CHECKS and attempt % 3 == 0:
+            position = rng.randrange(5)
+            turn.check = (position, CLUE_DIGITS[turn.clue][position] == CLUE_DIGITS[correct][position])
+            num_checks += 1
+        start = time.perf_counter()
+        solver.expand_solution_spaces(turn.guess, turn.clue, turn.check)
+        turn.expand_seconds = time.perf_counter() - start
+        turn.num_branches = len(solver.solution_spaces)
+        if on_turn is not None:
+            on_turn(solver)
+    return game
+
+
+# Plays every game of `words` in every cell. Returns the results of each cell, and a record of every game if
+# `keep_games` is set.
+def _play_shard(
+        word_list: list[str], words: list[str], cells: list[tuple[str, str]], seed: int, keep_games: bool
+) -> tuple[list[CellResult], list[PlayedGame]]:
+    results = [CellResult(guesser, librarian) for guesser, librarian in cells]
+    games = []
+    for word in words:
+        for result in results:
+            game = play_game(word_list, word, seed, result)
+            if keep_games:
+                games.append(game)
+    return results, games
+
+
+def _init_worker(decision_cache_path: Optional[str]) -> None:
+    if decision_cache_path is not None:
+        set_default_decision_cache(DecisionCache(decision_cache_path))
+
+
+# Returns the results of every cell, in the order of `guessers` x `librarians`. With `num_workers` > 1, shards of the
+# words are played in a process pool. If `decision_cache_path` is given, every solver uses the decision cache there.
+# If `on_games` is given, it is called with the record of every game, a shard at a time as shards finish.
+def run_tournament(
+        words: Sequence[str],
+        guessers: Sequence[str] = tuple(GUESSER_STRATEGIES),
+        librarians: Sequence[str] = tuple(LIBRARIAN_STRATEGIES),
+        seed: int = 0,
+        num_workers: int = 1,
+        word_list: Optional[list[str]] = None,
+        decision_cache_path: Optional[str] = None,
+        on_games: Optional[Callable[[list[PlayedGame]], None]] = None,
+) -> list[CellResult]:
+    for name in guessers:
+        if name not in GUESSER_STRATEGIES:
+            raise TournamentError(f"Unknown guesser strategy {name!r}")
+    for name in librarians:
+        if name not in LIBRARIAN_STRATEGIES:
+            raise TournamentError(f"Unknown librarian strategy {name!r}")
+    word_list = word_list if word_list is not None else load_word_data().words
+    cells = [(guesser, librarian) for guesser in guessers for librarian in librarians]
+    totals = [CellResult(guesser, librarian) for guesser, librarian in cells]
+
+    if num_workers <= 1:
+        decision_cache = DecisionCache(decision_cache_path) if decision_cache_path is not None else None
+        set_default_decision_cache(decision_cache)
+        try:
+            shard_results = [_play_shard(word_list, list(words), cells, seed, on_games is not None)]
+        finally:
+            set_default_decision_cache(None)
+            if decision_cache is not None:
+                decision_cache.close()
+    else:
+        num_shards = num_workers * SHARDS_PER_WORKER
+        shards = [list(words[s::num_shards]) for s in range(num_shards) if words[s::num_shards]]
+        with ProcessPoolExecutor(
+                max_workers=num_workers, initializer=_init_worker, initargs=(decision_cache_path,)
+        ) as executor:
+            shard_results = list(executor.map(
+                _play_shard, *zip(*((word_list, shard, cells, seed, on_games is not None) for shard in shards))))
+    return _add_shards(totals, shard_results, on_games)
+
+
+def _add_shards(
+        totals: list[CellResult],
+        shard_results: Iterable[tuple[list[CellResult], list[PlayedGame]]],
+        on_games: Optional[Callable[[list[PlayedGame]], None]],
+) -> list[CellResult]:
+    for results, games in shard_results:
+        for total, result in zip(totals, results):
+            total.add(result)
+        if on_games is not None:
+            on_games(games)
+    return totals
+
+
+def format_results(results: Sequence[CellResult]) -> str:
+    lines = [f"{'guesser':<18}{'librarian':<12}{'games':>7}{'win rate':>10}{'attempts':>10}"
+             f"{'ms/guess':>10}{'ms/clue':>10}"]
+    for result in results:
+        lines.append(
+            f"{result.guesser:<18}{result.librarian:<12}{result.num_games:>7}{result.win_rate:>10.1%}"
+            f"{result.mean_attempts:>10.2f}{result.mean_guess_latency * 1000:>10.1f}"
+            f"{result.mean_clue_latency * 1000:>10.1f}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Plays guesser strategies against librarian strategies.")
+    parser.add_argument("--words", type=int, default=50, help="number of secret words to play each cell on")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--guessers", nargs="+", default=list(GUESSER_STRATEGIES), choices=list(GUESSER_STRATEGIES))
+    parser.add_argument("--librarians", nargs="+", default=list(LIBRARIAN_STRATEGIES),
+                        choices=list(LIBRARIAN_STRATEGIES))
+    parser.add_argument("--decision-cache", help="file of solver decisions to share between games and runs")
+    parser.add_argument("--results", help="results store to record every game in (see `results_store`)")
+    parser.add_argument("--solver-version", help="version to record the games under (the git commit by default)")
+    args = parser.parse_args()
+
+    word_list = load_word_data().words
+    words = sample_words(word_list, args.words, args.seed)
+    store = ResultsStore(args.results) if args.results else None
+    on_games = None
+    if store is not None:
+        run_id = store.start_run(args.solver_version, args.seed, f"tournament of {len(words)} words")
+        on_games = lambda games: store.record_games(run_id, games)
+    try:
+        results = run_tournament(
+            words, args.guessers, args.librarians, args.seed, args.workers, word_list, args.decision_cache, on_games)
+    finally:
+        if store is not None:
+            store.close()
+    print(format_results(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import os
+import struct
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cache
+from typing import Optional
+
+try:
+    # The same blake2b that `hashlib` provides, without the OpenSSL bindings that importing `hashlib` loads first,
+    # which take several times longer to load than the whole artifact
+    from _blake2 import blake2b  # type: ignore[import-not-found]
+except ImportError:
+    from hashlib import blake2b
+
+
+# The word list and the tables derived from it, loaded from a packed binary artifact (`word_list.bin`) instead of
+# being parsed out of the 2,300-line `word_list.py` literal and re-indexed by every process and every solver.
+#
+# The artifact is generated from `word_list.py`, which stays the source of truth, and records a hash of that file.
+# If the source changes, the artifact is considered stale and is rebuilt (and rewritten, if possible) on the next
+# load. To regenerate it explicitly, run `python -m application.word_data`. The artifact looks like:
+#
+#   header:            magic (4 bytes) | format version (uint8) | source file hash (16 bytes)
+#                      | word list hash (16 bytes) | number of words N (uint32)
+#   words:             N * 5 ASCII bytes
+#   letter_to_freq:    26 uint32s, the number of occurrences of each letter across all words
+#   position_index:    5 * 26 bitsets of ceil(N / 8) bytes each. Bit k of bitset (i, j) is set if word k has the j-th
+#                      letter of the alphabet at position i.
+
+MAGIC = b"FWLA"
+FORMAT_VERSION = 1
+WORD_LENGTH = 5
+WORD_LIST_HASH_SIZE = 16
+MAX_CACHED_WORD_LIST_HASHES = 64
+
+SOURCE_PATH = os.path.join(os.path.dirname(__file__), "word_list.py")
+ARTIFACT_PATH = os.path.join(os.path.dirname(__file__), "word_list.bin")
+
+_HEADER = struct.Struct(f"<4sB{WORD_LIST_HASH_SIZE}s{WORD_LIST_HASH_SIZE}sI")
+_LETTER_FREQS = struct.Struct("<26I")
+_A = ord('a')
+
+
+# Word lists are never modified once loaded, so their hashes are cached by identity. The list itself is kept in
+# the cache so that its id can't be reused by another list. Ordered from least to most recently used, and limited
+# to `MAX_CACHED_WORD_LIST_HASHES` lists so that short-lived lists aren't kept alive forever.
+_word_list_hashes: OrderedDict[int, tuple[list[str], bytes]] = OrderedDict()
+_word_list_hashes_lock = threading.Lock()
+
+
+class WordDataError(Exception):
+    pass
+
+
+# Returns a hash of the contents of `word_list`, used to check that state computed against one word list is never
+# used with another.
+def word_list_hash(word_list: list[str]) -> bytes:
+    with _word_list_hashes_lock:
+        cached = _word_list_hashes.get(id(word_list))
+        if cached is not None and cached[0] is word_list:
+            _word_list_hashes.move_to_end(id(word_list))
+            return cached[1]
+    digest = blake2b("\n".join(word_list).encode(), digest_size=WORD_LIST_HASH_SIZE).digest()
+    with _word_list_hashes_lock:
+        _word_list_hashes[id(word_list)] = (word_list, digest)
+        _word_list_hashes.move_to_end(id(word_list))
+        while len(_word_list_hashes) > MAX_CACHED_WORD_LIST_HASHES:
+            _word_list_hashes.popitem(last=False)
+    return digest
+
+
+@dataclass(frozen=True)
+class WordData:
+    words: list[str]
+    # Map from letter to number of times it occurs in the word list
+    letter_to_freq: dict[str, int]
+    # For positions 0-4, a 26-element list of bitsets over word indexes. Bit k of `position_index[i][j]` is set if
+    # `words[k][i]` is the j-th letter of the alphabet.
+    position_index: list[list[int]]
+    # See `word_list_hash`
+    hash: bytes
+
+
+def build_word_data(words: list[str]) -> WordData:
+    letter_to_freq = {chr(_A + j): 0 for j in range(26)}
+    position_index = [[0 for _ in range(26)] for _ in range(WORD_LENGTH)]
+    for k, word in enumerate(words):
+        if len(word) != WORD_LENGTH or not all('a' <= c <= 'z' for c in word):
+            raise WordDataError(f"Word {word!r} must be {WORD_LENGTH} lowercase letters")
+        for i, c in enumerate(word):
+            letter_to_freq[c] += 1
+            position_index[i][ord(c) - _A] |= 1 << k
+    return WordData(words=words, letter_to_freq=letter_to_freq, position_index=position_index,
+                    hash=word_list_hash(words))
+
+
+def _source_hash(source_path: str) -> bytes:
+    with open(source_path, "rb") as f:
+        return blake2b(f.read(), digest_size=WORD_LIST_HASH_SIZE).digest()
+
+
+def encode_word_data(word_data: WordData, source_hash: bytes) -> bytes:
+    num_words = len(word_data.words)
+    bitset_size = (num_words + 7) // 8
+    return b"".join([
+        _HEADER.pack(MAGIC, FORMAT_VERSION, source_hash, word_data.hash, num_words),
+        "".join(word_data.words).encode("ascii"),
+        _LETTER_FREQS.pack(*(word_data.letter_to_freq[chr(_A + j)] for j in range(26))),
+        *(bitset.to_bytes(bitset_size, "little") for row in word_data.position_index for bitset in row),
+    ])
+
+
+# Decodes an artifact, raising a `WordDataError` if it is malformed or wasn't generated from a source file with
+# hash `expected_source_hash`.
+def decode_word_data(data: bytes, expected_source_hash: Optional[bytes] = None) -> WordData:
+    if len(data) < _HEADER.size:
+        raise WordDataError("Data is too short to contain a word list")
+    magic, version, source_hash, encoded_word_list_hash, num_words = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise WordDataError("Data is not a word list artifact")
+    if version != FORMAT_VERSION:
+        raise WordDataError(f"Unsupported word list artifact format version {version}")
+    if expected_source_hash is not None and source_hash != expected_source_hash:
+        raise WordDataError("Word list artifact is stale")
+
+    bitset_size = (num_words + 7) // 8
+    words_end = _HEADER.size + num_words * WORD_LENGTH
+    freqs_end = words_end + _LETTER_FREQS.size
+    if len(data) != freqs_end + WORD_LENGTH * 26 * bitset_size:
+        raise WordDataError("Word list artifact has an unexpected length")
+
+    packed_words = data[_HEADER.size:words_end].decode("ascii")
+    words = [packed_words[k:k + WORD_LENGTH] for k in range(0, len(packed_words), WORD_LENGTH)]
+    if word_list_hash(words) != encoded_word_list_hash:
+        raise WordDataError("Word list artifact is corrupt")
+    letter_to_freq = {chr(_A + j): freq for j, freq in enumerate(_LETTER_FREQS.unpack_from(data, words_end))}
+    position_index = [
+        [
+            int.from_bytes(data[offset:offset + bitset_size], "little")
+            for offset in range(freqs_end + (i * 26) * bitset_size, freqs_end + (i + 1) * 26 * bitset_size,
+                                bitset_size)
+        ]
+        for i in range(WORD_LENGTH)
+    ]
+    return WordData(words=words, letter_to_freq=letter_to_freq, position_index=position_index,
+                    hash=encoded_word_list_hash)
+
+
+# Regenerates the artifact from the source word list (`word_list.py`). Returns the generated word data.
+def write_artifact(artifact_path: Optional[str] = None) -> WordData:
+    from application.word_list import word_list
+    artifact_path = artifact_path or ARTIFACT_PATH
+    word_data = build_word_data(word_list)
+    # Write to a temporary file first, so that concurrent processes never read a partially written artifact
+    tmp_path = f"{artifact_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(encode_word_data(word_data, _source_hash(SOURCE_PATH)))
+    os.replace(tmp_path, artifact_path)
+    return word_data
+
+
+# Loads the word list and its derived tables, falling back to (and refreshing the artifact from) the source list if
+# the artifact is missing or stale. The result is shared by every caller in the process.
+@cache
+def load_word_data() -> WordData:
+    source_hash = _source_hash(SOURCE_PATH)
+    try:
+        with open(ARTIFACT_PATH, "rb") as f:
+            return decode_word_data(f.read(), source_hash)
+    except (OSError, WordDataError):
+        pass
+    try:
+        return write_artifact()
+    except OSError:  # e.g. the application directory is read-only
+        from application.word_list import word_list
+        return build_word_data(word_list)
+
+
+if __name__ == "__main__":
+    word_data = write_artifact()
+    print(f"Wrote {len(word_data.words)} words to {ARTIFACT_PATH}")
@@ -0,0 +1,190 @@
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Iterator, Mapping, Sequence, TYPE_CHECKING
+
+from application.clues import letter_mask
+from application.word_data import build_word_data, load_word_data, word_list_hash, WordData
+
+if TYPE_CHECKING:
+    from application.solver import SolutionSpace
+
+
+_A = ord('a')
+# Number of bits used to encode each letter of a word, see `encode_word`
+LETTER_BITS = 5
+
+
+def encode_word(word: str) -> int:
+    encoded = 0
+    for i, c in enumerate(word):
+        encoded |= (ord(c) - _A) << (LETTER_BITS * i)
+    return encoded
+
+
+def decode_word(encoded: int) -> str:
+    return "".join(chr(_A + (encoded >> (LETTER_BITS * i) & 0b11111)) for i in range(5))
+
+
+# Returns the alphabet index (0-25) of each letter in `word`
+@lru_cache(maxsize=4096)
+def letter_indexes(word: str) -> tuple[int, ...]:
+    return tuple(ord(c) - _A for c in word)
+
+
+def iter_bits(bitset: int) -> Iterator[int]:
+    while bitset:
+        lowest_bit = bitset & -bitset
+        yield lowest_bit.bit_length() - 1
+        bitset ^= lowest_bit
+
+
+# Bit-sliced counters keep a count for every word at once: bit k of `counters[i]` is bit i of word k's count.
+
+# Adds one to the count of every word in `bitset`.
+def add_to_counters(counters: list[int], bitset: int) -> None:
+    i = 0
+    while bitset:
+        if i == len(counters):
+            counters.append(bitset)
+            return
+        carry = counters[i] & bitset
+        counters[i] ^= bitset
+        bitset = carry
+        i += 1
+
+
+# Returns the words in `bitset` with the highest count in `counters`, and that count.
+def max_counted(counters: Sequence[int], bitset: int) -> tuple[int, int]:
+    count = 0
+    for i in range(len(counters) - 1, -1, -1):
+        if bitset & counters[i]:
+            bitset &= counters[i]
+            count |= 1 << i
+    return bitset, count
+
+
+# An immutable index over a word list, shared by every solver that uses the same word list. Words are identified by
+# their position in the word list (their word id), and sets of words are represented as bitsets over word ids, so
+# that finding the words compatible with a solution space is a handful of ANDs and ORs instead of a scan over the
+# whole list. Use `get_word_index` rather than constructing one directly.
+@dataclass(frozen=True)
+class WordIndex:
+    words: tuple[str, ...]
+    # Map from word to word id
+    word_ids: Mapping[str, int]
+    # Words packed into ints, see `encode_word`
+    encoded_words: tuple[int, ...]
+    # Map from letter to number of times it occurs in the word list
+    letter_to_freq: Mapping[str, int]
+    # For positions 0-4, a 26-element tuple of bitsets. Bit k of `position_bitsets[i][j]` is set if word k has the
+    # j-th letter of the alphabet at position i.
+    position_bitsets: tuple[tuple[int, ...], ...]
+    # A 26-element tuple of bitsets. Bit k of `letter_bitsets[j]` is set if word k contains the j-th letter anywhere.
+    letter_bitsets: tuple[int, ...]
+    # For each letter, a 7-element tuple of bitsets. Bit k of `letter_count_bitsets[j][n]` is set if word k contains
+    # the j-th letter at least n times.
+    letter_count_bitsets: tuple[tuple[int, ...], ...]
+    # For each word id, a 26-bit mask of the letters in the word (see `clues.letter_mask`)
+    letter_masks: tuple[int, ...]
+    # For each word id, the sum of `letter_to_freq` over the word's letters
+    letter_freq_scores: tuple[int, ...]
+    # `letter_freq_scores` as bit-sliced counters (see `add_to_counters`)
+    letter_freq_score_counters: tuple[int, ...]
+    # A bitset with the bit for every word set
+    all_words: int
+    # See `word_data.word_list_hash`
+    hash: bytes
+
+    @classmethod
+    def from_word_data(cls, word_data: WordData) -> "WordIndex":
+        position_bitsets = tuple(tuple(row) for row in word_data.position_index)
+        letter_bitsets = tuple(
+            position_bitsets[0][j] | position_bitsets[1][j] | position_bitsets[2][j] | position_bitsets[3][j]
+            | position_bitsets[4][j]
+            for j in range(26)
+        )
+        words = tuple(word_data.words)
+        letter_count_bitsets = [[0] * 7 for _ in range(26)]
+        for k, word in enumerate(words):
+            for c in set(word):
+                letter_counts = letter_count_bitsets[ord(c) - _A]
+                for n in range(1, word.count(c) + 1):
+                    letter_counts[n] |= 1 << k
+        all_words = (1 << len(words)) - 1
+        letter_freq_scores = tuple(sum(word_data.letter_to_freq[c] for c in word) for word in words)
+        letter_freq_score_counters = tuple(
+            int("".join("1" if score >> i & 1 else "0" for score in reversed(letter_freq_scores)) or "0", 2)
+            for i in range(max(letter_freq_scores, default=0).bit_length())
+        )
+        return cls(
+            words=words,
+            word_ids=MappingProxyType({word: k for k, word in enumerate(words)}),
+            encoded_words=tuple(encode_word(word) for word in words),
+            letter_to_freq=MappingProxyType(dict(word_data.letter_to_freq)),
+            position_bitsets=position_bitsets,
+            letter_bitsets=letter_bitsets,
+            letter_count_bitsets=tuple((all_words, *letter_counts[1:]) for letter_counts in letter_count_bitsets),
+            letter_masks=tuple(letter_mask(word) for word in words),
+            letter_freq_scores=letter_freq_scores,
+            letter_freq_score_counters=letter_freq_score_counters,
+            all_words=all_words,
+            hash=word_data.hash,
+        )
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    # Returns the bitset of words that are possible in `solution_space`. Equivalent to checking
+    # `solution_space.is_word_possible` for every word.
+    def matching(self, solution_space: "SolutionSpace") -> int:
+        matches = self.all_words
+        for i in range(5):
+            position_bitsets = self.position_bitsets[i]
+            possible = solution_space.possible[i]
+            confirmed = solution_space.confirmed[i]
+            if confirmed is not None:
+                confirmed_idx = ord(confirmed) - _A
+                allowed = position_bitsets[confirmed_idx] if possible >> confirmed_idx & 1 else 0
+            else:
+                allowed = 0
+                for j in iter_bits(possible):
+                    allowed |= position_bitsets[j]
+            matches &= allowed
+            if not matches:
+                return 0
+        for j in iter_bits(solution_space.confirmed_position_agnostic):
+            matches &= self.letter_bitsets[j]
+        for c, min_count in solution_space.min_counts:
+            matches &= self.letter_count_bitsets[ord(c) - _A][min_count]
+        for c, max_count in solution_space.max_counts:
+            matches &= ~self.letter_count_bitsets[ord(c) - _A][max_count + 1]
+        return matches
+
+    # Returns the words in `bitset`, in word list order.
+    def words_in(self, bitset: int) -> list[str]:
+        words = self.words
+        return [words[k] for k in iter_bits(bitset)]
+
+
+_registry: dict[bytes, WordIndex] = {}
+_registry_lock = threading.Lock()
+
+
+# Returns the shared index for `word_list`, building it the first time a word list with the same contents is seen in
+# this process.
+def get_word_index(word_list: list[str]) -> WordIndex:
+    list_hash = word_list_hash(word_list)
+    word_index = _registry.get(list_hash)
+    if word_index is not None:
+        return word_index
+    with _registry_lock:
+        word_index = _registry.get(list_hash)
+        if word_index is None:
+            default_word_data = load_word_data()
+            # The default word list's tables are already in the packed artifact, so don't recompute them
+            word_data = default_word_data if default_word_data.hash == list_hash else build_word_data(word_list)
+            word_index = WordIndex.from_word_data(word_data)
+            _registry[list_hash] = word_index
+        return word_index
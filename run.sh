@@ -12,6 +12,10 @@ elif [[ $COMMAND == "start" ]]; then
   echo "===== Starting game up... ====="
   docker-compose run -e PYTHONPATH=. game
   exit
+elif [[ $COMMAND == "serve" ]]; then
+  echo "===== Starting solver service on port 5808... ====="
+  docker-compose run -e PYTHONPATH=. --service-ports --rm game python application/server.py
+  exit
 elif [[ $COMMAND == "stop" ]]; then
   echo "===== Killing services forcefully ====="
   docker-compose down
@@ -24,12 +28,29 @@ elif [[ $COMMAND == "integration-test" ]]; then
   echo "===== Running test suite ====="
   docker-compose run -e PYTHONPATH=. --rm game tests/integration_test.sh "$NUM_SIMULATIONS"
   exit
+elif [[ $COMMAND == "replay" ]]; then
+  echo "===== Replaying games from $2 ====="
+  docker-compose run -e PYTHONPATH=. --rm game python application/game_log.py "$2"
+  exit
+elif [[ $COMMAND == "tournament" ]]; then
+  echo "===== Playing guesser strategies against librarian strategies ====="
+  docker-compose run -e PYTHONPATH=. --rm game python application/tournament.py --words "${2:-50}"
+  exit
+elif [[ $COMMAND == "load-test" ]]; then
+  echo "===== Running load test against a local solver service ====="
+  docker-compose run -e PYTHONPATH=. --rm game sh -c \
+    "python application/server.py --host 127.0.0.1 & sleep 1 && python tests/load_test.py --sessions ${NUM_SIMULATIONS:-200}"
+  exit
 fi
 
 echo "Usage:"
-echo "  run {build|start|stop|unit-test|integration-test}"
+echo "  run {build|start|serve|stop|unit-test|integration-test|replay|tournament|load-test}"
 echo "    build - Builds services."
 echo "    start - Starts services."
+echo "    serve - Starts the JSON/HTTP solver service on port 5808."
 echo "    stop - Force-stops services (in case CTRL+C did not work)."
 echo "    unit-test - Runs unit test suite."
-echo "    integration-test <NUM_SIMULATIONS> - Runs integrations tests."
\ No newline at end of file
+echo "    integration-test <NUM_SIMULATIONS> - Runs integrations tests."
+echo "    replay <GAME_LOG> - Replays the games in a game log through the solver."
+echo "    tournament <NUM_WORDS> - Plays every guesser strategy against every librarian strategy on NUM_WORDS words."
+echo "    load-test <NUM_SESSIONS> - Runs a load test against a local solver service."
\ No newline at end of file
@@ -0,0 +1,13 @@
+from typing import Optional
+
+from application.clues import encode_clue
+from application.solver import initialize_solution_space, Solver
+from application.word_list import word_list
+
+
+# Returns a solver on the full word list that has been given each of `turns`, as (guess, clue, fact-or-fiction check)
+def solver_after(known_char: str, turns: list[tuple[str, str, Optional[tuple[int, bool]]]]) -> Solver:
+    solver = Solver(word_list, initialize_solution_space(known_char))
+    for guess, clue, check in turns:
+        solver.expand_solution_spaces(guess, encode_clue(clue), check)
+    return solver
@@ -1,6 +1,8 @@
 #!/bin/bash
 
-# Runs the program repeatedly in fully automated mode and checks that it terminates correctly.
+# Runs the program repeatedly in fully automated mode and checks that it terminates correctly. If GAME_LOG is set, the
+# games are appended to that game log (see application/game_log.py), e.g. to replay them later.
+# If SEED is set, simulation i is played with seed SEED + i, so that a run can be reproduced exactly.
 
 NUM_SIMULATIONS=$1
 GUESSER_WINS_COUNT=0
@@ -10,14 +12,14 @@ TOTAL_NUM_ATTEMPTS=0
 for i in $(seq 1 $NUM_SIMULATIONS); do
   echo "===== Running simulation $i ====="
   # Play as the guesser, in fully automated mode
-  result=$(python application/main.py <<- EOF | tail -2
+  result=$(python application/main.py ${GAME_LOG:+--log "$GAME_LOG"} ${SEED:+--seed $((SEED + i))} <<- EOF | tail -2
 	2
 	1
 	EOF
 	)
 
   GUESSER_WINS=$(echo $result | grep -o "Guessers win!")
-  LIBRARIAN_WINS=$(echo $result | grep -o "Librarians win!")
+  LIBRARIAN_WINS=$(echo $result | grep -o "Librarian wins!")
   NUM_ATTEMPTS=$(echo $result | cut -d'#' -f2 | cut -d'.' -f1)
   echo "Number of attempts: $NUM_ATTEMPTS"
 
@@ -0,0 +1,140 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Optional
+
+# Load-tests a local instance of the solver service (application/server.py). Each simulated client plays a full
+# game over a single keep-alive connection, with the service acting as both guesser and librarian:
+#
+#   python application/server.py &
+#   python tests/load_test.py --sessions 200 --concurrency 200
+
+
+class Client:
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        # A map from endpoint name to the latencies (in seconds) of every request made to it
+        self.latencies: dict[str, list[float]] = {}
+
+    async def __aenter__(self) -> "Client":
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+    async def request(self, endpoint: str, method: str, path: str, payload: Optional[dict] = None) -> tuple[int, dict]:
+        body = json.dumps(payload).encode() if payload is not None else b""
+        head = (f"{method} {path} HTTP/1.1\r\n"
+                f"Host: {self.host}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"\r\n")
+        reader, writer = self.reader, self.writer
+        assert reader is not None and writer is not None, "Requests can only be made inside `async with`"
+        start = time.perf_counter()
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+        response_head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        status = int(response_head[0].split(" ")[1])
+        headers = {name.strip().lower(): value.strip()
+                   for name, _, value in (line.partition(":") for line in response_head[1:] if line)}
+        response_body = await reader.readexactly(int(headers.get("content-length", 0)))
+        self.latencies.setdefault(endpoint, []).append(time.perf_counter() - start)
+        return status, json.loads(response_body) if response_body else {}
+
+
+async def play_game(host: str, port: int, rng: random.Random) -> tuple[Optional[str], int, dict[str, list[float]]]:
+    async with Client(host, port) as client:
+        status, game = await client.request("create", "POST", "/games")
+        assert status == 201, game
+        game_url = f"/games/{game['game_id']}"
+
+        winner = None
+        attempts = 0
+        while winner is None:
+            status, response = await client.request("next-guess", "GET", f"{game_url}/next-guess")
+            assert status == 200, response
+            status, response = await client.request("guess", "POST", f"{game_url}/guesses",
+                                                    {"guess": response["guess"]})
+            assert status == 200, response
+            attempts = response["attempt"]
+            winner = response["winner"]
+            if winner:
+                break
+
+            status, response = await client.request("next-clue", "GET", f"{game_url}/next-clue")
+            assert status == 200, response
+            status, response = await client.request("clue", "POST", f"{game_url}/clues", {"clue": response["clue"]})
+            assert status == 200, response
+
+            # Mirror the automated player, which checks a random letter in every 3rd clue
+            if attempts % 3 == 0:
+                status, response = await client.request("check", "POST", f"{game_url}/checks",
+                                                        {"position": rng.randint(0, 4)})
+                assert status == 200, response
+
+        await client.request("delete", "DELETE", game_url)
+        return winner, attempts, client.latencies
+
+
+def _percentile(sorted_values: list[float], percentile: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(percentile / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run(host: str, port: int, num_sessions: int, concurrency: int, seed: int) -> None:
+    rng = random.Random(seed)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded_game() -> tuple[Optional[str], int, dict[str, list[float]]]:
+        async with semaphore:
+            return await play_game(host, port, random.Random(rng.random()))
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(bounded_game() for _ in range(num_sessions)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+
+    errors = [result for result in results if isinstance(result, BaseException)]
+    games = [result for result in results if not isinstance(result, BaseException)]
+    latencies: dict[str, list[float]] = {}
+    for _, _, game_latencies in games:
+        for endpoint, values in game_latencies.items():
+            latencies.setdefault(endpoint, []).extend(values)
+    num_requests = sum(len(values) for values in latencies.values())
+
+    print("===== Results =====")
+    print(f"Sessions: {num_sessions} (concurrency {concurrency}), errors: {len(errors)}")
+    for error in errors[:5]:
+        print(f"  {error!r}")
+    print(f"Elapsed: {elapsed:.2f}s, requests: {num_requests}, throughput: {num_requests / elapsed:.1f} req/s")
+    if games:
+        guesser_wins = sum(1 for winner, _, _ in games if winner == "GUESSER")
+        print(f"Guessers won {guesser_wins} times, librarians won {len(games) - guesser_wins} times")
+        print(f"AVERAGE_NUM_ATTEMPTS: {sum(attempts for _, attempts, _ in games) / len(games):.2f}")
+    print(f"{'endpoint':<12}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for endpoint, values in sorted(latencies.items()):
+        values.sort()
+        print(f"{endpoint:<12}{len(values):>8}"
+              + "".join(f"{_percentile(values, p) * 1000:>10.1f}" for p in (50, 95, 99))
+              + f"{values[-1] * 1000:>10.1f}")
+    if errors:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test a local instance of the solver service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5808)
+    parser.add_argument("--sessions", type=int, default=200, help="Total number of games to play")
+    parser.add_argument("--concurrency", type=int, default=200, help="Maximum number of games in flight at once")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run(args.host, args.port, args.sessions, args.concurrency, args.seed))
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+
+import pytest
+
+from application.async_solver import AsyncSolver, SolverBusyError
+from application.clues import correct_clue, encode_clue
+from application.solver import initialize_solution_space, Solver
+from application.word_list import word_list
+
+
+# Blocks in the middle of expanding its first branch until released, so that tests can act while it is busy.
+class _BlockingSolver(Solver):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def expand_solution_space(self, *args):
+        self.started.set()
+        self.release.wait(timeout=5)
+        return super().expand_solution_space(*args)
+
+
+async def _wait_until_started(solver: _BlockingSolver) -> None:
+    await asyncio.get_running_loop().run_in_executor(None, solver.started.wait, 5)
+
+
+def test_matches_solver():
+    async def test():
+        solver = Solver(word_list, initialize_solution_space("s"))
+        expected = Solver(word_list, initialize_solution_space("s"))
+        async_solver = AsyncSolver(solver)
+        await async_solver.expand("erase", encode_clue("~XX~Y"), None)
+        expected.expand_solution_spaces("erase", encode_clue("~XX~Y"), None)
+
+        assert solver.solution_spaces == expected.solution_spaces
+        assert await async_solver.pick_guess() == expected.pick_guess()
+        assert await async_solver.suggest(3) == expected.suggest(3)
+        pattern = correct_clue("steel", "shine")
+        assert await async_solver.pick_clue(pattern, "steel") == expected.pick_clue(pattern, "steel")
+        assert (await async_solver.search_guess()).complete
+        assert async_solver.num_pending == 0
+    asyncio.run(test())
+
+
+def test_cancel_leaves_solver_unchanged():
+    async def test():
+        solver = _BlockingSolver(word_list, initialize_solution_space("b"))
+        state, candidates = solver.state, solver.candidates
+        async_solver = AsyncSolver(solver)
+        task = asyncio.create_task(async_solver.expand("crane", encode_clue("XX~YX"), None))
+        await _wait_until_started(solver)
+        task.cancel()
+        # Lets the task tell the worker to stop before the worker carries on
+        await asyncio.sleep(0)
+        solver.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert solver.state is state
+        assert async_solver.num_pending == 0
+        await async_solver.expand("crane", encode_clue("XX~YX"), None)
+        assert solver.candidates != candidates
+    asyncio.run(test())
+
+
+def test_backpressure():
+    async def test():
+        solver = _BlockingSolver(word_list, initialize_solution_space("b"))
+        async_solver = AsyncSolver(solver, max_pending=2)
+        expansion = asyncio.create_task(async_solver.expand("crane", encode_clue("XX~YX"), None))
+        await _wait_until_started(solver)
+        guess = asyncio.create_task(async_solver.pick_guess())
+        await asyncio.sleep(0)
+        assert async_solver.num_pending == 2
+        with pytest.raises(SolverBusyError):
+            await async_solver.pick_guess()
+
+        solver.release.set()
+        await expansion
+        # Queued calls run after the ones before them
+        assert await guess == solver.pick_guess()
+    asyncio.run(test())
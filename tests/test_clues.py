@@ -0,0 +1,64 @@
+import pytest
+
+from application.clues import (
+    ALL_CLUES, correct_clue, correct_clues, correct_clues_for_guess, decode_clue, encode_clue, NUM_PATTERNS,
+)
+from application.main import GameState
+from application.word_list import word_list
+
+
+def _reference_clue(guess: str, answer: str) -> str:
+    game_state = GameState(word=answer, guesses=[], clues=[], checks={}, known_char=answer[0])
+    return game_state.generate_correct_clue(guess)
+
+
+def test_encode_clue():
+    assert encode_clue("XXXXX") == 0
+    assert encode_clue("YYYYY") == NUM_PATTERNS - 1
+    assert encode_clue("~XXXX") == 1
+    assert encode_clue("XYXXX") == 6
+    assert len(set(ALL_CLUES)) == NUM_PATTERNS
+    assert all(encode_clue(decode_clue(pattern)) == pattern for pattern in range(NUM_PATTERNS))
+
+
+@pytest.mark.parametrize("guess, answer, clue",
+                         [("annal", "banal", "~XYYY"),
+                          ("union", "banal", "X~XXX"),
+                          ("alloy", "banal", "~~XXX"),
+                          ("banal", "banal", "YYYYY"),
+                          ("steel", "shine", "YX~XX"),
+                          ("eerie", "shine", "XXX~Y"),
+                          ("geese", "eerie", "XY~XY"),
+                          ])
+def test_correct_clue(guess, answer, clue):
+    assert decode_clue(correct_clue(guess, answer)) == clue
+    assert decode_clue(correct_clues_for_guess(guess, [answer])[0]) == clue
+
+
+def test_matches_generate_correct_clue_across_word_list():
+    # Every word as a guess against a spread of answers, plus words with repeated letters against each other, which
+    # are the cases where the duplicate-letter rules kick in.
+    repeated_letter_words = [word for word in word_list if len(set(word)) < 5]
+    answers = word_list[::50] + repeated_letter_words[::5]
+    guesses = [guess for guess in word_list for _ in answers]
+    batch_answers = answers * len(word_list)
+    for guess in repeated_letter_words:
+        guesses += [guess] * len(repeated_letter_words[::3])
+        batch_answers += repeated_letter_words[::3]
+
+    patterns = correct_clues(guesses, batch_answers)
+    assert len(patterns) == len(guesses)
+    mismatches = [
+        (guess, answer)
+        for guess, answer, pattern in zip(guesses, batch_answers, patterns)
+        if ALL_CLUES[pattern] != _reference_clue(guess, answer)
+    ]
+    assert mismatches == []
+
+
+def test_correct_clues_preserves_order():
+    guesses = ["banal", "union", "banal", "eerie"]
+    answers = ["annal", "banal", "banal", "shine"]
+    assert correct_clues(guesses, answers) == [correct_clue(g, a) for g, a in zip(guesses, answers)]
+    with pytest.raises(ValueError):
+        correct_clues(guesses, answers[:-1])
@@ -0,0 +1,79 @@
+import sqlite3
+
+import pytest
+
+from application import decision_cache
+from application.clues import correct_clue, encode_clue
+from application.decision_cache import DecisionCache
+from application.solver import initialize_solution_space, set_default_decision_cache, Solver
+from application.tournament import run_tournament
+from application.word_list import word_list
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = DecisionCache(str(tmp_path / "decisions.db"))
+    yield cache
+    cache.close()
+
+
+def _solver(cache=None) -> Solver:
+    set_default_decision_cache(cache)
+    try:
+        solver = Solver(word_list, initialize_solution_space("s"))
+    finally:
+        set_default_decision_cache(None)
+    solver.expand_solution_spaces("erase", encode_clue("~XX~Y"), None)
+    return solver
+
+
+def test_cached_decisions_match_the_solver(cache):
+    expected = _solver()
+    pattern = correct_clue("steel", "shine")
+    for _ in range(2):
+        solver = _solver(cache)
+        assert solver.decision_cache is cache
+        assert solver.pick_guess() == expected.pick_guess()
+        assert solver.pick_clue(pattern, "steel") == expected.pick_clue(pattern, "steel")
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert len(cache) == 2
+
+    # A different state or decision is a different key
+    solver.expand_solution_spaces("steel", expected.pick_clue(pattern, "steel"), None)
+    assert DecisionCache.key(solver.word_index.hash, solver.state, "guess") != \
+        DecisionCache.key(expected.word_index.hash, expected.state, "guess")
+    assert DecisionCache.key(expected.word_index.hash, expected.state, "clue", "steel", 1) != \
+        DecisionCache.key(expected.word_index.hash, expected.state, "clue", "steel", 2)
+
+
+def test_eviction_keeps_the_most_recently_used(tmp_path):
+    cache = DecisionCache(str(tmp_path / "decisions.db"), max_entries=3)
+    for i in range(5):
+        cache.put(bytes([i]), str(i))
+    cache.get(bytes([0]))
+    cache.evict()
+    assert len(cache) == 3
+    assert [cache.get(bytes([i])) for i in range(5)] == ["0", None, None, "3", "4"]
+    cache.close()
+
+
+def test_other_versions_are_dropped(cache):
+    cache.put(b"key", "crane")
+    cache.close()
+    with sqlite3.connect(cache.path) as connection:
+        connection.execute(f"PRAGMA user_version = {decision_cache.FORMAT_VERSION + 1}")
+    assert cache.get(b"key") is None
+    assert len(cache) == 0
+
+
+def test_shared_between_worker_processes(tmp_path):
+    path = str(tmp_path / "decisions.db")
+    words = ["shine", "torch", "climb", "banal"]
+    expected = run_tournament(words, ["branches"], ["branches"], seed=2, word_list=word_list)
+    for _ in range(2):
+        results = run_tournament(
+            words, ["branches"], ["branches"], seed=2, num_workers=2, word_list=word_list, decision_cache_path=path)
+        assert [(r.num_wins, r.num_attempts) for r in results] == [(r.num_wins, r.num_attempts) for r in expected]
+    cache = DecisionCache(path)
+    assert len(cache) > 0
+    cache.close()
@@ -0,0 +1,110 @@
+import os
+
+import pytest
+
+from application.game_log import (
+    GameLogError, GameLogWriter, read_events, read_games, RecordedGame, replay, Turn, validate_game,
+)
+from application.word_data import word_list_hash
+from application.word_list import word_list
+
+GAME_LOGS = os.path.join(os.path.dirname(__file__), "game_logs")
+
+
+def _read_game(name: str) -> RecordedGame:
+    games = list(read_games(os.path.join(GAME_LOGS, f"{name}.jsonl")))
+    assert len(games) == 1
+    return games[0]
+
+
+def _write_games(path: str, binary: bool) -> None:
+    with GameLogWriter(path, binary=binary) as writer:
+        writer.start("shine", "s", word_list)
+        writer.guess("erase")
+        writer.clue("~XX~Y")
+        writer.check(0, False)
+        writer.guess("shine")
+        writer.end("GUESSER")
+        # A game the log ends in the middle of
+        writer.start("torch", "t")
+        writer.guess("abate")
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_round_trip(tmp_path, binary):
+    path = str(tmp_path / "games.log")
+    _write_games(path, binary)
+
+    assert list(read_games(path)) == [
+        RecordedGame(
+            word="shine",
+            known_char="s",
+            word_list_hash=word_list_hash(word_list),
+            turns=[Turn("erase", "~XX~Y", (0, False)), Turn("shine")],
+            winner="GUESSER",
+        ),
+        RecordedGame(word="torch", known_char="t", turns=[Turn("abate")]),
+    ]
+
+
+def test_binary_log_is_compact_and_converts(tmp_path):
+    jsonl_path, binary_path = str(tmp_path / "games.jsonl"), str(tmp_path / "games.bin")
+    _write_games(jsonl_path, binary=False)
+    with GameLogWriter(binary_path, binary=True) as writer:
+        for game in read_games(jsonl_path):
+            writer.write_game(game)
+
+    assert list(read_events(binary_path)) == list(read_events(jsonl_path))
+    assert os.path.getsize(binary_path) * 4 < os.path.getsize(jsonl_path)
+
+
+def test_invalid_logs(tmp_path):
+    path = str(tmp_path / "games.log")
+    with open(path, "w") as f:
+        f.write('{"event": "guess", "guess": "erase"}\n')
+    with pytest.raises(GameLogError):
+        list(read_games(path))
+
+    _write_games(path, binary=True)
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 1)
+    with pytest.raises(GameLogError):
+        list(read_games(path))
+
+
+# The games noted at the end of test_main.py, one of which the solver used to lose track of the secret word in
+@pytest.mark.parametrize("name", ["torch", "shine"])
+def test_replay_recorded_games(name):
+    game = _read_game(name)
+    assert validate_game(game) is None
+
+    result = replay(game, word_list)
+    assert len(result.steps) == len(game.turns)
+    assert result.first_wrong_turn() is None
+    assert all(step.num_candidates >= 1 for step in result.steps)
+
+
+def test_replay_finds_where_solver_goes_wrong():
+    game = _read_game("shine")
+    # With the secret word swapped out, the recorded clues no longer have exactly one lie
+    game.word = "shire"
+    assert validate_game(game) is not None
+    assert replay(game, word_list).first_wrong_turn() == 0
+
+
+def test_replay_stops_when_no_words_remain():
+    # Clues with four lies each, after which no word fits
+    game = RecordedGame(word="shine", known_char="s", turns=[
+        Turn("erase", "YYYYY"), Turn("steel", "YYYYY"), Turn("shine"),
+    ])
+    assert validate_game(game) == "Turn 1: clue YYYYY for erase has 4 lies"
+    result = replay(game, word_list)
+    assert result.steps[-1].num_candidates == 0
+    assert result.first_wrong_turn() == len(result.steps) - 1
+
+
+def test_replay_rejects_other_word_lists():
+    game = _read_game("shine")
+    game.word_list_hash = word_list_hash(["other"])
+    with pytest.raises(GameLogError):
+        replay(game, word_list)
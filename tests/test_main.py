@@ -1,5 +1,8 @@
+import random
+
 import pytest
 
+from application import main
 from application.main import GameState
 
 
@@ -7,6 +10,7 @@ from application.main import GameState
                          [("hello", True, 1),
                           ("world", True, 1),
                           ("longer_than_5_chars", False, 0),
+                          ("ab1de", False, 0),
                           ("HeLlO", True, 1) # case insensitive
                          ])
 def test_guess(word, is_valid, num_guesses):
@@ -82,6 +86,42 @@ def test_invalid_check():
     assert(len(game_state.checks) == 0)
 
 
+def test_automated_checks():
+    game_state = GameState(word="hello", guesses=["hotel"] * 3, clues=["Y~XYX"] * 3, checks={}, known_char="h")
+    assert game_state.pick_automated_check(random.Random(1)) == random.Random(1).randint(0, 4)
+    game_state.clues.pop()
+    assert game_state.pick_automated_check(random.Random(1)) is None
+
+
+def _play_automated(monkeypatch, capsys, seed: int) -> str:
+    # Play as the guesser, in fully automated mode
+    inputs = iter(["2", "1"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(inputs))
+    monkeypatch.setattr(main.time, "sleep", lambda seconds: None)
+    main.play(seed=seed)
+    return capsys.readouterr().out
+
+
+def test_hints_only_for_words_in_the_word_list(monkeypatch, capsys):
+    # Play as the guesser without assistance, asking for hints until the inputs run out
+    inputs = iter(["2", "0", "?ab1de", "?zzzzz", "?crane"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(inputs))
+    monkeypatch.setattr(main.time, "sleep", lambda seconds: None)
+    with pytest.raises(StopIteration):
+        main.play(seed=1)
+    output = capsys.readouterr().out
+    assert "Guess must only contain the letters a-z" in output
+    assert "Hints are only given for words in the word list" in output
+    assert "If you guess `crane`" in output
+
+
+def test_games_replay_from_their_seed(monkeypatch, capsys):
+    output = _play_automated(monkeypatch, capsys, seed=42)
+    assert "Guessers win!" in output or "Librarian wins!" in output
+    assert _play_automated(monkeypatch, capsys, seed=42) == output
+    assert _play_automated(monkeypatch, capsys, seed=43) != output
+
+
 """
 torch
 Known character: t
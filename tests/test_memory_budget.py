@@ -0,0 +1,28 @@
+import json
+import os
+
+from application.memory_profile import profile_game, profile_games
+from application.word_list import word_list
+
+BUDGET_PATH = os.path.join(os.path.dirname(__file__), "memory_budget.json")
+
+
+# The games in the budget are the ones that branch the most out of a sample of 400, so a change that makes branches
+# bigger or keeps more of them alive shows up here first. See application/memory_profile.py to rewrite the budget.
+def test_adversarial_games_stay_within_budget():
+    with open(BUDGET_PATH) as f:
+        budget = json.load(f)
+    profiles = profile_games(budget["words"], budget["seed"], budget["guesser"], budget["librarian"], word_list)
+
+    for profile in profiles:
+        assert profile.peak_bytes <= budget["max_peak_bytes"], profile
+        assert profile.retained_bytes <= budget["max_retained_bytes"], profile
+
+
+def test_profile_game():
+    profile = profile_game(word_list, "climb")
+    assert profile.turns
+    for turn in profile.turns:
+        assert turn.num_branches >= 1
+        assert turn.peak_bytes > 0
+        assert turn.bytes_per_branch * turn.num_branches <= turn.retained_bytes
@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from application.clues import encode_clue
+from application import parallel
+from application.parallel import ParallelSolverPool
+from application.solver import initialize_solution_space, Solver, SolverCancelledError
+from application.word_index import get_word_index
+from application.word_list import word_list
+
+TURNS = [("erase", "~XX~Y", None), ("steel", "~X~XX", None), ("testy", "XY~XX", (0, True))]
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with ParallelSolverPool(get_word_index(word_list), num_workers=2, expand_threshold=2) as pool:
+        yield pool
+
+
+def test_parallel_expansion_matches_serial(pool):
+    serial = Solver(word_list, initialize_solution_space("s"))
+    parallel = Solver(word_list, initialize_solution_space("s"))
+    parallel.use_parallel(pool)
+    for guess, clue, check in TURNS:
+        serial.expand_solution_spaces(guess, encode_clue(clue), check)
+        parallel.expand_solution_spaces(guess, encode_clue(clue), check)
+        assert parallel.solution_spaces == serial.solution_spaces
+        assert parallel.candidates == serial.candidates
+        assert parallel.pick_guess() == serial.pick_guess()
+
+
+def test_below_threshold_expands_serially(pool):
+    assert not pool.should_expand(1)
+    assert pool.should_expand(2)
+
+
+def test_cancelled_parallel_expansion(pool):
+    solver = Solver(word_list, initialize_solution_space("s"))
+    solver.use_parallel(pool)
+    solver.expand_solution_spaces("erase", encode_clue("~XX~Y"), None)
+    state = solver.state
+    assert pool.should_expand(len(state.solution_spaces))
+
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(SolverCancelledError):
+        solver.expand_solution_spaces("steel", encode_clue("~X~XX"), None, cancel)
+    assert solver.state is state
+
+
+def test_cancellable_expansion_outlasting_poll_interval(pool, monkeypatch):
+    # Every chunk takes longer than this, so waiting for it times out before it finishes
+    monkeypatch.setattr(parallel, "CANCEL_POLL_INTERVAL", 1e-6)
+    serial = Solver(word_list, initialize_solution_space("s"))
+    cancellable = Solver(word_list, initialize_solution_space("s"))
+    cancellable.use_parallel(pool)
+    for guess, clue, check in TURNS:
+        serial.expand_solution_spaces(guess, encode_clue(clue), check)
+        cancellable.expand_solution_spaces(guess, encode_clue(clue), check, threading.Event())
+        assert cancellable.solution_spaces == serial.solution_spaces
+
+
+def test_pool_for_other_word_list(pool):
+    solver = Solver(["banal", "annal", "union"], initialize_solution_space("n"))
+    with pytest.raises(ValueError):
+        solver.use_parallel(pool)
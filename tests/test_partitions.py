@@ -0,0 +1,66 @@
+import pytest
+
+from application.clues import correct_clue, encode_clue, NUM_PATTERNS, SINGLE_LIE_VARIANTS
+from application.partitions import get_partition_cache, PartitionCache, PartitionCacheError
+from application.solver import initialize_solution_space, Solver
+from application.word_index import get_word_index, iter_bits
+from application.word_list import word_list
+
+
+@pytest.mark.parametrize("guess", ["crane", "banal", "eerie"])
+def test_partition_groups_words_by_correct_clue(guess):
+    cache = PartitionCache(get_word_index(word_list))
+    partition = cache.get(guess)
+    assert len(partition) == NUM_PATTERNS
+    for pattern, bitset in enumerate(partition):
+        assert all(correct_clue(guess, word_list[k]) == pattern for k in iter_bits(bitset))
+    assert sum(bin(bitset).count("1") for bitset in partition) == len(word_list)
+
+
+def test_consistent_words():
+    cache = PartitionCache(get_word_index(word_list))
+    clue = encode_clue("XX~YX")
+    consistent = cache.consistent_words("crane", SINGLE_LIE_VARIANTS[clue])
+    expected = {word for word in word_list if correct_clue("crane", word) in SINGLE_LIE_VARIANTS[clue]}
+    assert set(cache.word_index.words_in(consistent)) == expected
+    assert "banal" in expected
+
+
+def test_lru_eviction():
+    cache = PartitionCache(get_word_index(word_list), max_guesses=2)
+    cache.get("crane")
+    cache.get("banal")
+    cache.get("crane")
+    cache.get("eerie")
+    assert "crane" in cache and "eerie" in cache and "banal" not in cache
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_save_and_warm_start(tmp_path):
+    word_index = get_word_index(word_list)
+    cache = PartitionCache(word_index)
+    partitions = {guess: cache.get(guess) for guess in ["crane", "banal", "eerie"]}
+    path = str(tmp_path / "partitions.bin")
+    cache.save(path)
+
+    warm = PartitionCache(word_index, max_guesses=2)
+    assert warm.load(path) == 2
+    assert "crane" not in warm
+    assert warm.get("banal") == partitions["banal"]
+    assert warm.get("eerie") == partitions["eerie"]
+    assert warm.misses == 0
+
+    other = PartitionCache(get_word_index(["banal", "annal", "union"]))
+    with pytest.raises(PartitionCacheError):
+        other.load(path)
+
+
+def test_solver_candidates_keep_secret_word():
+    solver = Solver(word_list, initialize_solution_space("b"))
+    assert solver.partition_cache is get_partition_cache(solver.word_index)
+    for guess, clue, check in [("crane", "XX~YX", None), ("union", "XYXXX", (1, False)), ("alloy", "Y~XXX", None)]:
+        solver.expand_solution_spaces(guess, encode_clue(clue), check)
+        assert "banal" in solver.word_index.words_in(solver.candidates)
+        # Branches without any candidate words are dropped
+        assert all(solver.word_index.matching(solution_space) & solver.candidates
+                   for solution_space in solver.solution_spaces)
@@ -0,0 +1,65 @@
+import sqlite3
+
+import pytest
+
+from application import results_store
+from application.results_store import ResultsStore, ResultsStoreError
+from application.tournament import PlayedGame, PlayedTurn, run_tournament
+from application.word_list import word_list
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"))
+    yield store
+    store.close()
+
+
+def _game(word: str, num_attempts: int, won: bool, guess_seconds: list[float]) -> PlayedGame:
+    turns = [PlayedTurn(guess="crane", guess_seconds=seconds, clue=0, clue_seconds=0.5, expand_seconds=0.25,
+                        num_branches=3) for seconds in guess_seconds[:num_attempts - 1]]
+    turns.append(PlayedTurn(guess=word if won else "crane", guess_seconds=guess_seconds[num_attempts - 1]))
+    return PlayedGame(word=word, known_char=word[0], guesser="branches", librarian="random", won=won, turns=turns)
+
+
+def test_queries(store, monkeypatch):
+    # Several batches, each in its own transaction
+    monkeypatch.setattr(results_store, "BATCH_SIZE", 2)
+    run_id = store.start_run("v1", seed=3)
+    store.record_games(run_id, [
+        _game("shine", 2, True, [0.1, 0.2]),
+        _game("torch", 3, True, [0.3, 0.4, 0.5]),
+        _game("climb", 3, False, [0.6, 0.7, 0.8]),
+    ])
+    store.record_games(store.start_run("v2"), [_game("banal", 1, True, [9.0])])
+
+    assert store.solver_versions() == ["v1", "v2"]
+    win_rate = store.win_rate("v1")
+    assert (win_rate.num_games, win_rate.num_wins) == (3, 2)
+    assert store.win_rate("v1", guesser="lookahead").num_games == 0
+    assert store.attempts_distribution("v1") == {2: 1, 3: 2}
+    assert store.latency_percentiles("v1", "guess", (0, 50, 100)) == {0: 0.1, 50: 0.4, 100: 0.8}
+    assert store.latency_percentiles("v1", "clue", (50,)) == {50: 0.5}
+    assert store.latency_percentiles("v3", "guess") == {}
+
+
+def test_records_tournaments(store):
+    run_id = store.start_run("v1")
+    results = run_tournament(["shine", "torch"], ["branches"], ["branches", "random"], seed=1, word_list=word_list,
+                             on_games=lambda games: store.record_games(run_id, games))
+
+    for result in results:
+        win_rate = store.win_rate("v1", result.guesser, result.librarian)
+        assert (win_rate.num_games, win_rate.num_wins) == (result.num_games, result.num_wins)
+        distribution = store.attempts_distribution("v1", result.guesser, result.librarian)
+        assert sum(attempts * count for attempts, count in distribution.items()) == result.num_attempts
+        representations = store.representations("v1", result.guesser, result.librarian)
+        assert sum(representations.values()) == result.num_guesses_picked
+
+
+def test_rejects_other_schema_versions(tmp_path):
+    path = str(tmp_path / "results.db")
+    with sqlite3.connect(path) as connection:
+        connection.execute(f"PRAGMA user_version = {results_store.SCHEMA_VERSION + 1}")
+    with pytest.raises(ResultsStoreError):
+        ResultsStore(path)
@@ -0,0 +1,56 @@
+import pickle
+
+import pytest
+
+from application.serialization import (
+    decode_solution_spaces, decode_solver, encode_solution_spaces, encode_solver, SerializationError,
+)
+from application.solver import SolutionSpace, SolverState
+from application.word_list import word_list
+from tests.helpers import solver_after
+
+
+@pytest.mark.parametrize("known_char, turns",
+                         [("b", []),
+                          ("b", [("annal", "~~YYY", None)]),
+                          ("b", [("annal", "~~YYY", (1, False)), ("allow", "Y~XXX", None)]),
+                          ("t", [("abate", "XXXYX", None), ("amity", "XXXYX", None), ("aorta", "XYYYX", (2, True))]),
+                          ("s", [("erase", "~XX~Y", None), ("steel", "~X~XX", None)]),
+                          ])
+def test_solver_round_trip(known_char, turns):
+    solver = solver_after(known_char, turns)
+    data = encode_solver(solver)
+    decoded = decode_solver(data, word_list)
+
+    assert decoded.solution_spaces == solver.solution_spaces
+    assert decoded.candidates == solver.candidates
+    assert decoded.letter_to_freq == solver.letter_to_freq
+    assert decoded.pick_guess() == solver.pick_guess()
+    # Decoding and re-encoding is lossless
+    assert encode_solver(decoded) == data
+
+
+def test_solution_spaces_round_trip_is_compact():
+    solver = solver_after("s", [("erase", "~XX~Y", None), ("steel", "~X~XX", None)])
+    data = encode_solution_spaces(solver.solution_spaces)
+    assert decode_solution_spaces(data) == list(solver.solution_spaces)
+    assert len(data) == 49 * len(solver.solution_spaces)
+    assert len(data) < len(pickle.dumps(solver.solution_spaces))
+
+
+def test_empty_solver_round_trip():
+    solver = solver_after("b", [])
+    solver.reset(SolverState(solution_spaces=(), candidates=solver.candidates))
+    assert decode_solver(encode_solver(solver), word_list).solution_spaces == ()
+
+
+def test_invalid_data():
+    data = encode_solver(solver_after("b", [("annal", "~~YYY", None)]))
+    with pytest.raises(SerializationError):
+        decode_solver(data[:-1], word_list)
+    with pytest.raises(SerializationError):
+        decode_solver(b"XXXX" + data[4:], word_list)
+    with pytest.raises(SerializationError):
+        decode_solver(data[:4] + bytes([99]) + data[5:], word_list)
+    with pytest.raises(SerializationError, match="different word list"):
+        decode_solver(data, word_list[:-1])
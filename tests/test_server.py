@@ -0,0 +1,129 @@
+import asyncio
+import json
+
+from application.clues import correct_clue, decode_clue, SINGLE_LIE_VARIANTS
+from application.server import SolverServer
+from application.solver import SearchResult, Solver
+
+
+async def _request(port: int, method: str, path: str, payload=None) -> tuple[int, dict]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                 + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, response_body = response.partition(b"\r\n\r\n")
+    return int(head.split(b" ")[1]), json.loads(response_body)
+
+
+def _with_server(test):
+    async def run():
+        server = SolverServer()
+        asyncio_server = await server.serve("127.0.0.1", 0)
+        port = asyncio_server.sockets[0].getsockname()[1]
+        try:
+            await test(port)
+        finally:
+            asyncio_server.close()
+            await asyncio_server.wait_closed()
+            server.executor.shutdown()
+    asyncio.run(run())
+
+
+def test_play_turn():
+    async def test(port):
+        status, game = await _request(port, "POST", "/games", {"word": "banal", "known_char": "b"})
+        assert status == 201
+        game_url = f"/games/{game['game_id']}"
+
+        status, response = await _request(port, "POST", f"{game_url}/guesses", {"guess": "annal"})
+        assert (status, response["winner"]) == (200, None)
+        # A clue without exactly one lie is rejected
+        status, response = await _request(port, "POST", f"{game_url}/clues", {"clue": "~XYYY"})
+        assert status == 400
+        status, response = await _request(port, "GET", f"{game_url}/next-clue")
+        assert status == 200
+        status, _ = await _request(port, "POST", f"{game_url}/clues", {"clue": response["clue"]})
+        assert status == 200
+        status, response = await _request(port, "POST", f"{game_url}/checks", {"position": 4})
+        assert (status, response["is_fact"]) == (200, True)
+        # Each clue can only be checked once
+        status, _ = await _request(port, "POST", f"{game_url}/checks", {"position": 3})
+        assert status == 409
+        status, response = await _request(port, "GET", game_url)
+        assert response["checks"] == {"0": {"position": 4, "is_fact": True}}
+
+        status, response = await _request(port, "GET", f"{game_url}/next-guess")
+        assert status == 200 and len(response["guess"]) == 5
+        # Checks can no longer be made once the solver has moved on to the next guess
+        status, _ = await _request(port, "POST", f"{game_url}/checks", {"position": 3})
+        assert status == 409
+
+        status, response = await _request(port, "POST", f"{game_url}/guesses", {"guess": "banal"})
+        assert (status, response["winner"]) == (200, "GUESSER")
+        status, response = await _request(port, "GET", game_url)
+        assert response["word"] == "banal"
+    _with_server(test)
+
+
+def test_errors():
+    async def test(port):
+        status, _ = await _request(port, "GET", "/games/missing")
+        assert status == 404
+        status, _ = await _request(port, "PUT", "/games")
+        assert status == 405
+        status, _ = await _request(port, "POST", "/games", {"word": "zzzzz"})
+        assert status == 400
+        status, game = await _request(port, "POST", "/games", {"word": "hello"})
+        status, _ = await _request(port, "GET", f"/games/{game['game_id']}/next-clue")
+        assert status == 409
+        status, _ = await _request(port, "POST", f"/games/{game['game_id']}/guesses", {"guess": "ab1de"})
+        assert status == 400
+        # The rejected guess doesn't stop the game from going on
+        status, _ = await _request(port, "GET", f"/games/{game['game_id']}/next-guess")
+        assert status == 200
+    _with_server(test)
+
+
+def test_next_clue_when_no_lie_leaves_any_word(monkeypatch):
+    monkeypatch.setattr(Solver, "search_clue", lambda *args, **kwargs: SearchResult(None, True))
+
+    async def test(port):
+        status, game = await _request(port, "POST", "/games", {"word": "banal", "known_char": "b"})
+        game_url = f"/games/{game['game_id']}"
+        await _request(port, "POST", f"{game_url}/guesses", {"guess": "annal"})
+        status, response = await _request(port, "GET", f"{game_url}/next-clue")
+        assert status == 200
+        assert response["clue"] == decode_clue(SINGLE_LIE_VARIANTS[correct_clue("annal", "banal")][0])
+    _with_server(test)
+
+
+def test_suggestions_and_possible_words():
+    async def test(port):
+        status, game = await _request(port, "POST", "/games", {"word": "banal", "known_char": "b"})
+        game_url = f"/games/{game['game_id']}"
+        status, response = await _request(port, "GET", f"{game_url}/suggestions?k=3")
+        assert status == 200
+        suggestions = response["suggestions"]
+        assert len(suggestions) == 3
+        _, next_guess = await _request(port, "GET", f"{game_url}/next-guess")
+        assert suggestions[0]["word"] == next_guess["guess"] and next_guess["complete"]
+        status, next_guess = await _request(port, "GET", f"{game_url}/next-guess?time_limit_ms=0")
+        assert status == 200 and next_guess["guess"] in [suggestion["word"] for suggestion in suggestions]
+
+        status, response = await _request(port, "GET", f"{game_url}/possible-words?page=0&page_size=2")
+        assert status == 200
+        assert len(response["words"]) == min(2, response["total"])
+        status, _ = await _request(port, "GET", f"{game_url}/suggestions?k=abc")
+        assert status == 400
+        status, _ = await _request(port, "GET", f"{game_url}/possible-words?page_size=0")
+        assert status == 400
+
+        status, response = await _request(port, "GET", f"{game_url}/hint?guess=crane")
+        assert status == 200
+        assert response["worst_case_remaining"] == max(clue["remaining"] for clue in response["clues"])
+        status, _ = await _request(port, "GET", f"{game_url}/hint?guess=zzzzz")
+        assert status == 400
+    _with_server(test)
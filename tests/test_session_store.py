@@ -0,0 +1,99 @@
+from application.main import GameState
+from application.session_store import Session, SessionStore
+from application.solver import initialize_solution_space, Solver
+from application.word_list import word_list
+
+
+def _session(word: str = "banal") -> Session:
+    game_state = GameState(word=word, guesses=[], clues=[], checks={}, known_char=word[0])
+    return Session(game_state=game_state, solver=Solver(word_list, initialize_solution_space(word[0])))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_eviction_and_rehydration(tmp_path):
+    store = SessionStore(word_list, spill_dir=str(tmp_path), max_sessions=2)
+    store.put("a", _session())
+    store.put("b", _session())
+    store.get("a")  # "b" is now the least recently used session
+    store.put("c", _session())
+    assert store.num_in_memory == 2
+    assert len(store) == 3
+    assert (tmp_path / "b.session").exists()
+
+    session = store.get("b")
+    assert session.game_state.word == "banal"
+    assert store.num_rehydrations == 1
+    assert not (tmp_path / "b.session").exists()
+    # Rehydrating "b" pushed out "a", the least recently used session at that point
+    assert (tmp_path / "a.session").exists()
+
+
+def test_rehydrated_solver_state_is_preserved(tmp_path):
+    store = SessionStore(word_list, spill_dir=str(tmp_path), max_sessions=1)
+    session = _session()
+    session.game_state.guesses.append("annal")
+    session.game_state.clues.append("~~YYY")
+    session.apply_pending_clues()
+    solution_spaces = session.solver.solution_spaces
+    store.put("a", session)
+    store.put("b", _session())
+
+    rehydrated = store.get("a")
+    assert rehydrated is not session
+    assert rehydrated.num_clues_applied == 1
+    assert rehydrated.solver.solution_spaces == solution_spaces
+    assert rehydrated.solver.pick_guess() == session.solver.pick_guess()
+
+
+def test_memory_budget(tmp_path):
+    session_size = _session().size()
+    store = SessionStore(word_list, spill_dir=str(tmp_path), memory_budget=int(session_size * 2.5))
+    for game_id in "abcd":
+        store.put(game_id, _session())
+    assert store.num_in_memory == 2
+    assert store.memory_used <= store.memory_budget
+
+    # Growing a session's solver state past the budget evicts the other sessions
+    session = store.get("d")
+    session.game_state.guesses.append("crane")
+    session.game_state.clues.append("XX~YX")
+    session.apply_pending_clues()
+    store.update_size("d")
+    assert session.size() > session_size
+    assert store.memory_used <= store.memory_budget
+
+
+def test_idle_ttl_and_in_use_sessions(tmp_path):
+    clock = FakeClock()
+    store = SessionStore(word_list, spill_dir=str(tmp_path), idle_ttl=60, clock=clock)
+    store.put("a", _session())
+    store.put("b", _session())
+    store.get("b").num_users += 1
+    clock.now = 30
+    store.get("a")
+    clock.now = 61
+    assert store.evict() == 0  # "a" was accessed recently, and "b" is in use
+    store.get("b").num_users -= 1  # Accessing "b" also refreshes it
+    clock.now = 130
+    assert store.evict() == 2
+    assert store.num_in_memory == 0
+    assert store.get("a") is not None
+
+
+def test_delete(tmp_path):
+    store = SessionStore(word_list, spill_dir=str(tmp_path), max_sessions=1)
+    store.put("a", _session())
+    store.put("b", _session())
+    assert store.delete("a")
+    assert store.delete("b")
+    assert not store.delete("c")
+    assert len(store) == 0
+    assert store.memory_used == 0
+    assert list(tmp_path.iterdir()) == []
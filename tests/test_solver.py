@@ -0,0 +1,271 @@
+import copy
+import dataclasses
+import pickle
+import time
+
+import pytest
+
+from application.clues import correct_clue, encode_clue, letter_mask, SINGLE_LIE_VARIANTS
+import application.solver
+from application.solver import (
+    _SolutionSpaceUpdate, BRANCH_LISTS, IncompatibleClueError, initialize_solution_space, Solver, SolverHistoryError,
+    WORD_BITSETS,
+)
+from application.word_list import word_list
+from tests.helpers import solver_after
+
+
+def test_suggestions_are_ranked():
+    solver = solver_after("s", [("erase", "~XX~Y", None)])
+    suggestions = solver.suggest(10)
+    assert len(suggestions) == 10
+    assert len({suggestion.word for suggestion in suggestions}) == 10
+    keys = [(suggestion.num_branches, suggestion.letter_freq_score) for suggestion in suggestions]
+    assert keys == sorted(keys, reverse=True)
+    assert solver.pick_guess() == suggestions[0].word
+    assert solver.suggest(3) == suggestions[:3]
+
+
+def test_possible_words_pagination():
+    solver = solver_after("s", [("erase", "~XX~Y", None)])
+    total = solver.num_possible_words()
+    all_words = list(solver.iter_possible_words())
+    assert len(all_words) == total
+    pages = [solver.possible_words(page, page_size=7) for page in range((total + 6) // 7)]
+    assert [word for page in pages for word in page] == all_words
+    assert solver.possible_words(total, page_size=7) == []
+
+
+def test_search_without_deadline_is_complete():
+    solver = solver_after("s", [("erase", "~XX~Y", None)])
+    result = solver.search_guess()
+    assert result.complete and result.value == solver.pick_guess()
+    clue_result = solver.search_clue(correct_clue("steel", "shine"), "steel")
+    assert clue_result.complete and clue_result.value == solver.pick_clue(correct_clue("steel", "shine"), "steel")
+
+
+def test_search_past_deadline_returns_best_so_far():
+    solver = solver_after("s", [("erase", "~XX~Y", None)])
+    assert len(solver.solution_spaces) > 1
+    deadline = time.monotonic()
+
+    result = solver.search_guess(deadline)
+    assert not result.complete
+    # Only the first branch is counted
+    assert result.value in solver._get_potential_words_for_branch(solver.solution_spaces[0])
+
+    clue = solver.search_clue(correct_clue("steel", "shine"), "steel", deadline)
+    assert not clue.complete
+    assert clue.value in SINGLE_LIE_VARIANTS[correct_clue("steel", "shine")]
+
+
+@pytest.mark.parametrize("known_char, turns", [
+    ("s", []),
+    ("s", [("erase", "~XX~Y", None)]),
+    ("s", [("erase", "~XX~Y", None), ("steel", "~X~XX", None)]),
+    ("s", [("erase", "~XX~Y", None), ("steel", "~X~XX", None), ("testy", "XY~XX", (0, True))]),
+    ("t", [("abate", "~XX~X", None), ("tries", "YYXXX", None)]),
+])
+@pytest.mark.parametrize("num_branches_counted", [1, 2, None])
+def test_representations_pick_the_same_guess(monkeypatch, known_char, turns, num_branches_counted):
+    solver = solver_after(known_char, turns)
+    if num_branches_counted is not None:
+        # The deadline passes once `num_branches_counted` branches have been counted
+        calls = iter(range(len(solver.solution_spaces)))
+        monkeypatch.setattr(application.solver, "_is_past", lambda deadline: next(calls) >= num_branches_counted - 1)
+    from_lists = solver._search_suggestions(1, None, None)
+    if num_branches_counted is not None:
+        calls = iter(range(len(solver.solution_spaces)))
+    from_bitsets = solver._search_best_suggestion(None, None)
+    assert from_bitsets == from_lists
+    assert from_lists.value
+
+
+def test_representation_switches_are_recorded(monkeypatch):
+    solver = solver_after("s", [("erase", "~XX~Y", None)])
+    assert solver.representation == BRANCH_LISTS
+    solver.pick_guess()
+    assert solver.representation == WORD_BITSETS
+    solver.suggest(5)
+    solver.suggest(5)
+    monkeypatch.setattr(application.solver, "WORD_BITSETS_MIN_WORDS_PER_BRANCH", 10 ** 6)
+    solver.pick_guess()
+    switches = [(switch.from_representation, switch.to_representation) for switch in solver.representation_switches]
+    assert switches == [(BRANCH_LISTS, WORD_BITSETS), (WORD_BITSETS, BRANCH_LISTS)]
+    assert solver.representation_switches[0].num_branches == len(solver.solution_spaces)
+    assert solver.representation_switches[0].num_words == solver.num_possible_words()
+
+
+def test_undo_and_redo():
+    solver = solver_after("s", [])
+    states = [solver.state]
+    for guess, clue in [("erase", "~XX~Y"), ("steel", "~X~XX")]:
+        solver.expand_solution_spaces(guess, encode_clue(clue), None)
+        states.append(solver.state)
+    assert solver.state.move == ("steel", encode_clue("~X~XX"), None)
+
+    solver.undo()
+    solver.undo()
+    assert solver.state is states[0] and not solver.can_undo()
+    with pytest.raises(SolverHistoryError):
+        solver.undo()
+    solver.redo()
+    assert solver.state is states[1]
+
+    # Correcting a mistyped clue: a new expansion replaces the undone ones
+    solver.expand_solution_spaces("steel", encode_clue("~XXXX"), None)
+    assert not solver.can_redo()
+    with pytest.raises(SolverHistoryError):
+        solver.redo()
+    assert solver.state.parent is states[1]
+
+
+def test_what_if_leaves_solver_unchanged():
+    solver = solver_after("s", [("erase", "~XX~Y", None)])
+    state = solver.state
+    hypothetical = solver.what_if("steel", encode_clue("~X~XX"), None)
+    assert solver.state is state
+    assert hypothetical.state.parent is state
+    assert hypothetical.word_index is solver.word_index
+
+    expected = solver_after("s", [("erase", "~XX~Y", None), ("steel", "~X~XX", None)])
+    assert hypothetical.state == expected.state
+    assert hypothetical.pick_guess() == expected.pick_guess()
+    # The current branches are shared with the hypothetical state's history rather than copied
+    assert hypothetical.state.parent.solution_spaces is state.solution_spaces
+    hypothetical.undo()
+    assert hypothetical.state is state
+
+
+@pytest.mark.parametrize("guess", ["crane", "eerie", "steel"])
+def test_hint_matches_brute_force(guess):
+    solver = solver_after("s", [("erase", "~XX~Y", None)])
+    candidates = solver.word_index.words_in(solver.candidates)
+    hint = solver.hint(guess)
+
+    expected_remaining = {}
+    for secret in candidates:
+        if secret == guess:
+            continue
+        for clue in SINGLE_LIE_VARIANTS[correct_clue(guess, secret)]:
+            expected_remaining[clue] = sum(
+                1 for word in candidates
+                if word != guess and correct_clue(guess, word) in SINGLE_LIE_VARIANTS[clue]
+            )
+    assert hint.remaining_by_clue == expected_remaining
+    assert hint.worst_case_remaining == max(expected_remaining.values())
+    assert hint.win_probability == (1 / len(candidates) if guess in candidates else 0)
+    assert sum(hint.probability_by_clue.values()) + hint.win_probability == pytest.approx(1)
+    assert min(expected_remaining.values()) <= hint.expected_remaining <= hint.worst_case_remaining
+
+
+def test_letter_counts_from_duplicate_letters():
+    # "annal" against "banal": the first 'a' is misplaced and the second is right, so there are at least two; the
+    # first 'n' is marked 'X' and the second is right, so there is exactly one
+    solution_space = Solver._update(initialize_solution_space("b"), "annal", correct_clue("annal", "banal"))
+    assert solution_space.min_counts == (("a", 2),)
+    assert solution_space.max_counts == (("n", 1),)
+    assert solution_space.is_word_possible("banal")
+    assert not solution_space.is_word_possible("annal")
+
+    solver = Solver(word_list, initialize_solution_space("b"))
+    matching = solver.word_index.words_in(solver.word_index.matching(solution_space))
+    assert matching == [word for word in word_list if solution_space.is_word_possible(word)]
+    assert all(word.count("a") >= 2 and word.count("n") == 1 for word in matching)
+
+
+@pytest.mark.parametrize("clue", [
+    # 'n' is marked 'X' before it is marked '~', which a truthful librarian never does
+    "~X~YY",
+    # At least two 'a's, two 'n's and an 'l', plus the known 'b', don't fit in five letters
+    "~~YYY",
+])
+def test_impossible_letter_counts(clue):
+    with pytest.raises(IncompatibleClueError):
+        Solver._update(initialize_solution_space("b"), "annal", encode_clue(clue))
+
+
+def test_solution_spaces_are_hashable():
+    solution_space = Solver._update(initialize_solution_space("s"), "erase", encode_clue("~XX~Y"))
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        solution_space.confirmed_position_agnostic = 0
+    siblings = Solver.expand_solution_space(solution_space, "steel", encode_clue("~X~XX"), None)
+    assert len(siblings) > 1
+    index = {sibling: b for b, sibling in enumerate(siblings)}
+    assert len(index) == len(siblings)
+    # Equal solution spaces are the same key, however they were created
+    for sibling in siblings:
+        for copied in (copy.deepcopy(sibling), pickle.loads(pickle.dumps(sibling))):
+            assert copied == sibling and hash(copied) == hash(sibling)
+            assert index[copied] == index[sibling]
+
+
+def test_contradictory_letter_counts():
+    solution_space = Solver._update(initialize_solution_space("b"), "annal", encode_clue("~XYYY"))
+    # Says that there are at least two 'n's, after the first clue said that there is exactly one
+    with pytest.raises(IncompatibleClueError):
+        Solver._update(solution_space, "union", encode_clue("X~X~Y"))
+
+
+def _solution_space_update(known_chrs: str, impossible: dict[int, str]) -> _SolutionSpaceUpdate:
+    update = _SolutionSpaceUpdate.of(initialize_solution_space(known_chrs[0]))
+    update.confirmed_position_agnostic |= letter_mask(known_chrs)
+    for i, letters in impossible.items():
+        update.possible[i] &= ~letter_mask(letters)
+    return update
+
+
+def test_propagate_confirms_letters_with_one_position_left():
+    update = _solution_space_update("b", {0: "b", 1: "b", 2: "b", 3: "b"})
+    Solver._propagate(update)
+    assert update.confirmed == [None, None, None, None, "b"]
+    assert update.possible[4] == letter_mask("b")
+
+
+def test_propagate_rules_out_letters_confirmed_as_often_as_they_can_be():
+    update = _solution_space_update("n", {})
+    update.confirmed[2] = "n"
+    update.max_counts["n"] = 1
+    Solver._propagate(update)
+    assert [row & letter_mask("n") != 0 for row in update.possible] == [False, False, True, False, False]
+
+
+@pytest.mark.parametrize("known_chrs, impossible", [
+    # 'a' and 'b' can only be in the first position
+    ("ab", {i: "ab" for i in range(1, 5)}),
+    # There is no letter left for the last position
+    ("a", {4: "abcdefghijklmnopqrstuvwxyz"}),
+    # Six different letters
+    ("abcdef", {}),
+])
+def test_propagate_detects_dead_branches(known_chrs, impossible):
+    with pytest.raises(IncompatibleClueError):
+        Solver._propagate(_solution_space_update(known_chrs, impossible))
+
+
+def test_propagate_never_changes_matching_words(monkeypatch):
+    propagate = Solver._propagate
+    monkeypatch.setattr(Solver, "_propagate", staticmethod(lambda solution_space: None))
+    solver = Solver(word_list, initialize_solution_space("s"))
+    solution_spaces = []
+    for guess, clue in [("erase", "~XX~Y"), ("steel", "~X~XX"), ("testy", "XY~XX")]:
+        for solution_space in solver.solution_spaces:
+            for true_clue in SINGLE_LIE_VARIANTS[encode_clue(clue)]:
+                try:
+                    solution_spaces.append(Solver._update(solution_space, guess, true_clue))
+                except IncompatibleClueError:
+                    continue
+        solver.expand_solution_spaces(guess, encode_clue(clue), None)
+
+    num_dead = 0
+    for solution_space in solution_spaces:
+        matching = solver.word_index.matching(solution_space)
+        propagated = _SolutionSpaceUpdate.of(solution_space)
+        try:
+            propagate(propagated)
+        except IncompatibleClueError:
+            num_dead += 1
+            assert matching == 0
+            continue
+        assert solver.word_index.matching(propagated.freeze()) == matching
+    assert num_dead > 0
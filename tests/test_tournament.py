@@ -0,0 +1,49 @@
+import pytest
+
+from application.tournament import (
+    CellResult, GUESSER_STRATEGIES, LIBRARIAN_STRATEGIES, MAX_GUESSES, play_game, run_tournament, sample_words,
+    TournamentError,
+)
+from application.word_list import word_list
+
+WORDS = ["shine", "torch", "banal"]
+
+
+def _outcomes(results):
+    return [(r.guesser, r.librarian, r.num_games, r.num_wins, r.num_attempts, r.num_clues) for r in results]
+
+
+def test_every_cell_plays_every_word():
+    results = run_tournament(WORDS, seed=1, word_list=word_list)
+
+    assert [(r.guesser, r.librarian) for r in results] == [
+        (guesser, librarian) for guesser in GUESSER_STRATEGIES for librarian in LIBRARIAN_STRATEGIES
+    ]
+    for result in results:
+        assert result.num_games == len(WORDS)
+        assert 0 <= result.num_wins <= result.num_games
+        assert result.num_games <= result.num_attempts <= MAX_GUESSES * result.num_games
+        # Every guess but a winning one gets a clue
+        assert result.num_clues == result.num_attempts - result.num_wins
+        assert result.mean_guess_latency > 0
+
+
+def test_results_are_reproducible_across_workers():
+    serial = run_tournament(WORDS, ["branches", "letter-frequency"], ["random"], seed=7, word_list=word_list)
+    parallel = run_tournament(
+        WORDS, ["branches", "letter-frequency"], ["random"], seed=7, num_workers=2, word_list=word_list)
+    assert _outcomes(parallel) == _outcomes(serial)
+
+
+def test_sample_words_and_unknown_strategies():
+    assert sample_words(word_list, 5, seed=3) == sample_words(word_list, 5, seed=3)
+    assert sample_words(word_list, 5, seed=3) != sample_words(word_list, 5, seed=4)
+    with pytest.raises(TournamentError):
+        run_tournament(WORDS, guessers=["psychic"], word_list=word_list)
+
+
+def test_opening_guesses_are_per_word_list():
+    play_game(word_list, "shine", 2, CellResult("branches", "branches"))
+    small_word_list = ["shine", "shone", "spine", "swine", "shire", "shade"]
+    game = play_game(small_word_list, "shine", 2, CellResult("branches", "branches"))
+    assert all(turn.guess in small_word_list for turn in game.turns)
@@ -0,0 +1,65 @@
+import pytest
+
+from application import word_data
+from application.word_data import (
+    build_word_data, decode_word_data, encode_word_data, load_word_data, WordDataError,
+)
+from application.word_list import word_list
+
+
+def test_checked_in_artifact_is_up_to_date():
+    with open(word_data.ARTIFACT_PATH, "rb") as f:
+        data = f.read()
+    loaded = decode_word_data(data, word_data._source_hash(word_data.SOURCE_PATH))
+    assert loaded == build_word_data(word_list)
+
+
+def test_load_word_data():
+    loaded = load_word_data()
+    assert loaded.words == word_list
+    assert sum(loaded.letter_to_freq.values()) == 5 * len(word_list)
+    assert load_word_data() is loaded
+    k = word_list.index("banal")
+    assert loaded.position_index[0][ord('b') - ord('a')] >> k & 1
+    assert not loaded.position_index[1][ord('b') - ord('a')] >> k & 1
+
+
+def test_round_trip_and_validation():
+    words = ["banal", "annal", "union"]
+    built = build_word_data(words)
+    data = encode_word_data(built, b"s" * 16)
+    assert decode_word_data(data, b"s" * 16) == built
+    assert decode_word_data(data) == built
+    with pytest.raises(WordDataError, match="stale"):
+        decode_word_data(data, b"t" * 16)
+    with pytest.raises(WordDataError):
+        decode_word_data(data[:-1])
+    # A flipped letter no longer matches the recorded word list hash
+    corrupt = bytearray(data)
+    corrupt[data.index(b"banal")] = ord("c")
+    with pytest.raises(WordDataError, match="corrupt"):
+        decode_word_data(bytes(corrupt))
+    with pytest.raises(WordDataError):
+        build_word_data(["toolong"])
+
+
+def test_stale_artifact_is_rebuilt(tmp_path, monkeypatch):
+    artifact_path = tmp_path / "word_list.bin"
+    artifact_path.write_bytes(encode_word_data(build_word_data(["banal"]), b"s" * 16))
+    monkeypatch.setattr(word_data, "ARTIFACT_PATH", str(artifact_path))
+    load_word_data.cache_clear()
+    try:
+        assert load_word_data().words == word_list
+        # The stale artifact has been replaced with one generated from the source list
+        assert decode_word_data(artifact_path.read_bytes()).words == word_list
+    finally:
+        load_word_data.cache_clear()
+
+
+def test_word_list_hash_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(word_data, "MAX_CACHED_WORD_LIST_HASHES", 2)
+    lists = [["banal"], ["annal"], ["union"]]
+    hashes = [word_data.word_list_hash(words) for words in lists]
+    assert len(word_data._word_list_hashes) <= 2
+    assert id(lists[0]) not in word_data._word_list_hashes
+    assert [word_data.word_list_hash(words) for words in lists] == hashes
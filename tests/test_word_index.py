@@ -0,0 +1,57 @@
+from application.clues import encode_clue
+from application.solver import initialize_solution_space, Solver
+from application.word_index import (
+    add_to_counters, decode_word, encode_word, get_word_index, iter_bits, max_counted,
+)
+from application.word_list import word_list
+
+
+def test_matching_is_equivalent_to_is_word_possible():
+    solver = Solver(word_list, initialize_solution_space("s"))
+    turns = [("erase", "~XX~Y", None), ("steel", "~X~XX", None), ("testy", "XY~XX", (0, True))]
+    solution_spaces = list(solver.solution_spaces)
+    for guess, clue, check in turns:
+        solver.expand_solution_spaces(guess, encode_clue(clue), check)
+        solution_spaces += solver.solution_spaces
+
+    word_index = solver.word_index
+    for solution_space in solution_spaces:
+        expected = [word for word in word_list if solution_space.is_word_possible(word)]
+        assert word_index.words_in(word_index.matching(solution_space)) == expected
+
+
+def test_index_is_shared_between_solvers():
+    first = Solver(word_list, initialize_solution_space("a"))
+    second = Solver(list(word_list), initialize_solution_space("b"))
+    assert first.word_index is second.word_index
+
+    custom_word_list = ["banal", "annal", "union"]
+    custom = Solver(custom_word_list, initialize_solution_space("n"))
+    assert custom.word_index is not first.word_index
+    assert custom.word_index.words == tuple(custom_word_list)
+    assert custom.letter_to_freq["n"] == 5
+    assert custom.pick_guess() in custom_word_list
+
+
+def test_encode_word():
+    word_index = get_word_index(word_list)
+    assert all(decode_word(encode_word(word)) == word for word in word_list)
+    assert word_index.encoded_words[word_index.word_ids["banal"]] == encode_word("banal")
+
+
+def test_bit_sliced_counters():
+    counts = [0, 3, 5, 1, 5, 2]
+    counters: list[int] = []
+    for n in range(max(counts)):
+        add_to_counters(counters, sum(1 << k for k, count in enumerate(counts) if count > n))
+    assert [sum((counters[i] >> k & 1) << i for i in range(len(counters))) for k in range(len(counts))] == counts
+    assert max_counted(counters, 0b111111) == (0b010100, 5)
+    assert max_counted(counters, 0b001011) == (0b000010, 3)
+
+
+def test_letter_freq_score_counters():
+    word_index = get_word_index(word_list)
+    best, score = max_counted(word_index.letter_freq_score_counters, word_index.all_words)
+    assert score == max(word_index.letter_freq_scores)
+    assert list(iter_bits(best)) == [k for k, s in enumerate(word_index.letter_freq_scores) if s == score]
+    assert word_index.letter_freq_scores[0] == sum(word_index.letter_to_freq[c] for c in word_list[0])